@@ -3,10 +3,12 @@ from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from sqlalchemy.orm import Session
 from db.database import get_db
 from core.config import settings
+from core.active_sessions import default_organizer
 import secrets
 
 router = APIRouter()
 security = HTTPBasic()
+optional_security = HTTPBasic(auto_error=False)
 
 
 def get_current_admin(credentials: HTTPBasicCredentials = Depends(security)):
@@ -29,6 +31,19 @@ def get_current_admin(credentials: HTTPBasicCredentials = Depends(security)):
     return credentials.username
 
 
+def get_organizer(credentials: HTTPBasicCredentials | None = Depends(optional_security)) -> str:
+    """
+    Organisateur auquel rattacher une session créée : l'admin authentifié, sinon l'organisateur par défaut.
+    Sert uniquement à l'écriture : les lectures des participants déduisent l'organisateur de leurs sessions.
+    """
+    if credentials and settings.ADMIN_USERNAME and settings.ADMIN_PASSWORD:
+        is_admin = secrets.compare_digest(credentials.username, settings.ADMIN_USERNAME)
+        is_password_correct = secrets.compare_digest(credentials.password, settings.ADMIN_PASSWORD)
+        if is_admin and is_password_correct:
+            return credentials.username
+    return default_organizer()
+
+
 @router.post("/auth/admin/login")
 def admin_login(credentials: HTTPBasicCredentials = Depends(security)):
     admin_username = get_current_admin(credentials)
@@ -1,9 +1,22 @@
+import json
 from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
-from db.database import get_db
+from db.database import get_db, SessionLocal
 from db.models import Participant, MeetingSession
-from core.logic import generate_rounds
+from db.assignments import participant_seats, store_assignments
+from api.auth import get_current_admin, get_organizer
+from core.active_sessions import active_sessions
+from core.rotation_clock import RotationClock, rotation_broadcaster
+from core.logic import generate_rounds, iter_rounds, replan_rounds
+from core.metrics import compute_metrics
+from core.config import settings
+from core.itinerary_cache import itinerary_cache
+from core.jobs import job_manager
+from utils.pdf_cache import pdf_cache
+from core.parallel import generate_best_rounds
 import datetime
 
 router = APIRouter()
@@ -11,6 +24,8 @@ router = APIRouter()
 class SessionConfig(BaseModel):
     tableCountLabel: int
     numberOfRounds: int
+    optimizationBudgetMs: int | None = Field(None, ge=0, le=settings.MAX_OPTIMIZATION_BUDGET_MS)
+    seedCount: int | None = Field(None, ge=1, le=settings.MAX_SEED_COUNT)
     eventCompany: str | None = None
     eventLocation: str | None = None
     eventDate: str | None = None
@@ -20,40 +35,102 @@ class FreeSessionConfig(BaseModel):
     participantCount: int
     tableCountLabel: int
     numberOfRounds: int
+    optimizationBudgetMs: int | None = Field(None, ge=0, le=settings.MAX_OPTIMIZATION_BUDGET_MS)
+    seedCount: int | None = Field(None, ge=1, le=settings.MAX_SEED_COUNT)
     eventCompany: str | None = None
     eventLocation: str | None = None
     eventDate: str | None = None
 
-@router.post("/generate")
-def create_session(config: SessionConfig, db: Session = Depends(get_db)):
-    
-    db_participants = db.query(Participant).filter(Participant.is_active.is_(True)).all()
-    participant_names = list(set([p.nom_complet for p in db_participants if p.nom_complet]))
-    
+class StreamSessionConfig(BaseModel):
+    tableCountLabel: int
+    numberOfRounds: int
+    participantCount: int | None = None
+    eventCompany: str | None = None
+    eventLocation: str | None = None
+    eventDate: str | None = None
 
-    if not participant_names:
-        raise HTTPException(status_code=400, detail="Aucun participant actif. Activez ou importez des participants d'abord !")
+class RotationClockConfig(BaseModel):
+    round: int | None = None
+    roundDurationMinutes: int | None = None
+
+class ReplanConfig(BaseModel):
+    currentRound: int
+    participantCount: int | None = None
+    optimizationBudgetMs: int | None = Field(None, ge=0, le=settings.MAX_OPTIMIZATION_BUDGET_MS)
+
+def _generate(config, participants):
+    """
+    Génération simple, ou meilleur planning sur plusieurs seeds si `seedCount` > 1.
+    Les indicateurs de qualité sont toujours joints dans metadata["metrics"].
+    """
+    if config.seedCount and config.seedCount > 1:
+        result = generate_best_rounds(
+            participants,
+            tableCountLabel=config.tableCountLabel,
+            numberOfRounds=config.numberOfRounds,
+            seed_count=config.seedCount,
+            optimize_ms=config.optimizationBudgetMs
+        )
+    else:
+        result = generate_rounds(
+            participants,
+            tableCountLabel=config.tableCountLabel,
+            numberOfRounds=config.numberOfRounds,
+            optimize_ms=config.optimizationBudgetMs
+        )
+
+    if "error" not in result and "metrics" not in result["metadata"]:
+        result["metadata"]["metrics"] = compute_metrics(result["rounds"], config.tableCountLabel)
+    return result
 
-    # Appeler la core route pour générer les rounds
-    result = generate_rounds(
-        participant_names,
-        tableCountLabel=config.tableCountLabel,
-        numberOfRounds=config.numberOfRounds
-    )
 
+def _generate_job(config, participants, progress=None):
+    """Calcul d'une génération en tâche de fond (pool de processus, ou thread si plusieurs seeds)"""
+    result = _generate(config, participants)
     if "error" in result:
-        raise HTTPException(status_code=400, detail=result["error"])
-    
+        raise ValueError(result["error"])
+    return result
+
+
+def _wants_job(background, participant_count, config):
+    """Tâche de fond si demandée explicitement, sinon au-delà de JOB_GENERATE_THRESHOLD (participants x rotations)"""
+    if background is None:
+        return participant_count * config.numberOfRounds > settings.JOB_GENERATE_THRESHOLD
+    return background
+
+
+def _submit_generate_job(config, participants, save):
+    """Planifie la génération ; `save(db, result)` enregistre la session et construit la réponse"""
+    def finalize(job_id, result):
+        db = SessionLocal()
+        try:
+            return jsonable_encoder(save(db, result))
+        finally:
+            db.close()
+
+    use_processes = not (config.seedCount and config.seedCount > 1)
+    job_id = job_manager.submit("generate", _generate_job, config, participants, finalize=finalize, use_processes=use_processes)
+    return JSONResponse(status_code=202, content={"job_id": job_id, "status": "pending", "status_url": f"/api/jobs/{job_id}"})
+
+
+def _save_paid_session(db, config, result, seats, organizer):
     # Créer une nouvelle session dans la base de données avec les rounds_data
     new_session = MeetingSession(
         number_of_rounds=config.numberOfRounds,
         number_of_tables=config.tableCountLabel,
         rounds_data=result.get("rounds", []),
+        organizer=organizer,
         created_at=datetime.datetime.utcnow()
     )
     db.add(new_session)
+    db.flush()
+    # Affectations normalisées insérées dans la même transaction que la session
+    store_assignments(db, new_session.id, result.get("rounds", []), seats)
     db.commit()
     db.refresh(new_session)
+    itinerary_cache.invalidate(new_session.id)
+    pdf_cache.invalidate(new_session.id)
+    active_sessions.set(organizer, new_session.id)
     
     metadata = result.get("metadata", {})
     metadata.update({
@@ -71,31 +148,20 @@ def create_session(config: SessionConfig, db: Session = Depends(get_db)):
     }
 
 
-@router.post("/generate-free")
-def create_free_session(config: FreeSessionConfig, db: Session = Depends(get_db)):
-    if config.participantCount <= 0:
-        raise HTTPException(status_code=400, detail="Nombre de participants invalide")
-
-    participants = [str(i + 1) for i in range(config.participantCount)]
-
-    result = generate_rounds(
-        participants,
-        tableCountLabel=config.tableCountLabel,
-        numberOfRounds=config.numberOfRounds
-    )
-
-    if "error" in result:
-        raise HTTPException(status_code=400, detail=result["error"])
-
+def _save_free_session(db, config, result, organizer):
     new_session = MeetingSession(
         number_of_rounds=config.numberOfRounds,
         number_of_tables=config.tableCountLabel,
         rounds_data=result.get("rounds", []),
+        organizer=organizer,
         created_at=datetime.datetime.utcnow()
     )
     db.add(new_session)
     db.commit()
     db.refresh(new_session)
+    itinerary_cache.invalidate(new_session.id)
+    pdf_cache.invalidate(new_session.id)
+    active_sessions.set(organizer, new_session.id)
 
     metadata = result.get("metadata", {})
     metadata.update({
@@ -112,6 +178,136 @@ def create_free_session(config: FreeSessionConfig, db: Session = Depends(get_db)
         "message": "Session générée avec succès. Plan gratuit avec participants numérotés."
     }
 
+
+@router.post("/generate")
+def create_session(
+    config: SessionConfig,
+    background: bool | None = None,
+    db: Session = Depends(get_db),
+    organizer: str = Depends(get_organizer)
+):
+    
+    # Une place par participant actif (homonymes compris), libellés calculés sur toute la table
+    seats = participant_seats(db.query(Participant.id, Participant.nom_complet, Participant.is_active).all())
+    participant_names = list(seats)
+
+    if not participant_names:
+        raise HTTPException(status_code=400, detail="Aucun participant actif. Activez ou importez des participants d'abord !")
+
+    if _wants_job(background, len(participant_names), config):
+        return _submit_generate_job(
+            config, participant_names, lambda job_db, result: _save_paid_session(job_db, config, result, seats, organizer)
+        )
+
+    # Appeler la core route pour générer les rounds
+    result = _generate(config, participant_names)
+
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+
+    return _save_paid_session(db, config, result, seats, organizer)
+
+
+@router.post("/generate-free")
+def create_free_session(
+    config: FreeSessionConfig,
+    background: bool | None = None,
+    db: Session = Depends(get_db),
+    organizer: str = Depends(get_organizer)
+):
+    if config.participantCount <= 0:
+        raise HTTPException(status_code=400, detail="Nombre de participants invalide")
+
+    participants = [str(i + 1) for i in range(config.participantCount)]
+
+    if _wants_job(background, config.participantCount, config):
+        return _submit_generate_job(config, participants, lambda job_db, result: _save_free_session(job_db, config, result, organizer))
+
+    result = _generate(config, participants)
+
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+
+    return _save_free_session(db, config, result, organizer)
+
+@router.post("/generate/stream")
+def create_session_stream(
+    config: StreamSessionConfig,
+    db: Session = Depends(get_db),
+    organizer: str = Depends(get_organizer)
+):
+    """
+    Génère une session en NDJSON : une première ligne avec metadata, puis une ligne par rotation
+    dès qu'elle est calculée, et une dernière ligne {"session_id", "done": true}.
+    Plan gratuit si `participantCount` est fourni, participants actifs sinon.
+    La session n'est enregistrée qu'une fois la dernière rotation calculée : un client qui se déconnecte
+    en cours de flux ne laisse pas de session vide ou partielle (qui deviendrait la session courante).
+    """
+    if config.participantCount is not None:
+        if config.participantCount <= 0:
+            raise HTTPException(status_code=400, detail="Nombre de participants invalide")
+        participants = [str(i + 1) for i in range(config.participantCount)]
+        plan_version = "free"
+        seats = None
+    else:
+        seats = participant_seats(db.query(Participant.id, Participant.nom_complet, Participant.is_active).all())
+        participants = list(seats)
+        plan_version = "paid"
+
+    if not participants:
+        raise HTTPException(status_code=400, detail="Aucun participant actif. Activez ou importez des participants d'abord !")
+
+    result = iter_rounds(
+        participants,
+        tableCountLabel=config.tableCountLabel,
+        numberOfRounds=config.numberOfRounds
+    )
+
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+
+    metadata = result.get("metadata", {})
+    metadata.update({
+        "plan_version": plan_version,
+        "event_company": config.eventCompany,
+        "event_location": config.eventLocation,
+        "event_date": config.eventDate,
+    })
+
+    def stream():
+        yield json.dumps({"metadata": metadata}, ensure_ascii=False) + "\n"
+        all_rounds = []
+        for round_data in result["rounds"]:
+            all_rounds.append(round_data)
+            yield json.dumps(round_data, ensure_ascii=False) + "\n"
+
+        # Session dédiée : celle de la requête peut être fermée pendant le streaming
+        stream_db = SessionLocal()
+        try:
+            new_session = MeetingSession(
+                number_of_rounds=config.numberOfRounds,
+                number_of_tables=config.tableCountLabel,
+                rounds_data=all_rounds,
+                organizer=organizer,
+                created_at=datetime.datetime.utcnow()
+            )
+            stream_db.add(new_session)
+            stream_db.flush()
+            session_id = new_session.id
+            if seats is not None:
+                store_assignments(stream_db, session_id, all_rounds, seats)
+            stream_db.commit()
+        finally:
+            stream_db.close()
+        itinerary_cache.invalidate(session_id)
+        pdf_cache.invalidate(session_id)
+        active_sessions.set(organizer, session_id)
+
+        yield json.dumps({"session_id": session_id, "done": True}, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
 @router.post("/end-session/{session_id}")
 def end_session(session_id: int, db: Session = Depends(get_db)):
     """
@@ -129,9 +325,139 @@ def end_session(session_id: int, db: Session = Depends(get_db)):
     session.is_active = False
     session.ended_at = datetime.datetime.utcnow()
     db.commit()
+    itinerary_cache.invalidate(session_id)
+    # Session courante relue en base au prochain accès (état is_active à jour)
+    active_sessions.invalidate(session.organizer)
+    # Fin du flux SSE des participants connectés
+    rotation_broadcaster.publish(RotationClock.from_session(session, ()))
     
     return {
         "message": "Session terminée avec succès",
         "session_id": session_id,
         "ended_at": session.ended_at
-    }
\ No newline at end of file
+    }
+
+
+def _session_clock(db, session_id):
+    session = db.query(MeetingSession).filter(MeetingSession.id == session_id).first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Session non trouvée")
+    index = itinerary_cache.get(session.id, lambda: session.rounds_data)
+    return session, RotationClock.from_session(session, index.round_numbers)
+
+
+@router.get("/sessions/{session_id}/clock")
+def get_rotation_clock(session_id: int, db: Session = Depends(get_db)):
+    """Rotation en cours d'une session, avec son heure de début et de fin prévue"""
+    _, clock = _session_clock(db, session_id)
+    return clock.snapshot(datetime.datetime.utcnow())
+
+
+@router.post("/sessions/{session_id}/clock")
+def set_rotation_clock(
+    session_id: int,
+    config: RotationClockConfig,
+    db: Session = Depends(get_db),
+    current_admin: str = Depends(get_current_admin)
+):
+    """
+    Démarre maintenant la rotation `round` (par défaut la suivante, ou la première si l'horloge n'est pas lancée).
+    `roundDurationMinutes` fixe la durée d'une rotation (total_duration_minutes = durée x rotations) :
+    les rotations suivantes démarrent alors automatiquement. Les participants connectés au flux SSE sont notifiés.
+    """
+    session, clock = _session_clock(db, session_id)
+
+    if not session.is_active:
+        raise HTTPException(status_code=400, detail="Cette session est déjà terminée")
+
+    if not clock.round_numbers:
+        raise HTTPException(status_code=400, detail="Aucune rotation dans cette session")
+
+    now = datetime.datetime.utcnow()
+    round_number = config.round if config.round is not None else clock.next_round(now)
+    if round_number is None:
+        raise HTTPException(status_code=400, detail="La dernière rotation est déjà en cours")
+    if round_number not in clock.round_numbers:
+        raise HTTPException(status_code=400, detail=f"Rotation {round_number} inexistante")
+
+    if config.roundDurationMinutes is not None:
+        if config.roundDurationMinutes <= 0:
+            raise HTTPException(status_code=400, detail="Durée de rotation invalide")
+        session.total_duration_minutes = config.roundDurationMinutes * len(clock.round_numbers)
+
+    session.current_round = round_number
+    session.round_started_at = now
+    db.commit()
+
+    clock = RotationClock.from_session(session, clock.round_numbers)
+    rotation_broadcaster.publish(clock)
+    return clock.snapshot(now)
+
+
+def _is_free_session(rounds_data) -> bool:
+    """Session du plan gratuit : tous les membres sont des participants numérotés ("1", "2", ...)"""
+    members = [m for round_data in rounds_data for t in round_data.get("tables", []) for m in t.get("members", [])]
+    return bool(members) and all(str(m).isdigit() for m in members)
+
+
+@router.post("/sessions/{session_id}/replan")
+def replan_session(session_id: int, config: ReplanConfig, db: Session = Depends(get_db)):
+    """
+    Replanifie les rotations restantes d'une session après des arrivées ou des départs.
+    Les rotations jusqu'à `currentRound` inclus sont figées, les suivantes sont réparées
+    en déplaçant le moins de participants possible.
+    Plan gratuit : `participantCount` obligatoire ; plan payant : participants actifs, sans `participantCount`.
+    """
+    session = db.query(MeetingSession).filter(MeetingSession.id == session_id).first()
+
+    if not session:
+        raise HTTPException(status_code=404, detail="Session non trouvée")
+
+    if not session.is_active:
+        raise HTTPException(status_code=400, detail="Cette session est déjà terminée")
+
+    is_free = _is_free_session(session.rounds_data or [])
+    if is_free and config.participantCount is None:
+        raise HTTPException(status_code=400, detail="Session du plan gratuit : `participantCount` est requis")
+    if not is_free and config.participantCount is not None:
+        raise HTTPException(status_code=400, detail="Session du plan payant : `participantCount` n'est pas accepté, les participants actifs sont utilisés")
+
+    seats = None
+    if config.participantCount is not None:
+        participants = [str(i + 1) for i in range(config.participantCount)]
+    else:
+        seats = participant_seats(db.query(Participant.id, Participant.nom_complet, Participant.is_active).all())
+        participants = list(seats)
+
+    if not participants:
+        raise HTTPException(status_code=400, detail="Aucun participant actif. Activez ou importez des participants d'abord !")
+
+    result = replan_rounds(
+        session.rounds_data or [],
+        participants,
+        tableCountLabel=session.number_of_tables,
+        frozen_rounds=config.currentRound,
+        optimize_ms=config.optimizationBudgetMs
+    )
+
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+
+    session.rounds_data = result["rounds"]
+    if seats is not None:
+        store_assignments(db, session.id, result["rounds"], seats)
+    db.commit()
+    itinerary_cache.invalidate(session.id)
+    pdf_cache.invalidate(session.id)
+    # Index reconstruit tout de suite : les flux SSE ouverts y lisent les tables des rotations suivantes
+    itinerary_cache.get(session.id, lambda: result["rounds"])
+
+    metadata = result.get("metadata", {})
+    metadata["metrics"] = compute_metrics(result["rounds"], session.number_of_tables)
+
+    return {
+        "session_id": session.id,
+        "metadata": metadata,
+        "rounds": result.get("rounds", []),
+        "message": "Rotations restantes replanifiées avec succès."
+    }
@@ -0,0 +1,32 @@
+import os
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+
+from core.jobs import job_file_path, job_manager
+
+router = APIRouter()
+
+
+@router.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """Statut, avancement, résultat et durées d'une tâche en arrière-plan"""
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Tâche introuvable")
+    return job
+
+
+@router.get("/jobs/{job_id}/file")
+def download_job_file(job_id: str):
+    """Fichier produit par une tâche terminée (PDF)"""
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Tâche introuvable")
+    if job["status"] != "done":
+        raise HTTPException(status_code=409, detail="Tâche non terminée")
+
+    path = job_file_path(job["result"])
+    if not path or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Fichier introuvable")
+    return FileResponse(path, media_type=job["result"]["media_type"], filename=job["result"]["filename"])
@@ -1,14 +1,74 @@
-from fastapi import APIRouter, HTTPException, Depends
+import logging
+
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
+from api.auth import get_current_admin
 from core.config import settings
-from db.database import get_db
+from core.jobs import job_manager
+from db.assignments import session_itineraries
+from db.database import get_db, SessionLocal
+from db.listing import DEFAULT_PAGE_SIZE, list_page, parse_fields
+from db.models import MeetingSession, Participant
 from db.models import OrganizerRequest as OrganizerRequestModel
 from db.schemas import OrganizerRequestCreate, OrganizerRequestResponse
-from utils.email import send_email
+from utils.cards import itinerary_url
+from utils.email import build_message, outbox
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Nombre d'échecs détaillés gardés dans le résultat d'un envoi groupé
+MAX_REPORTED_EMAIL_ERRORS = 100
+# Colonnes disponibles pour la liste paginée (fields=)
+ORGANIZER_REQUEST_LIST_FIELDS = (
+    "id", "nom", "prenom", "email", "telephone", "activite", "entreprise", "raison", "created_at", "status"
+)
+
+
+def _itinerary_message(session_id, participant_id, name, email, stops):
+    lines = [f"Rotation {round_num} : {table_name}" for round_num, table_name in stops]
+    body = (
+        f"Bonjour {name},\n\n"
+        "Voici vos tables pour le speed meeting :\n"
+        + "\n".join(lines or ["Aucune table assignée"])
+        + f"\n\nRetrouvez votre itinéraire à tout moment : {itinerary_url(session_id, participant_id)}\n"
+    )
+    return build_message("Votre itinéraire - Speed Meeting", body, email)
+
+
+def _send_itinerary_emails(session_id, progress=None):
+    """
+    Tâche de fond : un email d'itinéraire par participant de la session ayant une adresse.
+    Les messages passent par la file d'envoi (connexions SMTP réutilisées) ; la tâche suit l'envoi groupé.
+    """
+    db = SessionLocal()
+    try:
+        # Affectations par identifiant : chaque homonyme reçoit son propre itinéraire
+        itineraries = session_itineraries(db, session_id)
+    finally:
+        db.close()
+
+    messages = [
+        _itinerary_message(session_id, participant_id, name, email, stops)
+        for participant_id, name, email, stops in itineraries if email
+    ]
+    # Participants de la session sans adresse
+    skipped_without_email = len(itineraries) - len(messages)
+
+    batch = outbox.enqueue_many(messages)
+    while not batch.wait(timeout=1):
+        if progress:
+            summary = batch.summary()
+            progress(progress=(summary["sent"] + summary["failed"]) / max(batch.total, 1), sent=summary["sent"], failed=summary["failed"])
+
+    summary = batch.summary()
+    summary["errors"] = summary["errors"][:MAX_REPORTED_EMAIL_ERRORS]
+    summary["skipped_without_email"] = skipped_without_email
+    return summary
+
 
 @router.post("/organizer/request")
 def submit_organizer_request(payload: OrganizerRequestCreate, db: Session = Depends(get_db)):
@@ -25,8 +85,8 @@ def submit_organizer_request(payload: OrganizerRequestCreate, db: Session = Depe
             f"Entreprise: {payload.entreprise}\n"
             f"Raison: {payload.raison}\n"
         )
-        send_email(subject, body, settings.ORGANIZER_REQUEST_RECIPIENT)
-
+        # Message construit avant l'enregistrement : un destinataire manquant n'enregistre rien
+        message = build_message(subject, body, settings.ORGANIZER_REQUEST_RECIPIENT)
         org_request = OrganizerRequestModel(
             nom=payload.nom,
             prenom=payload.prenom,
@@ -40,17 +100,38 @@ def submit_organizer_request(payload: OrganizerRequestCreate, db: Session = Depe
         db.add(org_request)
         db.commit()
         db.refresh(org_request)
-        return {"message": "Demande envoyee avec succes", "id": org_request.id}
     except Exception as exc:
         db.rollback()
         raise HTTPException(status_code=500, detail=str(exc))
 
+    # Envoi en arrière-plan : la réponse n'attend pas le serveur SMTP. La demande est enregistrée,
+    # un échec de mise en file est seulement journalisé (un nouvel envoi du formulaire la dupliquerait)
+    try:
+        outbox.enqueue(message)
+    except Exception as exc:
+        logger.error(f"Email de la demande organisateur {org_request.id} non mis en file : {exc}")
+    return {"message": "Demande envoyee avec succes", "id": org_request.id}
+
 
 @router.get("/organizer/requests")
-def list_organizer_requests(db: Session = Depends(get_db)):
-    """Lister toutes les demandes d'organisateur"""
-    requests = db.query(OrganizerRequestModel).order_by(OrganizerRequestModel.created_at.desc()).all()
-    return requests
+def list_organizer_requests(
+    request: Request,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+    fields: str | None = None,
+    status: str | None = None,
+    include_total: bool = False,
+    db: Session = Depends(get_db)
+):
+    """
+    Demandes d'organisateur, les plus récentes d'abord, par pages de `limit` (page suivante : cursor=next_cursor).
+    `fields=` limite les colonnes, `status` filtre, `include_total=true` ajoute le total ; ETag + If-None-Match.
+    """
+    filters = [OrganizerRequestModel.status == status] if status else []
+    return list_page(
+        request, db, OrganizerRequestModel, parse_fields(fields, ORGANIZER_REQUEST_LIST_FIELDS), filters,
+        cursor, limit, include_total, descending=True
+    )
 
 
 @router.get("/organizer/requests/{request_id}")
@@ -60,3 +141,26 @@ def get_organizer_request(request_id: int, db: Session = Depends(get_db)):
     if not request:
         raise HTTPException(status_code=404, detail="Demande non trouvee")
     return request
+
+
+@router.post("/sessions/{session_id}/emails/itineraries", status_code=202)
+def send_itinerary_emails(
+    session_id: int,
+    db: Session = Depends(get_db),
+    current_admin: Participant = Depends(get_current_admin)
+):
+    """
+    Envoie à chaque participant de la session son itinéraire par email, en tâche de fond :
+    suivi via /api/jobs/{job_id} (envoyés, échecs, participants sans adresse).
+    """
+    if not db.query(MeetingSession.id).filter(MeetingSession.id == session_id).first():
+        raise HTTPException(status_code=404, detail="Session non trouvee")
+
+    job_id = job_manager.submit("emails", _send_itinerary_emails, session_id, use_processes=False)
+    return JSONResponse(status_code=202, content={"job_id": job_id, "status": "pending", "status_url": f"/api/jobs/{job_id}"})
+
+
+@router.get("/organizer/emails/status")
+def email_outbox_status(current_admin: Participant = Depends(get_current_admin)):
+    """État de la file d'envoi des emails (en file, en attente de nouvelle tentative, envoyés, abandonnés)"""
+    return outbox.stats()
@@ -1,229 +1,152 @@
+import asyncio
 import io
+import json
+import os
+import tempfile
 import pandas as pd
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File, Form
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from db.database import get_db
-from db.models import Participant, MeetingSession, ParticipantTableAssignment
+from db.database import AsyncSessionLocal, get_async_db, get_db
+from db.models import Participant, MeetingSession
+from db.assignments import latest_participant_session_statement, participant_stops_statement, table_members_statement
 from pydantic import BaseModel
 from api.auth import get_current_admin
+from core.active_sessions import active_sessions, current_session_statement
 from core.config import settings
+from core.itinerary_cache import itinerary_cache
+from core.rotation_clock import RotationClock, rotation_broadcaster
+from core.jobs import job_manager
+from db.listing import DEFAULT_PAGE_SIZE, list_page, parse_fields
+from db.search import (
+    DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT, decode_search_cursor, encode_search_cursor, search_ids_statement,
+    search_tokens
+)
+from utils.text import fold_text
+from utils.participant_import import (
+    ALLOWED_FIELDS, ParticipantUpserter, has_known_headers, normalize_participants, resolve_columns,
+    run_import_file, timed
+)
 
 router = APIRouter()
 
+SPOOL_CHUNK_SIZE = 1024 * 1024
+# Colonnes disponibles pour la liste paginée (fields=)
+PARTICIPANT_LIST_FIELDS = ("id", "nom", "prenom", "nom_complet", "telephone", "email", "profession", "entreprise", "is_active")
+
+
+def _import_field_order(column_order: str | None):
+    """Ordre des colonnes pour les fichiers sans en-têtes (configuration ou paramètre column_order)"""
+    default_order = [item.strip().lower() for item in settings.DEFAULT_IMPORT_COLUMN_ORDER if item.strip()]
+    if column_order:
+        default_order = [item.strip().lower() for item in column_order.split(",") if item.strip()]
+
+    if any(field not in ALLOWED_FIELDS for field in default_order):
+        raise HTTPException(status_code=400, detail="column_order invalide. Champs autorises: nom, prenom, nom_complet, telephone, email, profession, entreprise")
+    return default_order
+
+
+async def _submit_import_job(file: UploadFile, field_order):
+    """Copie l'upload par blocs dans un fichier temporaire et planifie son import par lots"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1]) as spool:
+        while chunk := await file.read(SPOOL_CHUNK_SIZE):
+            spool.write(chunk)
+
+    job_id = job_manager.submit(
+        "import", run_import_file, spool.name, file.filename, field_order, settings.IMPORT_BATCH_SIZE,
+        use_processes=False
+    )
+    return {"job_id": job_id, "status": "pending", "status_url": f"/api/jobs/{job_id}"}
+
+
 @router.post("/participants/upload")
 async def upload_participants(
     file: UploadFile = File(...),
     column_order: str | None = Form(None),
+    background: bool | None = None,
     db: Session = Depends(get_db), current_admin: Participant = Depends(get_current_admin)
 ):
+    """
+    Import synchrone par défaut. Avec `background=true`, ou automatiquement pour les fichiers
+    plus gros que JOB_UPLOAD_THRESHOLD_BYTES, l'import part en tâche de fond (202 + job_id).
+    """
     if not file.filename.endswith(('.csv', '.xlsx', '.xls')):
         raise HTTPException(status_code=400, detail="Format de fichier non supporté (CSV, XLSX ou XLS uniquement)")
 
+    if background is None:
+        background = (file.size or 0) > settings.JOB_UPLOAD_THRESHOLD_BYTES
+    if background:
+        return JSONResponse(status_code=202, content=await _submit_import_job(file, _import_field_order(column_order)))
+
     try:
-        contents = await file.read()
+        timings = {}
+        with timed(timings, "read_ms"):
+            contents = await file.read()
 
-        def read_dataframe(has_header: bool = True) -> pd.DataFrame:
-            if file.filename.endswith('.csv'):
-                return pd.read_csv(io.BytesIO(contents), header=0 if has_header else None)
-            return pd.read_excel(io.BytesIO(contents), header=0 if has_header else None)
+            def read_dataframe(has_header: bool = True) -> pd.DataFrame:
+                if file.filename.endswith('.csv'):
+                    return pd.read_csv(io.BytesIO(contents), header=0 if has_header else None)
+                return pd.read_excel(io.BytesIO(contents), header=0 if has_header else None)
 
-        df = read_dataframe(has_header=True)
-        normalized_columns = [str(col).strip().lower() for col in df.columns]
+            df = read_dataframe(has_header=True)
+            known_headers = has_known_headers(df.columns)
+            if not known_headers:
+                df = read_dataframe(has_header=False)
 
-        known_header_candidates = {
-            "nom", "name", "lastname", "prenom", "prénom", "firstname", "nom complet", 
-            "full name", "telephone", "email", "e-mail", "mail", "courriel", "poste", 
-            "profession", "job title", "fonction", "métier", "metier", "société", 
-            "entreprise", "company", "organization", "organisation", "agence", "business"
-        }
+        default_order = _import_field_order(column_order)
 
-        has_known_headers = any(col in known_header_candidates for col in normalized_columns)
-
-        if not has_known_headers:
-            df = read_dataframe(has_header=False)
-            normalized_columns = [str(col).strip().lower() for col in df.columns]
-
-        def get_column(*candidates):
-            for candidate in candidates:
-                if candidate in normalized_columns:
-                    return df.columns[normalized_columns.index(candidate)]
-            return None
-
-        default_order = [item.strip().lower() for item in settings.DEFAULT_IMPORT_COLUMN_ORDER if item.strip()]
-        if column_order:
-            default_order = [item.strip().lower() for item in column_order.split(",") if item.strip()]
-
-        allowed_fields = {"nom", "prenom", "nom_complet", "telephone", "email", "profession", "entreprise"}
-        if any(field not in allowed_fields for field in default_order):
-            raise HTTPException(status_code=400, detail="column_order invalide. Champs autorises: nom, prenom, nom_complet, telephone, email, profession, entreprise")
-
-        if not has_known_headers:
-            field_to_index = {field: idx for idx, field in enumerate(default_order)}
-            col_nom = field_to_index.get("nom")
-            col_prenom = field_to_index.get("prenom")
-            col_nom_complet = field_to_index.get("nom_complet")
-            col_telephone = field_to_index.get("telephone")
-            col_email = field_to_index.get("email")
-            col_profession = field_to_index.get("profession")
-            col_entreprise = field_to_index.get("entreprise")
-            
-            # Détection intelligente de la colonne email par recherche de "@"
-            # Cette détection a PRIORITE sur l'ordre du config
-            detected_email_col = None
-            if len(df.columns) > 0:
-                for idx, col in enumerate(df.columns):
-                    sample_values = df[col].astype(str).unique()[:5]
-                    if any("@" in str(val) for val in sample_values if str(val) != "nan"):
-                        detected_email_col = idx
-                        break
-            
-            if detected_email_col is not None:
-                col_email = detected_email_col
-                
-                # Une fois l'email détecté, on réassigne intelligemment les autres colonnes
-                # Chercher prénom et nom aux deux premières colonnes (avant l'email généralement)
-                if detected_email_col >= 2:
-                    col_prenom = 0
-                    col_nom = 1
-                    
-                    # Les colonnes restantes sont entre le nom (col 1) et l'email (detected_email_col)
-                    remaining_cols = list(range(2, detected_email_col))
-                    
-                    # D'abord: chercher le TELEPHONE qui doit contenir des numéros
-                    for col_idx in remaining_cols[:]:  # faire une copie pour parcours sûr
-                        sample_values = df.iloc[:5, col_idx].astype(str).values
-                        # Vérifier si la colonne contient des numéros
-                        if any(any(c.isdigit() for c in str(val)) for val in sample_values if str(val) != 'nan'):
-                            col_telephone = col_idx
-                            remaining_cols.remove(col_idx)
-                            break
-                    
-                    # Les colonnes restantes: profession et entreprise
-                    if len(remaining_cols) > 0:
-                        # Première colonne restante = profession
-                        col_profession = remaining_cols[0]
-                    
-                    if len(remaining_cols) > 1:
-                        # Deuxième colonne restante = entreprise
-                        col_entreprise = remaining_cols[1]
-        else:
-            col_nom = get_column("nom", "Nom", "NOM", "last name", "Last name", "Last Name", "lastname", "Lastname", "LASTNAME", "LAST NAME", "nom de famille", "Nom de famille", "Nom de Famille", "Nom De Famille", "NOM DE FAMILLE")
-            col_prenom = get_column("prénom", "prenom", "Prénom", "Prenom", "PRENOM", "PRÉNOM", "first name", "First name", "First Name", "firstname", "Firstname", "FIRSTNAME", "FIRST NAME")
-            col_nom_complet = get_column("nom complet", "Nom Complet", "Nom complet", "full name", "Full name", "Full Name", "fullname", "Fullname", "FULLNAME", "FULL NAME")
-            col_telephone = get_column("telephone", "Telephone", "TELEPHONE", "téléphone", "Téléphone", "TÉLÉPHONE", "phone", "Phone", "PHONE", "mobile", "Mobile", "MOBILE")
-            col_email = get_column("email", "Email", "e-mail", "E-mail", "EMAIL", "E-MAIL", "mail", "Mail", "MAIL", "courriel", "Courriel", "COURRIEL", "adresse email", "Adresse email", "Adresse Email", "ADRESSE EMAIL", "adresse e-mail", "Adresse e-mail", "Adresse E-mail", "ADRESSE E-MAIL")
-            col_profession = get_column("poste", "Poste", "POSTE", "profession", "Profession", "PROFESSION", "job title", "Job title", "JOB TITLE", "job", "Job", "JOB", "fonction", "Fonction", "FONCTION", "métier", "Métier", "MÉTIER", "metier", "Metier", "METIER", "trvail", "Travail", "TRAVAIL", "occupation", "Occupation", "OCCUPATION")
-            col_entreprise = get_column("société", "Société", "SOCIÉTÉ", "entreprise", "Entreprise", "ENTREPRISE", "company", "Company", "COMPANY", "organization", "Organization", "ORGANIZATION", "organisation", "Organisation", "ORGANISATION", "agence", "Agence", "AGENCE", "firm", "Firm", "FIRM", "business", "Business", "BUSINESS")
-
-        participants_rows = []
-        def get_value(row, column_ref, is_index: bool = False):
-            if column_ref is None:
-                return None
-            if is_index and (not isinstance(column_ref, int) or column_ref >= len(row)):
-                return None
-            value = row.iloc[column_ref] if is_index else row[column_ref]
-            if pd.isna(value):
-                return None
-            return str(value).strip()
-
-        is_indexed = not has_known_headers
-        for _, row in df.iterrows():
-            nom = (get_value(row, col_nom, is_index=is_indexed) or "").upper()
-            prenom = get_value(row, col_prenom, is_index=is_indexed) or ""
-            nom_complet = get_value(row, col_nom_complet, is_index=is_indexed) or ""
-            telephone = get_value(row, col_telephone, is_index=is_indexed)
-            email = get_value(row, col_email, is_index=is_indexed)
-            profession = get_value(row, col_profession, is_index=is_indexed)
-            entreprise = get_value(row, col_entreprise, is_index=is_indexed)
-            
-            if not nom_complet:
-                nom_complet = " ".join(part for part in [prenom, nom] if part).strip()
-            else:
-                # Si nom_complet est fourni, mettre le dernier mot en majuscules
-                parts = nom_complet.split()
-                if len(parts) > 1:
-                    parts[-1] = parts[-1].upper()
-                    nom_complet = " ".join(parts)
-                else:
-                    nom_complet = nom_complet.upper()
-
-            if not nom_complet:
-                continue
+        with timed(timings, "normalize_ms"):
+            columns = resolve_columns(df, known_headers, default_order)
+            participants_rows = normalize_participants(df, columns, is_index=not known_headers)
 
-            participants_rows.append({
-                "nom": nom,
-                "prenom": prenom,
-                "nom_complet": nom_complet,
-                "telephone": telephone or None,
-                "email": email or None,
-                "profession": profession or None,
-                "entreprise": entreprise or None
-            })
-
-        if not participants_rows:
+        if participants_rows.empty:
             return {"message": "Aucun nom trouvé dans le fichier."}
 
-        added_count = 0
-        updated_count = 0
-        skipped_count = 0
-
-        for row in participants_rows:
-            # Vérifier si le participant existe déjà par email ou nom_complet
-            existing = None
-            if row["email"]:
-                existing = db.query(Participant).filter(Participant.email == row["email"]).first()
-            
-            if not existing and row["nom_complet"]:
-                existing = db.query(Participant).filter(Participant.nom_complet == row["nom_complet"]).first()
-            
-            if existing:
-                # Mettre à jour les informations du participant existant
-                if row["nom"]:
-                    existing.nom = row["nom"].upper()
-                if row["prenom"]:
-                    existing.prenom = row["prenom"]
-                if row["nom_complet"]:
-                    existing.nom_complet = row["nom_complet"]
-                if row["telephone"]:
-                    existing.telephone = row["telephone"]
-                if row["email"]:
-                    existing.email = row["email"]
-                if row["profession"]:
-                    existing.profession = row["profession"]
-                if row["entreprise"]:
-                    existing.entreprise = row["entreprise"]
-                # Réactiver le participant s'il était désactivé
-                existing.is_active = True
-                updated_count += 1
-            else:
-                # Ajouter un nouveau participant
-                new_participant = Participant(
-                    nom=row["nom"],
-                    prenom=row["prenom"],
-                    nom_complet=row["nom_complet"],
-                    telephone=row["telephone"],
-                    email=row["email"],
-                    profession=row["profession"],
-                    entreprise=row["entreprise"],
-                    is_active=True
-                )
-                db.add(new_participant)
-                added_count += 1
-        
-        db.commit()
+        # Un seul chargement des participants existants, puis insertions / mises à jour groupées
+        with timed(timings, "upsert_ms"):
+            upserter = ParticipantUpserter(db)
+            upserter.apply(participants_rows)
+            db.commit()
 
         return {
             "filename": file.filename,
-            "participants_added": added_count,
-            "participants_updated": updated_count,
-            "sample": [row["nom_complet"] for row in participants_rows[:5]]
+            "participants_added": upserter.added,
+            "participants_updated": upserter.updated,
+            "sample": participants_rows["nom_complet"].head(5).tolist(),
+            "timings_ms": timings
         }
 
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Erreur lors de l'import : {str(e)}")
 
+@router.post("/participants/upload/stream", status_code=202)
+async def upload_participants_stream(
+    file: UploadFile = File(...),
+    column_order: str | None = Form(None),
+    current_admin: Participant = Depends(get_current_admin)
+):
+    """
+    Import en flux pour les très gros fichiers : le fichier est copié par blocs dans un fichier temporaire,
+    puis lu et importé par lots en arrière-plan. Retourne un job_id à interroger pour suivre l'avancement.
+    """
+    if not file.filename.endswith(('.csv', '.xlsx', '.xls')):
+        raise HTTPException(status_code=400, detail="Format de fichier non supporté (CSV, XLSX ou XLS uniquement)")
+
+    return await _submit_import_job(file, _import_field_order(column_order))
+
+
+@router.get("/participants/upload/jobs/{job_id}")
+def get_upload_job(job_id: str, current_admin: Participant = Depends(get_current_admin)):
+    """Avancement d'un import en flux (même contenu que /jobs/{job_id})"""
+    job = job_manager.get(job_id)
+    if not job or job["kind"] != "import":
+        raise HTTPException(status_code=404, detail="Import introuvable")
+    return job
+
 # Schema pour l'ajout d'un participant
 class ParticipantCreate(BaseModel):
     nom: str | None = None
@@ -249,12 +172,33 @@ class ParticipantLogin(BaseModel):
     email: str | None = None
 
 @router.get("/participants")
-def get_all_participants(db: Session = Depends(get_db)):
-    
-    return db.query(Participant).all()
+def get_all_participants(
+    request: Request,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+    fields: str | None = None,
+    active: bool | None = None,
+    entreprise: str | None = None,
+    include_total: bool = False,
+    db: Session = Depends(get_db)
+):
+    """
+    Participants par pages de `limit` (max 1000), triés par id : page suivante avec cursor=next_cursor.
+    `fields=id,nom_complet,...` limite les colonnes renvoyées ; filtres `active` et `entreprise`
+    (insensible à la casse) ; `include_total=true` ajoute le nombre total de participants filtrés.
+    ETag + If-None-Match : 304 tant que la table n'a pas changé.
+    """
+    filters = []
+    if active is not None:
+        filters.append(Participant.is_active.is_(active))
+    if entreprise:
+        filters.append(Participant.entreprise.ilike(entreprise.strip()))
+    return list_page(
+        request, db, Participant, parse_fields(fields, PARTICIPANT_LIST_FIELDS), filters, cursor, limit, include_total
+    )
 
 @router.post("/participants/login")
-def login_participant(payload: ParticipantLogin, db: Session = Depends(get_db)):
+async def login_participant(payload: ParticipantLogin, db: AsyncSession = Depends(get_async_db)):
     # Construire nom_complet si nom/prenom sont fournis
     if payload.nom_complet:
         nom_complet = payload.nom_complet.strip()
@@ -273,23 +217,16 @@ def login_participant(payload: ParticipantLogin, db: Session = Depends(get_db)):
     if not nom_complet and not email:
         raise HTTPException(status_code=400, detail="Nom ou email requis")
 
-    # Rechercher par nom_complet et/ou email
-    query = db.query(Participant)
+    # Rechercher par nom_complet et/ou email : égalité sur les clés normalisées indexées
+    # (insensible à la casse et aux accents)
+    query = select(Participant)
     
-    if nom_complet and email:
-        # Si les deux sont fournis, chercher avec les deux
-        query = query.filter(
-            Participant.nom_complet.ilike(nom_complet),
-            Participant.email.ilike(email)
-        )
-    elif nom_complet:
-        # Chercher uniquement par nom_complet
-        query = query.filter(Participant.nom_complet.ilike(nom_complet))
-    elif email:
-        # Chercher uniquement par email
-        query = query.filter(Participant.email.ilike(email))
-
-    participant = query.first()
+    if nom_complet:
+        query = query.filter(Participant.nom_complet_key == fold_text(nom_complet))
+    if email:
+        query = query.filter(Participant.email_key == fold_text(email))
+
+    participant = (await db.execute(query.order_by(Participant.id).limit(1))).scalars().first()
     if not participant:
         raise HTTPException(status_code=401, detail="Participant non reconnu")
 
@@ -299,29 +236,49 @@ def login_participant(payload: ParticipantLogin, db: Session = Depends(get_db)):
     }
 
 @router.get("/participants/search")
-def search_participants(q: str = "", db: Session = Depends(get_db)):
+async def search_participants(
+    q: str = "",
+    limit: int = DEFAULT_SEARCH_LIMIT,
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_async_db)
+):
     """
-    Recherche des participants par nom complet, nom ou prénom
-    Paramètre de requête 'q' : chaîne de recherche (doit contenir au moins 1 caractère)
+    Recherche des participants par nom, prénom, entreprise ou email, sans tenir compte des accents ni de la casse.
+    Chaque mot de 'q' doit correspondre au début d'un mot indexé (recherche au fil de la frappe) ;
+    résultats classés par pertinence, par pages de 'limit' (page suivante : 'cursor' = next_cursor, pagination par clé).
     """
-    if not q or len(q.strip()) < 1:
+    tokens = search_tokens(q)
+    if not tokens:
         return {
             "query": q,
             "results": [],
             "count": 0,
+            "next_cursor": None,
             "message": "Veuillez entrer au moins 1 caractère"
         }
-    
-    participants = db.query(Participant).filter(
-        (Participant.nom_complet.ilike(f"%{q}%")) |
-        (Participant.nom.ilike(f"%{q}%")) |
-        (Participant.prenom.ilike(f"%{q}%"))
-    ).all()
+
+    limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+    try:
+        statement = search_ids_statement(tokens, limit + 1, decode_search_cursor(cursor))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    # Une ligne de plus que la page pour savoir s'il existe une page suivante ; curseur = clé de la dernière ligne
+    rows = (await db.execute(statement)).all()
+    next_cursor = encode_search_cursor(rows[limit - 1].score, rows[limit - 1].id) if len(rows) > limit else None
+    ids = [row.id for row in rows[:limit]]
+
+    by_id = {
+        participant.id: participant
+        for participant in (await db.execute(select(Participant).filter(Participant.id.in_(ids)))).scalars()
+    } if ids else {}
+    participants = [by_id[participant_id] for participant_id in ids if participant_id in by_id]
     
     return {
         "query": q,
         "results": participants,
-        "count": len(participants)
+        "count": len(participants),
+        "next_cursor": next_cursor
     }
 
     # ajouter un bouton de suppression à côté de chaque participant ainsi qu'un bouton de modification dans l'interface d'administration pour pouvoir corriger les erreurs d'import ou les fautes de frappe, etc.
@@ -457,47 +414,75 @@ class ParticipantSessionTables(BaseModel):
     session_id: int
     tables: list[ParticipantTableInfo]
 
-@router.get("/participants/name/{participant_name}/tables") # pour l'orga
-def get_participant_tables_by_name(
-    participant_name: str,
-    db: Session = Depends(get_db)
-):
+async def _session_row(db: AsyncSession, session_id: int):
+    session = (await db.execute(
+        select(MeetingSession.id, MeetingSession.created_at).filter(MeetingSession.id == session_id)
+    )).first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Session non trouvée")
+    return session
+
+
+async def _participant_current_session(db: AsyncSession, participant_id: int):
     """
-    Récupère toutes les tables assignées à un participant par son nom pour la dernière session.
-    Les données proviennent directement du JSON rounds_data de la session.
+    Session courante d'un participant, déduite de ses affectations et non d'un paramètre du client :
+    l'organisateur est celui de la dernière session où il a une place (index (participant_id, session_id)),
+    puis le pointeur en mémoire donne la session courante de cet organisateur (relue en base sans tri).
     """
-    # Vérifier que le participant existe
-    participant = db.query(Participant).filter(Participant.nom_complet == participant_name).first()
+    latest = (await db.execute(latest_participant_session_statement(participant_id))).first()
+    if latest is None:
+        raise HTTPException(status_code=404, detail="Aucune session n'a été générée pour ce participant")
+    if latest.organizer is None:
+        return latest
+    session_id = await active_sessions.aget(latest.organizer, lambda: db.scalar(current_session_statement(latest.organizer)))
+    # Cas courant : sa dernière session est la session courante de l'organisateur, déjà lue
+    return latest if session_id == latest.id else await _session_row(db, session_id)
+
+
+async def _participant_by_name(db: AsyncSession, participant_name: str) -> Participant:
+    participant = (await db.execute(
+        select(Participant).filter(Participant.nom_complet == participant_name).limit(1)
+    )).scalars().first()
     if not participant:
         raise HTTPException(status_code=404, detail=f"Participant '{participant_name}' non trouvé")
-    
-    # Récupérer la dernière session générée
-    session = db.query(MeetingSession).order_by(MeetingSession.created_at.desc()).first()
-    if not session:
-        raise HTTPException(status_code=404, detail="Aucune session n'a été générée")
-    
-    # Parcourir les rounds_data JSON pour trouver les tables du participant
-    tables_assignments = []
-    
-    if session.rounds_data:
-        for round_data in session.rounds_data:
-            round_num = round_data.get("round", 0)
-            tables_in_round = round_data.get("tables", [])
-            
-            for table_info in tables_in_round:
-                members = table_info.get("members", [])
-                # Vérifier si le participant est dans cette table
-                if participant_name in members:
-                    autres_participants = [m for m in members if m != participant_name and "rien" not in m.lower()]
-                    tables_assignments.append({
-                        "round_number": round_num,
-                        "table_id": table_info.get("table_id"),
-                        "table_name": table_info.get("table_name", f"Table {table_info.get('table_id')}"),
-                        "autres_participants": autres_participants
-                    })
-                    break  # Un participant ne peut être qu'à une seule table par round
+    return participant
+
+
+async def _participant_by_id(db: AsyncSession, participant_id: int) -> Participant:
+    participant = await db.get(Participant, participant_id)
+    if not participant:
+        raise HTTPException(status_code=404, detail="Participant non trouvé")
+    return participant
+
+
+async def _participant_stops(db: AsyncSession, session_id: int, participant_id: int):
+    """Affectations du participant dans la session : [(rotation, table_id, nom de table, id de la ligne Table)]"""
+    return (await db.execute(participant_stops_statement(session_id, participant_id))).all()
+
+
+async def _table_members(db: AsyncSession, session_id: int, participant_id: int, stops) -> dict:
+    """(rotation, id de la ligne Table) -> noms des autres membres de la table"""
+    members = {}
+    if stops:
+        for round_number, table_pk, member_id, nom_complet in await db.execute(table_members_statement(session_id, stops)):
+            if member_id != participant_id:
+                members.setdefault((round_number, table_pk), []).append(nom_complet)
+    return members
+
+
+def _tables_response(participant: Participant, session, stops, members: dict) -> dict:
+    tables_assignments = [
+        {
+            "round_number": round_num,
+            "table_id": table_id,
+            "table_name": table_name,
+            "autres_participants": members.get((round_num, table_pk), [])
+        }
+        for round_num, table_id, table_name, table_pk in stops
+    ]
     
     return {
+        "participant_id": participant.id,
         "participant_name": participant.nom_complet,
         "session_id": session.id,
         "session_date": session.created_at,
@@ -506,51 +491,181 @@ def get_participant_tables_by_name(
         "message": f"{participant.nom_complet} doit se rendre aux tables suivantes"
     }
 
-@router.get("/participants/name/{participant_name}/itinerary") # pour le participant (itinéraire simplifié) - peut être utilisé pour l'affichage sur écran ou mobile
-def get_participant_itinerary(
-    participant_name: str,
-    db: Session = Depends(get_db)
-):
-    """
-    Itinéraire simplifié du participant : juste les numéros de tables par rotation
-    Format: Rotation 1 = Table 3, Rotation 2 = Table 5, etc.
-    """
-    # Vérifier que le participant existe
-    participant = db.query(Participant).filter(Participant.nom_complet == participant_name).first()
-    if not participant:
-        raise HTTPException(status_code=404, detail=f"Participant '{participant_name}' non trouvé")
-    
-    # Récupérer la dernière session générée
-    session = db.query(MeetingSession).order_by(MeetingSession.created_at.desc()).first()
-    if not session:
-        raise HTTPException(status_code=404, detail="Aucune session n'a été générée")
-    
+
+def _itinerary_response(participant: Participant, session, stops) -> dict:
     # Construire l'itinéraire simplifié
-    itinerary = []
-    
-    if session.rounds_data:
-        for round_data in session.rounds_data:
-            round_num = round_data.get("round", 0)
-            tables_in_round = round_data.get("tables", [])
-            
-            for table_info in tables_in_round:
-                members = table_info.get("members", [])
-                # Vérifier si le participant est dans cette table
-                if participant_name in members:
-                    itinerary.append({
-                        "rotation": round_num,
-                        "table": table_info.get("table_id"),
-                        "table_name": table_info.get("table_name", f"Table {table_info.get('table_id')}"),
-                    })
-                    break
+    itinerary = [
+        {"rotation": round_num, "table": table_id, "table_name": table_name}
+        for round_num, table_id, table_name, _ in stops
+    ]
     
     # Formatage lisible pour l'affichage
     itinerary_text = ", ".join([f"Rotation {item['rotation']} = {item['table_name']}" for item in itinerary])
     
     return {
+        "participant_id": participant.id,
         "participant": participant.nom_complet,
+        "session_id": session.id,
         "total_rotations": len(itinerary),
         "itinerary": itinerary,
         "itinerary_text": itinerary_text or "Aucune table assignée"
     }
 
+
+async def _current_tables(db: AsyncSession, participant: Participant) -> dict:
+    session = await _participant_current_session(db, participant.id)
+    stops = await _participant_stops(db, session.id, participant.id)
+    return _tables_response(participant, session, stops, await _table_members(db, session.id, participant.id, stops))
+
+
+async def _current_itinerary(db: AsyncSession, participant: Participant) -> dict:
+    session = await _participant_current_session(db, participant.id)
+    return _itinerary_response(participant, session, await _participant_stops(db, session.id, participant.id))
+
+
+@router.get("/participants/name/{participant_name}/tables") # pour l'orga
+async def get_participant_tables_by_name(participant_name: str, db: AsyncSession = Depends(get_async_db)):
+    """
+    Récupère toutes les tables assignées à un participant par son nom pour sa session courante
+    (dernière session générée par l'organisateur de ses sessions).
+    Les affectations sont lues par les index de participant_table_assignments.
+    """
+    # Vérifier que le participant existe
+    participant = await _participant_by_name(db, participant_name)
+    return await _current_tables(db, participant)
+
+@router.get("/participants/name/{participant_name}/itinerary") # pour le participant (itinéraire simplifié) - peut être utilisé pour l'affichage sur écran ou mobile
+async def get_participant_itinerary(participant_name: str, db: AsyncSession = Depends(get_async_db)):
+    """
+    Itinéraire simplifié du participant : juste les numéros de tables par rotation
+    Format: Rotation 1 = Table 3, Rotation 2 = Table 5, etc.
+    """
+    # Vérifier que le participant existe
+    participant = await _participant_by_name(db, participant_name)
+    return await _current_itinerary(db, participant)
+
+
+@router.get("/participants/{participant_id}/tables")
+async def get_participant_tables(participant_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Tables d'un participant (par identifiant, sans ambiguïté entre homonymes) pour sa session courante"""
+    return await _current_tables(db, await _participant_by_id(db, participant_id))
+
+
+@router.get("/participants/{participant_id}/itinerary")
+async def get_participant_itinerary_by_id(participant_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Itinéraire simplifié d'un participant (par identifiant) pour sa session courante"""
+    return await _current_itinerary(db, await _participant_by_id(db, participant_id))
+
+
+@router.get("/sessions/{session_id}/participants/{participant_id}/tables")
+async def get_session_participant_tables(
+    session_id: int,
+    participant_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Tables d'un participant (par identifiant) pour une session donnée : lectures indexées par
+    (session, participant), indépendantes de la session courante (plusieurs événements en parallèle).
+    """
+    participant = await _participant_by_id(db, participant_id)
+    session = await _session_row(db, session_id)
+    stops = await _participant_stops(db, session.id, participant.id)
+    return _tables_response(participant, session, stops, await _table_members(db, session.id, participant.id, stops))
+
+
+@router.get("/sessions/{session_id}/participants/{participant_id}/itinerary")
+async def get_session_participant_itinerary(
+    session_id: int,
+    participant_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Itinéraire simplifié d'un participant (par identifiant) pour une session donnée"""
+    participant = await _participant_by_id(db, participant_id)
+    session = await _session_row(db, session_id)
+    return _itinerary_response(participant, session, await _participant_stops(db, session.id, participant.id))
+
+
+def _rotation_event(snapshot: dict, tables_by_round: dict) -> str:
+    """Évènement SSE d'un état de l'horloge, personnalisé avec la table du participant"""
+    data = dict(snapshot)
+    if snapshot["ended"]:
+        event = "end"
+        data["message"] = "La session est terminée"
+    elif snapshot["round"] is None:
+        event = "waiting"
+        data["message"] = "En attente du lancement de la première rotation"
+    else:
+        event = "rotation"
+        table_id, table_name = tables_by_round.get(snapshot["round"], (None, None))
+        data.update(table=table_id, table_name=table_name)
+        data["message"] = (
+            f"Rotation {snapshot['round']} : rendez-vous à la {table_name}" if table_name
+            else f"Rotation {snapshot['round']} : pas de table pour vous"
+        )
+    event_id = f"id: {snapshot['round']}\n" if snapshot["round"] is not None else ""
+    return f"{event_id}event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _participant_tables_by_round(db: AsyncSession, session_id: int, participant_id: int) -> dict:
+    """rotation -> (table_id, nom de table) du participant"""
+    return {
+        round_num: (table_id, table_name)
+        for round_num, table_id, table_name, _ in await _participant_stops(db, session_id, participant_id)
+    }
+
+
+async def _rotation_stream(session_id: int, participant_id: int, clock: RotationClock, index, tables_by_round: dict):
+    queue = rotation_broadcaster.subscribe(session_id, clock)
+    try:
+        yield f"retry: {settings.SSE_RETRY_MS}\n\n"
+        while True:
+            try:
+                snapshot = await asyncio.wait_for(queue.get(), settings.SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            # Index reconstruit par une replanification : tables du participant relues une fois
+            current = itinerary_cache.lookup(session_id)
+            if current is not None and current is not index:
+                index = current
+                async with AsyncSessionLocal() as db:
+                    tables_by_round = await _participant_tables_by_round(db, session_id, participant_id)
+            yield _rotation_event(snapshot, tables_by_round)
+            if snapshot["ended"]:
+                return
+    finally:
+        rotation_broadcaster.unsubscribe(session_id, queue)
+
+
+@router.get("/sessions/{session_id}/participants/{participant_id}/events")
+async def stream_participant_rotations(session_id: int, participant_id: int):
+    """
+    Flux SSE (text/event-stream) des rotations d'une session pour un participant :
+    "waiting" tant que l'horloge n'est pas lancée, puis un évènement "rotation" (rotation, table, heure de fin)
+    à chaque démarrage de rotation, et "end" à la fin de la session.
+    La base n'est lue qu'à la connexion (et après une replanification) : les changements sont poussés
+    par le diffuseur en mémoire.
+    """
+    # Session dédiée et refermée avant le flux : aucune connexion du pool n'est gardée par les clients connectés
+    async with AsyncSessionLocal() as db:
+        participant = await _participant_by_id(db, participant_id)
+        session = (await db.execute(
+            select(
+                MeetingSession.id, MeetingSession.is_active, MeetingSession.total_duration_minutes,
+                MeetingSession.current_round, MeetingSession.round_started_at
+            ).filter(MeetingSession.id == session_id)
+        )).first()
+        if not session:
+            raise HTTPException(status_code=404, detail="Session non trouvée")
+        index = await itinerary_cache.aget(
+            session.id,
+            lambda: db.scalar(select(MeetingSession.rounds_data).filter(MeetingSession.id == session.id))
+        )
+        tables_by_round = await _participant_tables_by_round(db, session.id, participant.id)
+
+    clock = RotationClock.from_session(session, index.round_numbers)
+    return StreamingResponse(
+        _rotation_stream(session.id, participant.id, clock, index, tables_by_round),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
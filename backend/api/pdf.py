@@ -1,13 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import StreamingResponse
+import os
+import tempfile
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import FileResponse, JSONResponse, Response
 from sqlalchemy.orm import Session
+from starlette.background import BackgroundTask
 
+from core.config import settings
+from core.itinerary_cache import itinerary_cache
+from core.jobs import job_manager, store_job_file
 from db.database import get_db
 from db.models import MeetingSession
-from utils.pdf import build_rotation_pdf
+from db.assignments import session_itineraries
+from utils.cards import build_itinerary_cards, collect_cards, collect_participant_cards
+from utils.export import EXPORT_GRIDS, write_grid_csv, write_grid_xlsx
+from utils.pdf import render_rotation_pdf_file
+from utils.pdf_cache import etag_matches, pdf_cache, pdf_cache_key, rounds_digest
 
 router = APIRouter()
 
+CARD_MEDIA_TYPES = {"pdf": "application/pdf", "zip": "application/zip"}
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
 
 def _get_session_or_404(session_id: int, db: Session) -> MeetingSession:
     session = db.query(MeetingSession).filter(MeetingSession.id == session_id).first()
@@ -16,51 +33,211 @@ def _get_session_or_404(session_id: int, db: Session) -> MeetingSession:
     return session
 
 
+def _session_digest(session_id: int, db: Session) -> str:
+    """rounds_digest de la session (colonne seule) ; calculé et enregistré une fois pour les sessions antérieures"""
+    row = db.query(MeetingSession.id, MeetingSession.rounds_digest).filter(MeetingSession.id == session_id).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Session non trouvee")
+    if row.rounds_digest is not None:
+        return row.rounds_digest
+    session = db.query(MeetingSession).filter(MeetingSession.id == session_id).first()
+    session.rounds_digest = rounds_digest(session.rounds_data)
+    db.commit()
+    return session.rounds_digest
+
+
+def _wants_job(background, rounds_data) -> bool:
+    """Tâche de fond si demandée, sinon au-delà de JOB_PDF_THRESHOLD affectations"""
+    if background is None:
+        assignments = sum(
+            len(table.get("members", [])) for round_data in rounds_data for table in round_data.get("tables", [])
+        )
+        return assignments > settings.JOB_PDF_THRESHOLD
+    return background
+
+
+def _submit_pdf_job(session_id, key, rounds_data, company, location, date, include_logos, filename):
+    """
+    Planifie la construction du PDF dans le pool de processus. Le processus écrit directement
+    dans un fichier du cache ; le fichier est téléchargeable une fois la tâche terminée.
+    """
+    def finalize(job_id, tmp_path):
+        path = pdf_cache.adopt(session_id, key, tmp_path)
+        return store_job_file(job_id, path, filename, "application/pdf")
+
+    job_id = job_manager.submit(
+        "pdf", render_rotation_pdf_file, pdf_cache.reserve(), rounds_data, company, location, date, include_logos,
+        finalize=finalize
+    )
+    return JSONResponse(status_code=202, content={"job_id": job_id, "status": "pending", "status_url": f"/api/jobs/{job_id}"})
+
+
+def _rotation_pdf_response(
+    request: Request,
+    session_id: int,
+    db: Session,
+    plan: str,
+    include_logos: bool,
+    company: str | None,
+    location: str | None,
+    date: str | None,
+    background: bool | None,
+):
+    """
+    PDF du plan de rotation, servi depuis le cache disque quand il existe.
+    L'ETag est la clé de contenu, dérivée de rounds_digest : un client qui renvoie If-None-Match reçoit 304
+    sans que rounds_data soit chargé ; les rotations ne sont lues que pour un rendu.
+    """
+    digest = _session_digest(session_id, db)
+    key = pdf_cache_key(session_id, digest, company, location, date, include_logos)
+    etag = f'"{key}"'
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    filename = f"plan-rotation-{plan}-{session_id}.pdf"
+    headers = {"ETag": etag, "Content-Disposition": f"attachment; filename={filename}"}
+
+    path = pdf_cache.get(session_id, key)
+    if path is None:
+        rounds_data = db.query(MeetingSession.rounds_data).filter(MeetingSession.id == session_id).scalar() or []
+        if _wants_job(background, rounds_data):
+            return _submit_pdf_job(session_id, key, rounds_data, company, location, date, include_logos, filename)
+
+        # Rendu directement dans le fichier du cache (à partir de l'index partagé), puis envoi par blocs depuis le disque
+        index = itinerary_cache.get(session_id, lambda: rounds_data)
+        path = pdf_cache.store(
+            session_id, key,
+            lambda output: render_rotation_pdf_file(output, index, company, location, date, include_logos)
+        )
+
+    return FileResponse(path, media_type="application/pdf", headers=headers)
+
+
 @router.get("/sessions/{session_id}/pdf/free")
 def download_free_pdf(
+    request: Request,
     session_id: int,
     company: str | None = None,
     location: str | None = None,
     date: str | None = None,
+    background: bool | None = None,
     db: Session = Depends(get_db)
 ):
-    session = _get_session_or_404(session_id, db)
-    pdf_bytes = build_rotation_pdf(
-        session.rounds_data or [],
-        event_company=company,
-        event_location=location,
-        event_date=date,
-        include_logos=False,
-    )
-
-    filename = f"plan-rotation-free-{session_id}.pdf"
-    return StreamingResponse(
-        iter([pdf_bytes]),
-        media_type="application/pdf",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
-    )
+    return _rotation_pdf_response(request, session_id, db, "free", False, company, location, date, background)
 
 
 @router.get("/sessions/{session_id}/pdf/paid")
 def download_paid_pdf(
+    request: Request,
     session_id: int,
     company: str | None = None,
     location: str | None = None,
     date: str | None = None,
+    background: bool | None = None,
     db: Session = Depends(get_db)
 ):
+    return _rotation_pdf_response(request, session_id, db, "paid", True, company, location, date, background)
+
+
+def _session_cards(session_id, rounds_data, db: Session):
+    """Cartes des participants (affectations, QR code vers l'itinéraire de la session), ou du plan gratuit (index)"""
+    itineraries = session_itineraries(db, session_id)
+    if itineraries:
+        return collect_participant_cards(session_id, itineraries)
+    return collect_cards(itinerary_cache.get(session_id, lambda: rounds_data))
+
+
+def _build_cards_file(cards, output_format, company, location, date, progress=None):
+    """Cartes d'itinéraire dans un fichier temporaire (le pool de processus est utilisé par build_itinerary_cards)"""
+    fd, path = tempfile.mkstemp(suffix=f".{output_format}")
+    os.close(fd)
+    try:
+        return build_itinerary_cards(path, cards, output_format, company, location, date, progress=progress)
+    except Exception:
+        os.remove(path)
+        raise
+
+
+@router.get("/sessions/{session_id}/cards")
+def download_itinerary_cards(
+    session_id: int,
+    format: str = "pdf",
+    company: str | None = None,
+    location: str | None = None,
+    date: str | None = None,
+    background: bool | None = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Cartes d'itinéraire personnelles (rotation -> table et QR code vers l'itinéraire) de tous les participants :
+    un PDF multipage (format=pdf) ou un ZIP d'un PDF par participant (format=zip).
+    """
+    if format not in CARD_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="Format invalide (pdf ou zip)")
+
     session = _get_session_or_404(session_id, db)
-    pdf_bytes = build_rotation_pdf(
-        session.rounds_data or [],
-        event_company=company,
-        event_location=location,
-        event_date=date,
-        include_logos=True,
+    rounds_data = session.rounds_data or []
+    filename = f"cartes-itineraire-{session_id}.{format}"
+    cards = _session_cards(session_id, rounds_data, db)
+
+    if _wants_job(background, rounds_data):
+        def finalize(job_id, path):
+            try:
+                return store_job_file(job_id, path, filename, CARD_MEDIA_TYPES[format])
+            finally:
+                os.remove(path)
+
+        job_id = job_manager.submit(
+            "cards", _build_cards_file, cards, format, company, location, date,
+            finalize=finalize, use_processes=False
+        )
+        return JSONResponse(status_code=202, content={"job_id": job_id, "status": "pending", "status_url": f"/api/jobs/{job_id}"})
+
+    path = _build_cards_file(cards, format, company, location, date)
+    return FileResponse(
+        path,
+        media_type=CARD_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+        background=BackgroundTask(os.remove, path)
     )
 
-    filename = f"plan-rotation-paid-{session_id}.pdf"
-    return StreamingResponse(
-        iter([pdf_bytes]),
-        media_type="application/pdf",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
+
+@router.get("/sessions/{session_id}/export")
+def export_rotation_grid(
+    session_id: int,
+    format: str = "csv",
+    grid: str = "participants",
+    db: Session = Depends(get_db)
+):
+    """
+    Plan de rotation en tableur, sans passer par ReportLab : CSV d'une grille
+    (grid=participants : table par rotation, grid=tables : participants par rotation)
+    ou XLSX contenant les deux grilles.
+    """
+    if format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="Format invalide (csv ou xlsx)")
+    if grid not in EXPORT_GRIDS:
+        raise HTTPException(status_code=400, detail="Grille invalide (participants ou tables)")
+
+    session = _get_session_or_404(session_id, db)
+    index = itinerary_cache.get(session_id, lambda: session.rounds_data or [])
+
+    fd, path = tempfile.mkstemp(suffix=f".{format}")
+    os.close(fd)
+    try:
+        if format == "csv":
+            write_grid_csv(path, index, grid)
+            filename = f"plan-rotation-{grid}-{session_id}.csv"
+        else:
+            write_grid_xlsx(path, index)
+            filename = f"plan-rotation-{session_id}.xlsx"
+    except Exception:
+        os.remove(path)
+        raise
+
+    return FileResponse(
+        path,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+        background=BackgroundTask(os.remove, path)
     )
@@ -0,0 +1,367 @@
+"""
+Benchmarks du coeur de planification et des endpoints de consultation.
+
+Usage (depuis le dossier backend) :
+    python -m benchmarks.bench --output bench.json
+    python -m benchmarks.bench --quick --compare bench.json --tolerance 0.25
+
+Chaque cas mesure le temps (meilleur de --repeat exécutions), le pic mémoire (tracemalloc)
+et, pour la génération, les indicateurs de qualité du planning. Avec --compare, les cas plus
+lents que la référence au-delà de la tolérance sont signalés et le code de sortie vaut 1.
+
+La suite `load` envoie des requêtes concurrentes (connexion puis itinéraire) à l'application ASGI
+et compare les routes asynchrones à une version synchrone de référence (requêtes/s, p95).
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from core.logic import generate_rounds
+from core.metrics import compute_metrics
+
+# Grille (participants, tables, rotations) : tables de 8 personnes environ
+FULL_GRID = [
+    (participants, max(1, participants // 8), rounds)
+    for participants in (50, 200, 1000, 5000, 10000)
+    for rounds in (5, 10, 20)
+]
+QUICK_GRID = [(50, 6, 5), (200, 25, 10), (1000, 125, 10)]
+
+ITINERARY_SIZES = (200, 1000)
+# (participants, clients simultanés), requêtes par cas
+LOAD_CASES = [(1000, 50), (1000, 200)]
+QUICK_LOAD_CASES = [(200, 50)]
+LOAD_REQUESTS = 2000
+PDF_SIZES = (100, 500, 2000)
+
+
+def _measure(func, repeat):
+    """
+    (meilleur temps en ms, pic mémoire en Ko, résultat).
+    Les temps sont pris sans tracemalloc (qui ralentit fortement l'exécution),
+    le pic mémoire est mesuré lors d'une exécution supplémentaire.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    result = func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return round(best, 3), round(peak / 1024, 1), result
+
+
+def bench_generation(grid, repeat):
+    results = {}
+    for participants, tables, rounds in grid:
+        wall_ms, peak_kb, result = _measure(lambda: generate_rounds(participants, tables, rounds, seed=1), repeat)
+        metrics = compute_metrics(result["rounds"], tables)
+        name = f"generate_rounds[{participants}p-{tables}t-{rounds}r]"
+        results[name] = {
+            "wall_ms": wall_ms,
+            "peak_kb": peak_kb,
+            "strategy": result["metadata"]["strategy"],
+            "repeat_encounters": metrics["repeat_encounters"],
+            "people_met_min": metrics["people_met"]["min"],
+            "table_hops_mean": metrics["table_hops"]["mean"],
+        }
+        print(f"{name}: {wall_ms} ms, {peak_kb} Ko, doublons {metrics['repeat_encounters']}")
+    return results
+
+
+def _synthetic_session(db, participants, tables, rounds):
+    """
+    Crée des participants et une session générée dans la base de benchmark, enregistrée comme par /generate :
+    organisateur par défaut et affectations normalisées (lues par les routes d'itinéraire)
+    """
+    from core.active_sessions import default_organizer
+    from db.assignments import participant_seats, store_assignments
+    from db.models import MeetingSession, Participant
+
+    names = [f"Prenom{i} NOM{i}" for i in range(participants)]
+    rows = [Participant(nom=f"NOM{i}", prenom=f"Prenom{i}", nom_complet=name, is_active=True) for i, name in enumerate(names)]
+    db.add_all(rows)
+    db.flush()
+    seats = participant_seats(rows)
+    result = generate_rounds(list(seats), tables, rounds, seed=1)
+    session = MeetingSession(
+        number_of_rounds=rounds, number_of_tables=tables, rounds_data=result["rounds"], organizer=default_organizer()
+    )
+    db.add(session)
+    db.flush()
+    store_assignments(db, session.id, result["rounds"], seats)
+    db.commit()
+    return names, session
+
+
+def bench_itinerary(sizes, repeat, lookups=200):
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from api.participant import get_participant_itinerary, get_participant_tables_by_name
+    from core.active_sessions import active_sessions
+    from core.itinerary_cache import itinerary_cache
+    from db.database import Base, create_async_db_engine
+
+    results = {}
+    loop = asyncio.new_event_loop()
+    with tempfile.TemporaryDirectory() as tmp:
+        for participants in sizes:
+            url = f"sqlite:///{os.path.join(tmp, f'bench_{participants}.db')}"
+            engine = create_engine(url)
+            Base.metadata.create_all(bind=engine)
+            db = sessionmaker(bind=engine)()
+            names, _ = _synthetic_session(db, participants, max(1, participants // 8), 10)
+            db.close()
+            sample = [names[i * len(names) // lookups] for i in range(min(lookups, len(names)))]
+            async_engine = create_async_db_engine(url)
+            async_db = AsyncSession(async_engine)
+
+            for label, endpoint in (("itinerary", get_participant_itinerary), ("tables", get_participant_tables_by_name)):
+                async def lookup_all():
+                    for name in sample:
+                        await endpoint(name, db=async_db)
+
+                def run():
+                    itinerary_cache.invalidate()
+                    active_sessions.invalidate()
+                    loop.run_until_complete(lookup_all())
+
+                wall_ms, peak_kb, _ = _measure(run, repeat)
+                name = f"{label}[{participants}p-{len(sample)}lookups]"
+                results[name] = {"wall_ms": wall_ms, "peak_kb": peak_kb, "per_lookup_ms": round(wall_ms / len(sample), 4)}
+                print(f"{name}: {wall_ms} ms ({results[name]['per_lookup_ms']} ms/lookup)")
+            loop.run_until_complete(async_db.close())
+            loop.run_until_complete(async_engine.dispose())
+            engine.dispose()
+    loop.close()
+    return results
+
+
+def _sync_reference_router(sync_session):
+    """
+    Routes de connexion et d'itinéraire en `def` + Session synchrone, servies par le pool de threads
+    de Starlette : mêmes requêtes que les routes asynchrones, référence de la suite `load`.
+    """
+    from fastapi import APIRouter, Depends, HTTPException
+
+    from api.participant import ParticipantLogin
+    from core.active_sessions import active_sessions, current_session_statement
+    from db.assignments import latest_participant_session_statement, participant_stops_statement
+    from db.models import Participant
+    from utils.text import fold_text
+
+    router = APIRouter()
+
+    def get_sync_db():
+        db = sync_session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @router.post("/sync/participants/login")
+    def login(payload: ParticipantLogin, db=Depends(get_sync_db)):
+        participant = db.query(Participant).filter(Participant.nom_complet_key == fold_text(payload.nom_complet)).first()
+        if not participant:
+            raise HTTPException(status_code=401, detail="Participant non reconnu")
+        return {"token": f"participant:{participant.id}", "participant": participant}
+
+    @router.get("/sync/participants/name/{participant_name}/itinerary")
+    def itinerary(participant_name: str, db=Depends(get_sync_db)):
+        participant = db.query(Participant).filter(Participant.nom_complet == participant_name).first()
+        if not participant:
+            raise HTTPException(status_code=404, detail="Participant non trouvé")
+        latest = db.execute(latest_participant_session_statement(participant.id)).first()
+        if latest is None:
+            raise HTTPException(status_code=404, detail="Aucune session n'a été générée pour ce participant")
+        session_id = active_sessions.get(latest.organizer, lambda: db.scalar(current_session_statement(latest.organizer)))
+        stops = [
+            {"rotation": r, "table": t, "table_name": n}
+            for r, t, n, _ in db.execute(participant_stops_statement(session_id, participant.id))
+        ]
+        return {"participant": participant.nom_complet, "total_rotations": len(stops), "itinerary": stops}
+
+    return router
+
+
+async def _load_run(app, names, clients, total, prefix):
+    """`clients` clients simultanés, chacun enchaînant connexion puis itinéraire ; (requêtes/s, p50 ms, p95 ms)"""
+    import httpx
+
+    latencies = []
+    counter = iter(range(total // 2))
+
+    async def client(http):
+        for i in counter:
+            name = names[i % len(names)]
+            for method, path, body in (
+                ("POST", f"{prefix}/participants/login", {"nom_complet": name}),
+                ("GET", f"{prefix}/participants/name/{name}/itinerary", None),
+            ):
+                start = time.perf_counter()
+                response = await http.request(method, path, json=body)
+                latencies.append((time.perf_counter() - start) * 1000)
+                response.raise_for_status()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        start = time.perf_counter()
+        await asyncio.gather(*(client(http) for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    return (
+        round(len(latencies) / elapsed, 1),
+        round(latencies[len(latencies) // 2], 2),
+        round(latencies[int(len(latencies) * 0.95)], 2),
+    )
+
+
+def bench_load(cases, total=LOAD_REQUESTS):
+    from fastapi import FastAPI
+
+    from api.participant import router as participant_router
+    from core.active_sessions import active_sessions
+    from core.itinerary_cache import itinerary_cache
+    from db.database import Base, create_async_db_engine, create_db_engine, get_async_db
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for participants, clients in cases:
+            url = f"sqlite:///{os.path.join(tmp, f'load_{participants}.db')}"
+            engine = create_db_engine(url)
+            Base.metadata.create_all(bind=engine)
+            sync_session = sessionmaker(bind=engine)
+            db = sync_session()
+            names, _ = _synthetic_session(db, participants, max(1, participants // 8), 10)
+            db.close()
+
+            async_engine = create_async_db_engine(url)
+            async_session = async_sessionmaker(async_engine, expire_on_commit=False)
+
+            async def override_async_db():
+                async with async_session() as session:
+                    yield session
+
+            app = FastAPI()
+            app.include_router(participant_router, prefix="/api")
+            app.include_router(_sync_reference_router(sync_session), prefix="/api")
+            app.dependency_overrides[get_async_db] = override_async_db
+
+            async def run_all():
+                measures = {}
+                for label, prefix in (("sync", "/api/sync"), ("async", "/api")):
+                    itinerary_cache.invalidate()
+                    active_sessions.invalidate()
+                    await _load_run(app, names, clients, min(200, total), prefix)  # chauffe (pool, cache)
+                    measures[label] = await _load_run(app, names, clients, total, prefix)
+                await async_engine.dispose()
+                return measures
+
+            measures = asyncio.run(run_all())
+            for label, (rps, p50, p95) in measures.items():
+                name = f"load_{label}[{participants}p-{clients}clients-{total}req]"
+                results[name] = {"wall_ms": round(total / rps * 1000, 1), "requests_per_s": rps, "p50_ms": p50, "p95_ms": p95}
+                print(f"{name}: {rps} req/s, p50 {p50} ms, p95 {p95} ms")
+            speedup = measures["async"][0] / measures["sync"][0]
+            print(f"  async / sync : x{speedup:.2f} requêtes/s")
+            engine.dispose()
+    return results
+
+
+def bench_pdf(sizes, repeat):
+    from utils.pdf import build_rotation_pdf, write_rotation_pdf
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "plan.pdf")
+        for participants in sizes:
+            tables = max(1, participants // 8)
+            rounds = generate_rounds([str(i + 1) for i in range(participants)], tables, 10, seed=1)["rounds"]
+            cases = (
+                ("build_rotation_pdf", lambda: build_rotation_pdf(rounds, event_company="Bench")),
+                ("write_rotation_pdf", lambda: write_rotation_pdf(output, rounds, event_company="Bench")),
+            )
+            for label, func in cases:
+                wall_ms, peak_kb, _ = _measure(func, repeat)
+                name = f"{label}[{participants}p-{tables}t-10r]"
+                results[name] = {"wall_ms": wall_ms, "peak_kb": peak_kb}
+                print(f"{name}: {wall_ms} ms, {peak_kb} Ko")
+    return results
+
+
+def compare(current, baseline, tolerance):
+    """Liste des cas dont le temps dépasse la référence de plus de `tolerance` (ratio)"""
+    regressions = []
+    for name, values in current["results"].items():
+        reference = baseline.get("results", {}).get(name)
+        if not reference or not reference.get("wall_ms"):
+            continue
+        ratio = values["wall_ms"] / reference["wall_ms"]
+        status = "REGRESSION" if ratio > 1 + tolerance else "ok"
+        print(f"{status:<10} {name}: {reference['wall_ms']} ms -> {values['wall_ms']} ms (x{ratio:.2f})")
+        if status == "REGRESSION":
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks Speed Meeting")
+    parser.add_argument("--quick", action="store_true", help="grille réduite (quelques secondes)")
+    parser.add_argument("--repeat", type=int, default=3, help="exécutions par cas (meilleur temps retenu)")
+    parser.add_argument("--only", choices=["generation", "itinerary", "pdf", "load"], action="append", help="limiter aux suites indiquées")
+    parser.add_argument("--output", help="fichier JSON où écrire les résultats")
+    parser.add_argument("--compare", help="fichier JSON de référence")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="ralentissement toléré avant régression (0.2 = +20%%)")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+    suites = args.only or ["generation", "itinerary", "pdf", "load"]
+    results = {}
+    if "generation" in suites:
+        results.update(bench_generation(QUICK_GRID if args.quick else FULL_GRID, args.repeat))
+    if "itinerary" in suites:
+        results.update(bench_itinerary(ITINERARY_SIZES[:1] if args.quick else ITINERARY_SIZES, args.repeat))
+    if "pdf" in suites:
+        results.update(bench_pdf(PDF_SIZES[:1] if args.quick else PDF_SIZES, args.repeat))
+    if "load" in suites:
+        results.update(bench_load(QUICK_LOAD_CASES if args.quick else LOAD_CASES))
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2, ensure_ascii=False)
+        print(f"Résultats écrits dans {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} régression(s) détectée(s)")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+import logging
+import threading
+import time
+
+from sqlalchemy import select
+
+from core.config import settings
+from db.models import MeetingSession
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def default_organizer() -> str:
+    """Organisateur des sessions créées sans identification (compte admin unique) ; jamais utilisé pour une lecture"""
+    return settings.ADMIN_USERNAME or "admin"
+
+
+def current_session_statement(organizer: str):
+    """
+    Session courante d'un organisateur : sa dernière session générée (en cours, ou la dernière terminée).
+    Lecture de l'index (organizer, id), sans tri de la table sessions.
+    """
+    return (
+        select(MeetingSession.id)
+        .filter(MeetingSession.organizer == organizer)
+        .order_by(MeetingSession.id.desc())
+        .limit(1)
+    )
+
+
+class ActiveSessionRegistry:
+    """
+    Pointeur en mémoire vers la session courante de chaque organisateur.
+    Mis à jour par la génération (set) et la fin de session (invalidate) ; relu en base
+    à l'expiration du TTL, pour suivre les sessions créées par un autre processus.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, organizer: str):
+        """Identifiant de session en cache (None si l'organisateur n'a aucune session), ou _MISSING"""
+        with self._lock:
+            entry = self._entries.get(organizer)
+            if entry is None or entry[1] < time.monotonic():
+                return _MISSING
+            return entry[0]
+
+    def set(self, organizer: str, session_id) -> None:
+        with self._lock:
+            self._entries[organizer] = (session_id, time.monotonic() + self.ttl_seconds)
+        logger.info(f"Session courante de {organizer} : {session_id}")
+
+    def get(self, organizer: str, load_session_id):
+        """Session courante de `organizer` ; `load_session_id()` la relit en base si elle n'est pas en cache"""
+        session_id = self.lookup(organizer)
+        if session_id is _MISSING:
+            session_id = load_session_id()
+            self.set(organizer, session_id)
+        return session_id
+
+    async def aget(self, organizer: str, load_session_id):
+        """Comme get(), pour les routes asynchrones : `load_session_id` est une coroutine"""
+        session_id = self.lookup(organizer)
+        if session_id is _MISSING:
+            session_id = await load_session_id()
+            self.set(organizer, session_id)
+        return session_id
+
+    def invalidate(self, organizer: str | None = None) -> None:
+        """Oublie la session courante d'un organisateur (ou de tous si organizer est None)"""
+        with self._lock:
+            if organizer is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(organizer, None)
+
+
+active_sessions = ActiveSessionRegistry(settings.ACTIVE_SESSION_TTL_SECONDS)
@@ -6,6 +6,17 @@ class Settings:
     
     # Base de données
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./speed_meeting.db")
+    # URL du moteur asynchrone (routes async) ; par défaut DATABASE_URL avec aiosqlite / asyncpg
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL", "")
+    # Pool de connexions (SQLite et serveurs de base de données)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT_SECONDS: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+    DB_POOL_RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+    # Réglages SQLite appliqués à chaque connexion (voir db/database.py)
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_CACHE_SIZE_KB: int = int(os.getenv("SQLITE_CACHE_SIZE_KB", str(64 * 1024)))
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
     
     # Sécurité (Auth)
     SECRET_KEY: str = os.getenv("SECRET_KEY", "super_secret_key_a_changer_en_prod")
@@ -22,11 +33,46 @@ class Settings:
     DEFAULT_TIME_PER_ROUND: int = 10
     DEFAULT_SESSION_DURATION: int = 60
 
+    # Nombre de sessions dont l'index d'itinéraires est gardé en mémoire
+    ITINERARY_CACHE_SIZE: int = int(os.getenv("ITINERARY_CACHE_SIZE", "8"))
+    # Durée de validité du pointeur "session courante" par organisateur (relu en base ensuite)
+    ACTIVE_SESSION_TTL_SECONDS: float = float(os.getenv("ACTIVE_SESSION_TTL_SECONDS", "30"))
+
+    # Flux SSE des rotations : commentaire de maintien de connexion, délai de reconnexion du navigateur,
+    # états en attente par connexion (les plus anciens sont abandonnés pour une connexion lente)
+    SSE_KEEPALIVE_SECONDS: float = float(os.getenv("SSE_KEEPALIVE_SECONDS", "15"))
+    SSE_RETRY_MS: int = int(os.getenv("SSE_RETRY_MS", "5000"))
+    SSE_QUEUE_SIZE: int = int(os.getenv("SSE_QUEUE_SIZE", "4"))
+
+    # Plafonds des paramètres de génération acceptés par l'API (routes sans authentification) :
+    # budget d'optimisation par seed et nombre de seeds calculés en parallèle
+    MAX_OPTIMIZATION_BUDGET_MS: int = int(os.getenv("MAX_OPTIMIZATION_BUDGET_MS", "10000"))
+    MAX_SEED_COUNT: int = int(os.getenv("MAX_SEED_COUNT", "8"))
+
+    # URL publique de l'API, utilisée dans les QR codes des cartes participants
+    PUBLIC_BASE_URL: str = os.getenv("PUBLIC_BASE_URL", "http://localhost:8000")
+
+    # Cache disque des PDF de plans de rotation
+    PDF_CACHE_DIR: str = os.getenv("PDF_CACHE_DIR", "./pdf_cache")
+    PDF_CACHE_MAX_BYTES: int = int(os.getenv("PDF_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+
+    # Pool de processus unique (générations multi-seeds, cartes, tâches de fond)
+    PROCESS_POOL_WORKERS: int = int(os.getenv("PROCESS_POOL_WORKERS", str(os.cpu_count() or 1)))
+
+    # Tâches en arrière-plan : workers et seuils au-delà desquels les routes répondent 202 + job_id
+    JOB_THREAD_WORKERS: int = int(os.getenv("JOB_THREAD_WORKERS", "4"))
+    JOB_FILES_DIR: str = os.getenv("JOB_FILES_DIR", "./job_files")
+    JOB_GENERATE_THRESHOLD: int = int(os.getenv("JOB_GENERATE_THRESHOLD", "20000"))  # participants x rotations
+    JOB_UPLOAD_THRESHOLD_BYTES: int = int(os.getenv("JOB_UPLOAD_THRESHOLD_BYTES", str(5 * 1024 * 1024)))
+    JOB_PDF_THRESHOLD: int = int(os.getenv("JOB_PDF_THRESHOLD", "20000"))  # affectations dans rounds_data
+
     # Import participants (ordre par defaut si pas d'en-tetes)
     DEFAULT_IMPORT_COLUMN_ORDER: list = os.getenv(
         "IMPORT_COLUMN_ORDER",
         "prenom,nom,entreprise,email"
     ).split(",")
+    # Taille des lots de l'import en flux (lignes lues et enregistrées à la fois)
+    IMPORT_BATCH_SIZE: int = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
 
     # Email SMTP pour les demandes organisateur
     SMTP_HOST: str = os.getenv("SMTP_HOST", "")
@@ -35,6 +81,14 @@ class Settings:
     SMTP_PASSWORD: str = os.getenv("SMTP_PASSWORD", "")
     SMTP_USE_TLS: bool = os.getenv("SMTP_USE_TLS", "true").lower() == "true"
     SMTP_FROM: str = os.getenv("SMTP_FROM", "")
+    # Pool de connexions SMTP et file d'envoi en arrière-plan (un thread d'envoi par connexion)
+    SMTP_POOL_SIZE: int = int(os.getenv("SMTP_POOL_SIZE", "4"))
+    SMTP_TIMEOUT_SECONDS: float = float(os.getenv("SMTP_TIMEOUT_SECONDS", "30"))
+    SMTP_POOL_MAX_IDLE_SECONDS: float = float(os.getenv("SMTP_POOL_MAX_IDLE_SECONDS", "60"))
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = int(os.getenv("SMTP_MAX_MESSAGES_PER_CONNECTION", "100"))
+    EMAIL_MAX_ATTEMPTS: int = int(os.getenv("EMAIL_MAX_ATTEMPTS", "5"))
+    EMAIL_RETRY_BASE_SECONDS: float = float(os.getenv("EMAIL_RETRY_BASE_SECONDS", "2"))
+    EMAIL_RETRY_MAX_SECONDS: float = float(os.getenv("EMAIL_RETRY_MAX_SECONDS", "300"))
     ORGANIZER_REQUEST_RECIPIENT: str = os.getenv(
         "ORGANIZER_REQUEST_RECIPIENT",
     )
@@ -0,0 +1,152 @@
+import logging
+import random
+
+logger = logging.getLogger(__name__)
+
+
+def _prime_power(q):
+    """Retourne (p, e) si q = p^e avec p premier, sinon None"""
+    if q < 2:
+        return None
+    p = 2
+    while p * p <= q and q % p:
+        p += 1
+    if q % p:
+        p = q  # q est premier
+    exponent, rest = 0, q
+    while rest % p == 0:
+        rest //= p
+        exponent += 1
+    return (p, exponent) if rest == 1 else None
+
+
+def _poly_mod(poly, modulus, p):
+    """Reste de la division de `poly` par le polynôme unitaire `modulus` (coefficients de poids faible d'abord)"""
+    poly = list(poly)
+    degree = len(modulus) - 1
+    for i in range(len(poly) - 1, degree - 1, -1):
+        factor = poly[i] % p
+        if factor:
+            for j in range(degree + 1):
+                poly[i - degree + j] = (poly[i - degree + j] - factor * modulus[j]) % p
+    return [c % p for c in poly[:degree]] + [0] * max(0, degree - len(poly))
+
+
+def _monic_polys(p, degree):
+    for value in range(p ** degree):
+        coefficients = []
+        for _ in range(degree):
+            coefficients.append(value % p)
+            value //= p
+        yield coefficients + [1]
+
+
+def _irreducible(p, exponent):
+    """Premier polynôme unitaire irréductible de degré `exponent` sur GF(p) (recherche exhaustive)"""
+    for candidate in _monic_polys(p, exponent):
+        if candidate[0] == 0:
+            continue
+        reducible = False
+        for degree in range(1, exponent // 2 + 1):
+            for divisor in _monic_polys(p, degree):
+                if not any(_poly_mod(candidate, divisor, p)):
+                    reducible = True
+                    break
+            if reducible:
+                break
+        if not reducible:
+            return candidate
+    raise ValueError(f"Aucun polynôme irréductible de degré {exponent} sur GF({p})")
+
+
+class _GaloisField:
+    """Corps fini GF(p^e), éléments encodés en entiers 0..q-1 (chiffres en base p = coefficients)"""
+
+    def __init__(self, p, exponent):
+        self.p = p
+        self.exponent = exponent
+        self.q = p ** exponent
+        self.modulus = _irreducible(p, exponent) if exponent > 1 else None
+
+    def _digits(self, value):
+        digits = []
+        for _ in range(self.exponent):
+            digits.append(value % self.p)
+            value //= self.p
+        return digits
+
+    def _value(self, digits):
+        value = 0
+        for digit in reversed(digits):
+            value = value * self.p + digit
+        return value
+
+    def sub(self, a, b):
+        if self.exponent == 1:
+            return (a - b) % self.p
+        return self._value([(x - y) % self.p for x, y in zip(self._digits(a), self._digits(b))])
+
+    def mul(self, a, b):
+        if self.exponent == 1:
+            return (a * b) % self.p
+        da, db = self._digits(a), self._digits(b)
+        product = [0] * (2 * self.exponent - 1)
+        for i, x in enumerate(da):
+            if x:
+                for j, y in enumerate(db):
+                    product[i + j] += x * y
+        return self._value(_poly_mod(product, self.modulus, self.p))
+
+
+def design_round_count(participant_count, tableCountLabel):
+    """
+    Nombre maximal de rotations sans aucune rencontre en double que la construction
+    algébrique peut produire pour cette forme d'événement, ou 0 si elle ne s'applique pas.
+
+    La construction s'applique quand le nombre de tables q est une puissance d'un nombre premier
+    et que chaque table reçoit exactement k <= q participants (participants = k * q).
+    """
+    if tableCountLabel < 2 or participant_count % tableCountLabel:
+        return 0
+    table_size = participant_count // tableCountLabel
+    if table_size < 2 or table_size > tableCountLabel or _prime_power(tableCountLabel) is None:
+        return 0
+    # Plan affine complet : la classe des droites verticales fournit une rotation supplémentaire
+    return tableCountLabel + 1 if table_size == tableCountLabel else tableCountLabel
+
+
+def iter_resolvable_schedule(participant_count, tableCountLabel, numberOfRounds):
+    """
+    Générateur du planning sans doublon issu d'un plan affine (tronqué) sur GF(q), une rotation
+    à la fois. La forme doit être couverte (`design_round_count` >= `numberOfRounds`).
+
+    Les participants sont les points (x, y) avec x parmi k colonnes et y dans GF(q).
+    La rotation de pente m place (x, y) à la table y - m*x : deux points de colonnes
+    différentes ne partagent qu'une seule droite, donc ne se rencontrent qu'une fois.
+    Le coût est O(participants) par rotation.
+    """
+    p, exponent = _prime_power(tableCountLabel)
+    field = _GaloisField(p, exponent)
+    q = field.q
+    table_size = participant_count // q
+
+    # Répartition aléatoire des participants sur les points du plan
+    points = list(range(participant_count))
+    random.shuffle(points)
+
+    logger.info(f"Planning algébrique GF({q}) : {participant_count} participants, {numberOfRounds} rotations sans doublon")
+
+    for slope in range(min(numberOfRounds, q)):
+        products = [field.mul(slope, x) for x in range(table_size)]
+        tables = [[] for _ in range(q)]
+        for participant, point in enumerate(points):
+            x, y = divmod(point, q)
+            tables[field.sub(y, products[x])].append(participant)
+        yield tables
+
+    if numberOfRounds > q:
+        # Classe parallèle des droites verticales x = c (uniquement si k == q)
+        tables = [[] for _ in range(q)]
+        for participant, point in enumerate(points):
+            tables[point // q].append(participant)
+        yield tables
@@ -0,0 +1,64 @@
+import logging
+import threading
+from collections import OrderedDict
+
+from core.config import settings
+from core.session_index import SessionIndex
+
+logger = logging.getLogger(__name__)
+
+
+class ItineraryIndexCache:
+    """Cache LRU en mémoire des index de session (`SessionIndex`), par identifiant de session"""
+
+    def __init__(self, max_sessions: int):
+        self.max_sessions = max_sessions
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, session_id):
+        """Index en cache de la session, ou None"""
+        with self._lock:
+            index = self._entries.get(session_id)
+            if index is not None:
+                self._entries.move_to_end(session_id)
+            return index
+
+    def _build(self, session_id, rounds_data):
+        index = SessionIndex(rounds_data)
+        logger.info(f"Index construit pour la session {session_id} ({len(index)} participants)")
+
+        with self._lock:
+            self._entries[session_id] = index
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_sessions:
+                self._entries.popitem(last=False)
+        return index
+
+    def get(self, session_id, load_rounds):
+        """
+        Index de la session `session_id`. En cas d'absence, `load_rounds()` est appelé
+        pour charger rounds_data (une seule désérialisation par session tant qu'elle reste en cache).
+        """
+        index = self.lookup(session_id)
+        if index is not None:
+            return index
+        return self._build(session_id, load_rounds())
+
+    async def aget(self, session_id, load_rounds):
+        """Comme get(), pour les routes asynchrones : `load_rounds` est une coroutine (requête AsyncSession)"""
+        index = self.lookup(session_id)
+        if index is not None:
+            return index
+        return self._build(session_id, await load_rounds())
+
+    def invalidate(self, session_id=None):
+        """Supprime l'index d'une session (ou de toutes si session_id est None)"""
+        with self._lock:
+            if session_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(session_id, None)
+
+
+itinerary_cache = ItineraryIndexCache(settings.ITINERARY_CACHE_SIZE)
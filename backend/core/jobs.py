@@ -0,0 +1,159 @@
+import datetime
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from core.config import settings
+from core.parallel import get_process_pool
+from db.database import SessionLocal
+from db.models import Job
+
+logger = logging.getLogger(__name__)
+
+
+def _elapsed_ms(start):
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+def store_job_file(job_id, source_path: str, filename: str, media_type: str):
+    """Copie le fichier produit par une tâche dans JOB_FILES_DIR ; retourne le résultat de la tâche"""
+    os.makedirs(settings.JOB_FILES_DIR, exist_ok=True)
+    stored_name = f"{job_id}{os.path.splitext(filename)[1]}"
+    shutil.copyfile(source_path, os.path.join(settings.JOB_FILES_DIR, stored_name))
+    return {
+        "file": stored_name,
+        "filename": filename,
+        "media_type": media_type,
+        "size": os.path.getsize(source_path),
+        "download_url": f"/api/jobs/{job_id}/file",
+    }
+
+
+def job_file_path(result) -> str | None:
+    """Chemin du fichier produit par une tâche terminée (None si la tâche n'en produit pas)"""
+    if not result or not result.get("file"):
+        return None
+    return os.path.join(settings.JOB_FILES_DIR, os.path.basename(result["file"]))
+
+
+class JobManager:
+    """
+    Tâches en arrière-plan dans le processus du serveur.
+
+    Le calcul (`func`) s'exécute dans le pool de processus partagé (`core.parallel.get_process_pool`),
+    ou dans un thread du serveur si `use_processes=False`
+    (travail dominé par la base de données, ou qui utilise déjà le pool de `core.parallel`).
+    `finalize(job_id, valeur)` s'exécute ensuite dans un thread pour les écritures en base.
+    L'état (statut, résultat, durées) est enregistré dans la table `jobs` ; l'avancement détaillé
+    est gardé en mémoire pendant l'exécution pour ne pas écrire en base à chaque lot.
+    """
+
+    def __init__(self, thread_workers: int):
+        self._threads = ThreadPoolExecutor(max_workers=thread_workers, thread_name_prefix="job")
+        self._live = {}
+        self._lock = threading.Lock()
+
+    def _save(self, job_id, **fields):
+        db = SessionLocal()
+        try:
+            db.query(Job).filter(Job.id == job_id).update(fields)
+            db.commit()
+        finally:
+            db.close()
+
+    def _report(self, job_id, **fields):
+        """Avancement en mémoire d'une tâche en cours (appelé par `func` quand use_processes=False)"""
+        with self._lock:
+            self._live.setdefault(job_id, {}).update(fields)
+
+    def submit(self, kind, func, *args, finalize=None, use_processes=True):
+        """Enregistre une tâche `kind` et la planifie ; retourne son identifiant"""
+        job_id = uuid.uuid4().hex
+        db = SessionLocal()
+        try:
+            db.add(Job(id=job_id, kind=kind, status="pending", progress=0.0, created_at=datetime.datetime.utcnow()))
+            db.commit()
+        finally:
+            db.close()
+
+        self._threads.submit(self._run, job_id, kind, func, args, finalize, use_processes, time.perf_counter())
+        logger.info(f"Tâche {kind} {job_id} planifiée")
+        return job_id
+
+    def _run(self, job_id, kind, func, args, finalize, use_processes, queued_at):
+        timings = {"queued_ms": _elapsed_ms(queued_at)}
+        self._save(job_id, status="running", started_at=datetime.datetime.utcnow())
+        try:
+            start = time.perf_counter()
+            if use_processes:
+                value = get_process_pool().submit(func, *args).result()
+            else:
+                value = func(*args, progress=lambda **fields: self._report(job_id, **fields))
+            timings["run_ms"] = _elapsed_ms(start)
+
+            if finalize is not None:
+                start = time.perf_counter()
+                value = finalize(job_id, value)
+                timings["finalize_ms"] = _elapsed_ms(start)
+
+            timings["total_ms"] = round(sum(timings.values()), 2)
+            self._save(job_id, status="done", progress=1.0, result=value, timings=timings,
+                       finished_at=datetime.datetime.utcnow())
+            logger.info(f"Tâche {kind} {job_id} terminée en {timings['total_ms']} ms")
+        except Exception as e:
+            logger.error(f"Tâche {kind} {job_id} en échec : {e}")
+            self._save(job_id, status="error", error=str(e), timings=timings, finished_at=datetime.datetime.utcnow())
+        finally:
+            with self._lock:
+                self._live.pop(job_id, None)
+
+    def get(self, job_id):
+        """État d'une tâche (None si inconnue), avec l'avancement en mémoire si elle est en cours"""
+        db = SessionLocal()
+        try:
+            job = db.query(Job).filter(Job.id == job_id).first()
+            if not job:
+                return None
+            state = {
+                "job_id": job.id,
+                "kind": job.kind,
+                "status": job.status,
+                "progress": job.progress,
+                "created_at": job.created_at,
+                "started_at": job.started_at,
+                "finished_at": job.finished_at,
+                "timings_ms": job.timings,
+                "result": job.result,
+                "error": job.error,
+            }
+        finally:
+            db.close()
+
+        with self._lock:
+            live = dict(self._live.get(job_id, {}))
+        if live and state["status"] in ("pending", "running"):
+            state["progress"] = live.pop("progress", state["progress"])
+            state["details"] = live
+        return state
+
+    def recover_interrupted(self):
+        """Au démarrage : les tâches restées en attente ou en cours ont été interrompues par l'arrêt du serveur"""
+        db = SessionLocal()
+        try:
+            count = db.query(Job).filter(Job.status.in_(["pending", "running"])).update(
+                {"status": "error", "error": "Tâche interrompue par un redémarrage du serveur",
+                 "finished_at": datetime.datetime.utcnow()},
+                synchronize_session=False
+            )
+            db.commit()
+            if count:
+                logger.warning(f"{count} tâche(s) interrompue(s) marquée(s) en échec")
+        finally:
+            db.close()
+
+
+job_manager = JobManager(settings.JOB_THREAD_WORKERS)
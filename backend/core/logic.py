@@ -1,150 +1,421 @@
 ﻿import random
 import logging
+from collections import Counter
+
+from core.designs import design_round_count, iter_resolvable_schedule
+from core.optimize import optimize_rounds
 
 logger = logging.getLogger(__name__)
 
-def generate_rounds(participants_input, tableCountLabel, numberOfRounds, seed=None):
-    """Génère les rounds de speed meeting avec placement optimisé des participants"""
-    
-    # Configuration du seed pour reproductibilité (utile pour les tests)
-    if seed is not None:
-        random.seed(seed)
-        logger.debug(f"Seed défini : {seed}")
-    
-    # Gestionnaire des participants et des places vides
+# Fenêtre de tables "proches" privilégiées d'une rotation à l'autre (+/- 6 tables)
+PROXIMITY_RANGE = 6
+
+
+def _normalize_participants(participants_input):
+    """Retourne la liste des noms de participants (réels ou numérotés)"""
     if isinstance(participants_input, list):
-        participants_reels = [p.strip() for p in participants_input if str(p).strip()]
-        participant_count = len(participants_reels)
-    else:
-        participant_count = int(participants_input)
-        participants_reels = [f"Participant {i+1}" for i in range(participant_count)]
-    
-    logger.info(f"Génération de rounds : {participant_count} participants, {tableCountLabel} tables, {numberOfRounds} rotations")
-    
-    # Validations des paramètres
+        return [p.strip() for p in participants_input if str(p).strip()]
+    participant_count = int(participants_input)
+    return [f"Participant {i+1}" for i in range(participant_count)]
+
+
+def _validate_parameters(participant_count, tableCountLabel, numberOfRounds, optimize_ms=None):
+    """Retourne un message d'erreur si les paramètres sont invalides, sinon None"""
     if tableCountLabel <= 0:
-        return {"error": "Nombre de tables doit être > 0"}
+        return "Nombre de tables doit être > 0"
 
     if participant_count <= 0:
-        return {"error": "Aucun participant fourni"}
-    
+        return "Aucun participant fourni"
+
     if tableCountLabel > participant_count:
-        return {"error": f"Nombre de tables ({tableCountLabel}) supérieur au nombre de participants ({participant_count})"}
-    
+        return f"Nombre de tables ({tableCountLabel}) supérieur au nombre de participants ({participant_count})"
+
     if numberOfRounds <= 0:
-        return {"error": "Nombre de rotations doit être > 0"}
-    participants = participants_reels
-    
+        return "Nombre de rotations doit être > 0"
+
+    if optimize_ms is not None and optimize_ms < 0:
+        return "Budget d'optimisation doit être >= 0"
+    return None
+
+
+def _nearby_tables(prev_table, is_open, tableCountLabel):
+    """Tables encore ouvertes dans la fenêtre de proximité de la dernière table, mélangées"""
+    if tableCountLabel <= 2 * PROXIMITY_RANGE + 1:
+        nearby = [t for t in range(tableCountLabel) if is_open[t]]
+    else:
+        nearby = []
+        for offset in range(-PROXIMITY_RANGE, PROXIMITY_RANGE + 1):
+            t_idx = (prev_table + offset) % tableCountLabel
+            if is_open[t_idx]:
+                nearby.append(t_idx)
+    random.shuffle(nearby)
+    return nearby
+
+
+def _remaining_tables(prev_table, open_tables, tableCountLabel):
+    """Tables ouvertes hors de la fenêtre de proximité, mélangées"""
+    remaining = [
+        t for t in open_tables
+        if min((t - prev_table) % tableCountLabel, (prev_table - t) % tableCountLabel) > PROXIMITY_RANGE
+    ]
+    random.shuffle(remaining)
+    return remaining
+
+
+def _place_round(met, last_table, tableCountLabel, capacities):
+    """
+    Place tous les participants (identifiants entiers) pour une rotation.
+
+    `met[p]` est un bitset (entier Python) : le bit q est à 1 si p a déjà rencontré q.
+    Chaque table maintient le masque de ses membres, le test de conflit pour une table
+    candidate se réduit donc à un seul ET binaire `met[p] & table_mask[t]`.
+    """
+    participant_count = len(met)
+    tables = [[] for _ in range(tableCountLabel)]
+    table_mask = [0] * tableCountLabel
+    is_open = [capacity > 0 for capacity in capacities]
+    open_tables = [t for t in range(tableCountLabel) if is_open[t]]
+
+    waiting_list = list(range(participant_count))
+    random.shuffle(waiting_list)
+
+    for p in waiting_list:
+        history = met[p]
+        prev_table = last_table[p]
+        chosen = None
+
+        if prev_table is None:
+            # Premier round: placement aléatoire
+            table_indices = list(open_tables)
+            random.shuffle(table_indices)
+            fallback = table_indices
+        else:
+            # Privilégier les tables proches de la dernière table du participant,
+            # les autres tables ne sont construites que si aucune table proche ne convient
+            table_indices = _nearby_tables(prev_table, is_open, tableCountLabel)
+            fallback = table_indices
+            for t_idx in table_indices:
+                if not history & table_mask[t_idx]:
+                    chosen = t_idx
+                    break
+            if chosen is None:
+                table_indices = _remaining_tables(prev_table, open_tables, tableCountLabel)
+                fallback = fallback + table_indices
+
+        # Tentative de placement sans doublon
+        if chosen is None:
+            for t_idx in table_indices:
+                if not history & table_mask[t_idx]:
+                    chosen = t_idx
+                    break
+
+        # Placement forcé si nécessaire, en respectant la capacité
+        if chosen is None:
+            chosen = fallback[0]
+
+        tables[chosen].append(p)
+        table_mask[chosen] |= 1 << p
+        last_table[p] = chosen  # Enregistrer la table du participant
+        if len(tables[chosen]) >= capacities[chosen]:
+            is_open[chosen] = False
+            open_tables.remove(chosen)
+
+    # Mise à jour de l'historique : un OU par membre avec le masque de sa table
+    for t_idx, members in enumerate(tables):
+        mask = table_mask[t_idx]
+        for p in members:
+            met[p] |= mask
+
+    return tables
+
+
+def _round_capacities(tableCountLabel, base_capacity, tables_with_extra):
+    """Capacités cibles d'une rotation : les tables avec une place en plus sont tirées au hasard"""
+    capacities = [base_capacity] * tableCountLabel
+    for t_idx in random.sample(range(tableCountLabel), tables_with_extra):
+        capacities[t_idx] += 1
+    return capacities
+
+
+def _round_data(round_number, tables, participants):
+    """Construction du round_data (noms des participants) à partir des identifiants entiers"""
+    tables_data = []
+    for t_idx, members in enumerate(tables):
+        tables_data.append({
+            "table_id": t_idx + 1,
+            "table_name": f"Table {t_idx + 1}",
+            "members": [participants[p] for p in members]
+        })
+    return {
+        "round": round_number,
+        "tables": tables_data
+    }
+
+
+def _iter_greedy_tables(participant_count, tableCountLabel, numberOfRounds):
+    """Générateur du placement glouton, une rotation (identifiants entiers) à la fois"""
     # Calculer la capacité de base et le nombre de tables avec un participant supplémentaire
     base_capacity = participant_count // tableCountLabel
     tables_with_extra = participant_count % tableCountLabel
-    
-    # La capacité max est base_capacity + 1 si nécessaire
-    max_capacity = base_capacity + (1 if tables_with_extra > 0 else 0)
-
-    # Utiliser directement numberOfRounds sans calcul
-    num_rounds = numberOfRounds
-
-    history = {p: set() for p in participants}
-    last_table = {p: None for p in participants}  # Tracker la dernière table de chaque participant
-
-    all_rounds = []
-    
-    for r in range(num_rounds):
-        tables = [[] for _ in range(tableCountLabel)]
-        waiting_list = list(participants)
-        random.shuffle(waiting_list)
-
-        # Randomiser quelles tables auront un participant supplémentaire à chaque round
-        tables_with_extra_capacity = set(random.sample(range(tableCountLabel), tables_with_extra))
-        
-        # Placement des participants dans les tables avec distribution équilibrée
-        for p in waiting_list:
-            placed = False
-            
-            # Privilégier les tables proches de la dernière table du participant
-            if last_table[p] is not None:
-                # Créer une liste de tables proches (fenêtre de +/- 6 tables)
-                proximity_range = 6
-                prev_table = last_table[p]
-                
-                # Tables proches en priorité
-                nearby_tables = []
-                for offset in range(-proximity_range, proximity_range + 1):
-                    t_idx = (prev_table + offset) % tableCountLabel
-                    nearby_tables.append(t_idx)
-                
-                # Mélanger les tables proches pour éviter un pattern fixe
-                random.shuffle(nearby_tables)
-                
-                # Ajouter les tables restantes
-                remaining_tables = [t for t in range(tableCountLabel) if t not in nearby_tables]
-                random.shuffle(remaining_tables)
-                
-                table_indices = nearby_tables + remaining_tables
-            else:
-                # Premier round: placement aléatoire
-                table_indices = list(range(tableCountLabel))
-                random.shuffle(table_indices)
-            
-            # Calculer la taille cible pour cette table
-            def get_target_capacity(t_idx):
-                if t_idx in tables_with_extra_capacity:
-                    return base_capacity + 1
-                return base_capacity
-            
-            # Tentative de placement sans doublon
-            for t_idx in table_indices:
-                target_cap = get_target_capacity(t_idx)
-                if len(tables[t_idx]) < target_cap:
-                    if not any(other in history[p] for other in tables[t_idx]):
-                        tables[t_idx].append(p)
-                        last_table[p] = t_idx  # Enregistrer la table du participant
-                        placed = True
-                        break
-            
-            # Placement forcé si nécessaire, en respectant la capacité
-            if not placed:
-                for t_idx in table_indices:
-                    target_cap = get_target_capacity(t_idx)
-                    if len(tables[t_idx]) < target_cap:
-                        tables[t_idx].append(p)
-                        last_table[p] = t_idx  # Enregistrer la table du participant
-                        placed = True
-                        break
-        
-        # Mise à jour de l'historique
-        for table in tables:
-            for p1 in table:
-                for p2 in table:
-                    if p1 != p2:
-                        history[p1].add(p2)
-        
-        # Construction du round_data avec la structure correcte
-        tables_data = []
-        for t_idx, participants_at_table in enumerate(tables):
-            tables_data.append({
-                "table_id": t_idx + 1,
-                "table_name": f"Table {t_idx + 1}",
-                "members": participants_at_table
-            })
-        
-        round_data = {
-            "round": r + 1,
-            "tables": tables_data
-        }
-
-        all_rounds.append(round_data)
+
+    met = [0] * participant_count
+    last_table = [None] * participant_count  # Tracker la dernière table de chaque participant
+    for r in range(numberOfRounds):
+        capacities = _round_capacities(tableCountLabel, base_capacity, tables_with_extra)
+        yield _place_round(met, last_table, tableCountLabel, capacities)
+
+
+def _iter_schedule(participant_count, tableCountLabel, numberOfRounds):
+    """
+    Choix de la stratégie : formes "parfaites" (tables = puissance d'un premier,
+    participants = k * tables) construites algébriquement sans aucune rencontre en double,
+    placement glouton sinon. Retourne (stratégie, générateur des rotations).
+    """
+    if design_round_count(participant_count, tableCountLabel) >= numberOfRounds:
+        return "resolvable_design", iter_resolvable_schedule(participant_count, tableCountLabel, numberOfRounds)
+    return "greedy", _iter_greedy_tables(participant_count, tableCountLabel, numberOfRounds)
+
+
+def _metadata(participant_count, tableCountLabel, rounds_count, **extra):
+    return {
+        "total_participants": participant_count,
+        "total_rounds": rounds_count,
+        "participants_per_table": participant_count // tableCountLabel,
+        "tables": tableCountLabel,
+        "rounds_generated": rounds_count,
+        **extra
+    }
+
+
+def _prepare(participants_input, tableCountLabel, numberOfRounds, seed, optimize_ms=None):
+    """Seed, normalisation et validation communes ; retourne (participants, message d'erreur)"""
+    # Configuration du seed pour reproductibilité (utile pour les tests)
+    if seed is not None:
+        random.seed(seed)
+        logger.debug(f"Seed défini : {seed}")
+
+    # Gestionnaire des participants et des places vides
+    participants = _normalize_participants(participants_input)
+
+    logger.info(f"Génération de rounds : {len(participants)} participants, {tableCountLabel} tables, {numberOfRounds} rotations")
+
+    # Validations des paramètres
+    return participants, _validate_parameters(len(participants), tableCountLabel, numberOfRounds, optimize_ms)
+
+
+def generate_rounds(participants_input, tableCountLabel, numberOfRounds, seed=None, optimize_ms=None):
+    """
+    Génère les rounds de speed meeting avec placement optimisé des participants.
+
+    Les formes d'événement couvertes par un plan affine sont construites directement
+    (metadata["strategy"] == "resolvable_design"), les autres par placement glouton.
+    Si `optimize_ms` est fourni, le placement glouton est ensuite amélioré par recherche
+    locale (réduction des rencontres en double et des longs déplacements) pendant ce budget.
+    """
+    participants, error = _prepare(participants_input, tableCountLabel, numberOfRounds, seed, optimize_ms)
+    if error:
+        return {"error": error}
+    participant_count = len(participants)
+
+    # Identifiants entiers denses : le participant i correspond à participants[i]
+    strategy, schedule = _iter_schedule(participant_count, tableCountLabel, numberOfRounds)
+    rounds_tables = list(schedule)
+    metadata = {"strategy": strategy}
+
+    if optimize_ms and strategy == "greedy":
+        metadata["optimization"] = optimize_rounds(
+            rounds_tables, participant_count, tableCountLabel, optimize_ms, PROXIMITY_RANGE
+        )
+
+    all_rounds = [_round_data(r + 1, tables, participants) for r, tables in enumerate(rounds_tables)]
 
     logger.info(f"{len(all_rounds)} rounds générés avec succès | Participants: {participant_count}")
-    
+
+    return {
+        "metadata": _metadata(participant_count, tableCountLabel, len(all_rounds), **metadata),
+        "rounds": all_rounds
+    }
+
+
+def iter_rounds(participants_input, tableCountLabel, numberOfRounds, seed=None):
+    """
+    Variante générateur de `generate_rounds` : même structure {"metadata", "rounds"},
+    mais "rounds" est un générateur qui calcule chaque rotation à la demande.
+    Pas d'optimisation locale (elle nécessite le planning complet).
+    """
+    participants, error = _prepare(participants_input, tableCountLabel, numberOfRounds, seed)
+    if error:
+        return {"error": error}
+
+    strategy, schedule = _iter_schedule(len(participants), tableCountLabel, numberOfRounds)
+    return {
+        "metadata": _metadata(len(participants), tableCountLabel, numberOfRounds, strategy=strategy),
+        "rounds": (_round_data(r + 1, tables, participants) for r, tables in enumerate(schedule))
+    }
+
+
+def _tables_from_round(round_data, index, tableCountLabel):
+    """Tables (identifiants entiers) d'un round_data stocké, en ignorant les participants absents de `index`"""
+    tables = [[] for _ in range(tableCountLabel)]
+    for table in round_data.get("tables", []):
+        t_idx = int(table.get("table_id", 0)) - 1
+        if 0 <= t_idx < tableCountLabel:
+            tables[t_idx] = [index[m] for m in table.get("members", []) if m in index]
+    return tables
+
+
+def _rebalanced_capacities(tables, participant_count):
+    """
+    Capacités équilibrées pour `participant_count` participants, les places supplémentaires
+    étant attribuées aux tables déjà les plus remplies afin de déplacer le moins de monde possible.
+    """
+    tableCountLabel = len(tables)
+    base_capacity = participant_count // tableCountLabel
+    tables_with_extra = participant_count % tableCountLabel
+    by_size = sorted(range(tableCountLabel), key=lambda t: (-len(tables[t]), random.random()))
+    capacities = [base_capacity] * tableCountLabel
+    for t_idx in by_size[:tables_with_extra]:
+        capacities[t_idx] += 1
+    return capacities
+
+
+def _repair_round(tables, met, last_table, capacities, participant_count):
+    """
+    Complète une rotation existante : les tables en surnombre libèrent d'abord les membres en conflit,
+    puis les participants sans place (arrivées, évincés) sont placés comme dans `_place_round`.
+    """
+    tableCountLabel = len(tables)
+    seated = [False] * participant_count
+    for members in tables:
+        for p in members:
+            seated[p] = True
+    pool = [p for p in range(participant_count) if not seated[p]]
+
+    table_mask = [0] * tableCountLabel
+    for t_idx, members in enumerate(tables):
+        for p in members:
+            table_mask[t_idx] |= 1 << p
+
+    for t_idx, members in enumerate(tables):
+        while len(members) > capacities[t_idx]:
+            conflicted = [p for p in members if met[p] & (table_mask[t_idx] & ~(1 << p))]
+            p = conflicted[-1] if conflicted else members[-1]
+            members.remove(p)
+            table_mask[t_idx] &= ~(1 << p)
+            pool.append(p)
+
+    is_open = [len(tables[t]) < capacities[t] for t in range(tableCountLabel)]
+    open_tables = [t for t in range(tableCountLabel) if is_open[t]]
+    random.shuffle(pool)
+
+    for p in pool:
+        if last_table[p] is None:
+            table_indices = list(open_tables)
+            random.shuffle(table_indices)
+        else:
+            table_indices = _nearby_tables(last_table[p], is_open, tableCountLabel)
+            table_indices += _remaining_tables(last_table[p], open_tables, tableCountLabel)
+
+        chosen = table_indices[0]
+        for t_idx in table_indices:
+            if not met[p] & table_mask[t_idx]:
+                chosen = t_idx
+                break
+
+        tables[chosen].append(p)
+        table_mask[chosen] |= 1 << p
+        if len(tables[chosen]) >= capacities[chosen]:
+            is_open[chosen] = False
+            open_tables.remove(chosen)
+
+    for t_idx, members in enumerate(tables):
+        for p in members:
+            met[p] |= table_mask[t_idx]
+            last_table[p] = t_idx
+
+    return tables
+
+
+def replan_rounds(rounds_data, participants_input, tableCountLabel, frozen_rounds, seed=None, optimize_ms=None):
+    """
+    Replanifie les rotations futures d'une session existante après des arrivées ou des départs.
+
+    Les `frozen_rounds` premières rotations sont conservées telles quelles et servent d'historique.
+    Pour les rotations suivantes, chaque participant toujours présent garde sa table sauf si
+    l'équilibrage l'impose, seuls les arrivants et les évincés sont replacés.
+    """
+    if seed is not None:
+        random.seed(seed)
+
+    participants = _normalize_participants(participants_input)
+    participant_count = len(participants)
+    numberOfRounds = len(rounds_data)
+
+    error = _validate_parameters(participant_count, tableCountLabel, numberOfRounds, optimize_ms)
+    if error:
+        return {"error": error}
+    if frozen_rounds < 0 or frozen_rounds > numberOfRounds:
+        return {"error": f"Rotation courante invalide (0 à {numberOfRounds})"}
+    # Les rotations enregistrées ne repèrent les participants que par leur nom
+    duplicates = sorted(name for name, count in Counter(participants).items() if count > 1)
+    if duplicates:
+        return {"error": f"Noms de participants en double : {', '.join(duplicates)}"}
+
+    logger.info(f"Replanification : {participant_count} participants, rotations {frozen_rounds + 1} à {numberOfRounds}")
+
+    index = {name: i for i, name in enumerate(participants)}
+    previous_tables = [_tables_from_round(round_data, index, tableCountLabel) for round_data in rounds_data]
+    previous_position = [
+        {p: t_idx for t_idx, members in enumerate(tables) for p in members} for tables in previous_tables
+    ]
+
+    met = [0] * participant_count
+    last_table = [None] * participant_count
+    for tables in previous_tables[:frozen_rounds]:
+        for t_idx, members in enumerate(tables):
+            mask = 0
+            for p in members:
+                mask |= 1 << p
+            for p in members:
+                met[p] |= mask
+                last_table[p] = t_idx
+
+    rounds_tables = previous_tables[:frozen_rounds]
+    for r in range(frozen_rounds, numberOfRounds):
+        tables = [list(members) for members in previous_tables[r]]
+        capacities = _rebalanced_capacities(tables, participant_count)
+        rounds_tables.append(_repair_round(tables, met, last_table, capacities, participant_count))
+
+    metadata = {"strategy": "replan"}
+    if optimize_ms:
+        metadata["optimization"] = optimize_rounds(
+            rounds_tables, participant_count, tableCountLabel, optimize_ms, PROXIMITY_RANGE, frozen_rounds
+        )
+
+    moved = 0
+    for r in range(frozen_rounds, numberOfRounds):
+        for t_idx, members in enumerate(rounds_tables[r]):
+            for p in members:
+                if previous_position[r].get(p, t_idx) != t_idx:
+                    moved += 1
+
+    previous_names = {m for round_data in rounds_data[frozen_rounds:] for t in round_data.get("tables", []) for m in t.get("members", [])}
+    metadata["replan"] = {
+        "frozen_rounds": frozen_rounds,
+        "arrivals": sum(1 for name in participants if name not in previous_names),
+        "departures": len(previous_names - set(participants)),
+        "moved_assignments": moved,
+    }
+
+    # Les rotations figées sont renvoyées à l'identique (y compris les participants partis depuis)
+    all_rounds = list(rounds_data[:frozen_rounds]) + [
+        _round_data(r + 1, rounds_tables[r], participants) for r in range(frozen_rounds, numberOfRounds)
+    ]
+
+    logger.info(f"Replanification terminée : {moved} affectations modifiées")
+
+    metadata["rounds_generated"] = numberOfRounds - frozen_rounds
     return {
-        "metadata": {
-            "total_participants": participant_count,
-            "total_rounds": len(all_rounds),
-            "participants_per_table": base_capacity,
-            "tables": tableCountLabel,
-            "rounds_generated": len(all_rounds)
-        },
+        "metadata": _metadata(participant_count, tableCountLabel, len(all_rounds), **metadata),
         "rounds": all_rounds
-    }
\ No newline at end of file
+    }
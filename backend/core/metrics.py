@@ -0,0 +1,106 @@
+import numpy as np
+
+from core.logic import PROXIMITY_RANGE
+
+
+def _assignment_matrix(rounds):
+    """
+    Matrice (rotations x participants) des index de table (table_id - 1, -1 si absent),
+    construite en un seul parcours de `rounds`.
+    """
+    participant_ids = {}
+    entries_round, entries_participant, entries_table = [], [], []
+    for r, round_data in enumerate(rounds):
+        for table in round_data.get("tables", []):
+            t_idx = int(table.get("table_id", 0)) - 1
+            for member in table.get("members", []):
+                p = participant_ids.setdefault(member, len(participant_ids))
+                entries_round.append(r)
+                entries_participant.append(p)
+                entries_table.append(t_idx)
+
+    table_of = np.full((len(rounds), len(participant_ids)), -1, dtype=np.int32)
+    table_of[entries_round, entries_participant] = entries_table
+    return table_of
+
+
+def _pair_keys(table_of, tableCountLabel):
+    """
+    Clés (p * n + q, p < q) de toutes les rencontres, toutes rotations confondues.
+    Les participants sont triés par (rotation, table) puis comparés à leurs voisins à distance d :
+    deux voisins de même clé (rotation, table) forment une paire.
+    """
+    rounds_count, n = table_of.shape
+    present = table_of >= 0
+    slot = (np.arange(rounds_count, dtype=np.int64)[:, None] * tableCountLabel + table_of)[present]
+    participant = np.broadcast_to(np.arange(n, dtype=np.int64), table_of.shape)[present]
+
+    order = np.argsort(slot, kind="stable")
+    slot, participant = slot[order], participant[order]
+    max_size = int(np.bincount(slot).max()) if slot.size else 0
+
+    keys = []
+    for d in range(1, max_size):
+        same_table = slot[d:] == slot[:-d]
+        a, b = participant[:-d][same_table], participant[d:][same_table]
+        keys.append(np.minimum(a, b) * n + np.maximum(a, b))
+    return np.concatenate(keys) if keys else np.empty(0, dtype=np.int64)
+
+
+def _sorted_unique(values):
+    """Valeurs distinctes triées (tri + comparaison des voisins, plus rapide que np.unique sur de gros tableaux)"""
+    values = np.sort(values)
+    if values.size == 0:
+        return values
+    return values[np.concatenate(([True], values[1:] != values[:-1]))]
+
+
+def compute_metrics(rounds, tableCountLabel):
+    """
+    Indicateurs de qualité d'un planning, calculés en une passe vectorisée :
+    rencontres en double, personnes distinctes rencontrées par participant,
+    déplacements (en tables) entre deux rotations et équilibre des tailles de tables.
+    """
+    table_of = _assignment_matrix(rounds)
+    rounds_count, n = table_of.shape
+    if rounds_count == 0 or n == 0 or tableCountLabel <= 0:
+        return {}
+
+    # Rencontres : total, paires distinctes et doublons
+    keys = _pair_keys(table_of, tableCountLabel)
+    unique_keys = _sorted_unique(keys)
+    met_count = np.bincount(unique_keys // n, minlength=n) + np.bincount(unique_keys % n, minlength=n)
+
+    # Déplacements entre rotations consécutives (distance circulaire, comme la fenêtre de proximité)
+    moved = (table_of[1:] >= 0) & (table_of[:-1] >= 0)
+    distance = np.abs(table_of[1:] - table_of[:-1]) % tableCountLabel
+    hops = np.minimum(distance, tableCountLabel - distance)[moved]
+
+    # Tailles de tables par rotation
+    sizes = np.stack([
+        np.bincount(row[row >= 0], minlength=tableCountLabel)[:tableCountLabel] for row in table_of
+    ])
+
+    return {
+        "encounters": int(keys.size),
+        "unique_pairs": int(unique_keys.size),
+        "repeat_encounters": int(keys.size - unique_keys.size),
+        "people_met": {
+            "min": int(met_count.min()),
+            "max": int(met_count.max()),
+            "mean": round(float(met_count.mean()), 2),
+            "median": float(np.median(met_count)),
+            "distribution": {int(k): int(v) for k, v in enumerate(np.bincount(met_count)) if v},
+        },
+        "table_hops": {
+            "total": int(hops.sum()) if hops.size else 0,
+            "mean": round(float(hops.mean()), 2) if hops.size else 0.0,
+            "max": int(hops.max()) if hops.size else 0,
+            "beyond_proximity": int((hops > PROXIMITY_RANGE).sum()),
+        },
+        "table_size": {
+            "min": int(sizes.min()),
+            "max": int(sizes.max()),
+            "variance": round(float(sizes.var(axis=1).sum()), 4),
+        },
+    }
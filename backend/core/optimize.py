@@ -0,0 +1,241 @@
+import math
+import random
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Poids d'une table parcourue au-delà de la fenêtre de proximité, relativement à une rencontre en double
+MOVE_WEIGHT = 0.05
+# Température initiale du recuit simulé (décroît linéairement jusqu'à 0 sur le budget)
+INITIAL_TEMPERATURE = 0.05
+# Probabilité de cibler une rencontre en double plutôt qu'un échange aléatoire
+CONFLICT_FOCUS = 0.7
+# Nombre d'itérations entre deux vérifications de l'horloge
+CLOCK_CHECK_INTERVAL = 256
+
+
+class _KeySet:
+    """Ensemble avec tirage aléatoire en O(1) (liste + index des positions)"""
+
+    def __init__(self):
+        self.items = []
+        self.index = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, key):
+        if key not in self.index:
+            self.index[key] = len(self.items)
+            self.items.append(key)
+
+    def discard(self, key):
+        position = self.index.pop(key, None)
+        if position is None:
+            return
+        last = self.items.pop()
+        if position < len(self.items):
+            self.items[position] = last
+            self.index[last] = position
+
+    def choice(self):
+        return self.items[random.randrange(len(self.items))]
+
+
+def _hop_penalty(table_a, table_b, tableCountLabel, proximity_range):
+    """Nombre de tables parcourues au-delà de la fenêtre de proximité (distance circulaire)"""
+    if table_a is None or table_b is None:
+        return 0
+    distance = abs(table_a - table_b) % tableCountLabel
+    distance = min(distance, tableCountLabel - distance)
+    return max(0, distance - proximity_range)
+
+
+class _LocalSearch:
+    """
+    Recherche locale par échanges de deux participants d'une même rotation.
+
+    Le coût d'un échange est calculé de façon incrémentale en O(taille de table) à partir
+    du compteur de rencontres par paire, sans jamais réévaluer tout le planning.
+    """
+
+    def __init__(self, rounds_tables, participant_count, tableCountLabel, proximity_range, frozen_rounds=0):
+        self.tables = rounds_tables
+        self.n = participant_count
+        self.table_count = tableCountLabel
+        self.proximity_range = proximity_range
+        self.frozen_rounds = frozen_rounds
+        self.pair_count = {}
+        self.conflicts = _KeySet()
+        self.position = []
+
+        for tables in rounds_tables:
+            positions = [None] * participant_count
+            for t_idx, members in enumerate(tables):
+                for i, p in enumerate(members):
+                    positions[p] = t_idx
+                    for q in members[i + 1:]:
+                        self._add_pair(p, q, 1)
+            self.position.append(positions)
+
+    def _key(self, p, q):
+        return p * self.n + q if p < q else q * self.n + p
+
+    def _add_pair(self, p, q, step):
+        key = self._key(p, q)
+        count = self.pair_count.get(key, 0) + step
+        if count:
+            self.pair_count[key] = count
+        else:
+            del self.pair_count[key]
+        if count >= 2:
+            self.conflicts.add(key)
+        else:
+            self.conflicts.discard(key)
+
+    def repeat_pairs(self):
+        return sum(count - 1 for count in self.pair_count.values() if count > 1)
+
+    def move_penalty(self):
+        total = 0
+        for r in range(1, len(self.position)):
+            previous, current = self.position[r - 1], self.position[r]
+            for p in range(self.n):
+                total += _hop_penalty(previous[p], current[p], self.table_count, self.proximity_range)
+        return total
+
+    def _count(self, p, q):
+        return self.pair_count.get(self._key(p, q), 0)
+
+    def _move_cost(self, r, p, table):
+        cost = 0
+        if r > 0:
+            cost += _hop_penalty(self.position[r - 1][p], table, self.table_count, self.proximity_range)
+        if r + 1 < len(self.position):
+            cost += _hop_penalty(table, self.position[r + 1][p], self.table_count, self.proximity_range)
+        return cost
+
+    def swap_delta(self, r, p, q):
+        """Variation du coût si p et q (tables différentes de la rotation r) échangent leur place"""
+        table_p = self.position[r][p]
+        table_q = self.position[r][q]
+        members_p = self.tables[r][table_p]
+        members_q = self.tables[r][table_q]
+
+        repeats = 0
+        for x in members_p:
+            if x != p:
+                if self._count(p, x) >= 2:
+                    repeats -= 1
+                if self._count(q, x) >= 1:
+                    repeats += 1
+        for y in members_q:
+            if y != q:
+                if self._count(q, y) >= 2:
+                    repeats -= 1
+                if self._count(p, y) >= 1:
+                    repeats += 1
+
+        moves = (
+            self._move_cost(r, p, table_q) - self._move_cost(r, p, table_p)
+            + self._move_cost(r, q, table_p) - self._move_cost(r, q, table_q)
+        )
+        return repeats + MOVE_WEIGHT * moves
+
+    def apply_swap(self, r, p, q):
+        table_p = self.position[r][p]
+        table_q = self.position[r][q]
+        members_p = self.tables[r][table_p]
+        members_q = self.tables[r][table_q]
+
+        for x in members_p:
+            if x != p:
+                self._add_pair(p, x, -1)
+                self._add_pair(q, x, 1)
+        for y in members_q:
+            if y != q:
+                self._add_pair(q, y, -1)
+                self._add_pair(p, y, 1)
+
+        members_p[members_p.index(p)] = q
+        members_q[members_q.index(q)] = p
+        self.position[r][p] = table_q
+        self.position[r][q] = table_p
+
+    def _pick_swap(self):
+        """Choisit un échange candidat (r, p, q), en ciblant de préférence une rencontre en double"""
+        rounds = range(self.frozen_rounds, len(self.tables))
+        if len(self.conflicts) and random.random() < CONFLICT_FOCUS:
+            key = self.conflicts.choice()
+            a, b = divmod(key, self.n)
+            shared = [r for r in rounds if self.position[r][a] == self.position[r][b]]
+            if not shared:
+                return None
+            r = random.choice(shared)
+            p = a if random.random() < 0.5 else b
+        else:
+            r = random.randrange(self.frozen_rounds, len(self.tables))
+            p = random.randrange(self.n)
+        q = random.randrange(self.n)
+        if self.position[r][q] == self.position[r][p]:
+            return None
+        return r, p, q
+
+    def run(self, time_budget_ms):
+        iterations = 0
+        accepted = 0
+        if self.frozen_rounds >= len(self.tables) or self.table_count < 2:
+            return iterations, accepted
+
+        start = time.perf_counter()
+        deadline = start + time_budget_ms / 1000.0
+        temperature = INITIAL_TEMPERATURE
+        while True:
+            if iterations % CLOCK_CHECK_INTERVAL == 0:
+                now = time.perf_counter()
+                if now >= deadline:
+                    break
+                temperature = INITIAL_TEMPERATURE * (deadline - now) / (deadline - start)
+            iterations += 1
+
+            candidate = self._pick_swap()
+            if candidate is None:
+                continue
+            r, p, q = candidate
+            delta = self.swap_delta(r, p, q)
+            if delta <= 0 or (temperature > 0 and random.random() < math.exp(-delta / temperature)):
+                self.apply_swap(r, p, q)
+                accepted += 1
+
+        return iterations, accepted
+
+
+def optimize_rounds(rounds_tables, participant_count, tableCountLabel, time_budget_ms, proximity_range, frozen_rounds=0):
+    """
+    Améliore en place un planning (identifiants entiers, `rounds_tables[r][t]` = membres)
+    par recuit simulé sur des échanges de participants, dans la limite de `time_budget_ms`.
+    Les `frozen_rounds` premières rotations ne sont jamais modifiées.
+
+    Retourne un résumé de l'optimisation destiné aux métadonnées.
+    """
+    search = _LocalSearch(rounds_tables, participant_count, tableCountLabel, proximity_range, frozen_rounds)
+    repeats_before = search.repeat_pairs()
+    moves_before = search.move_penalty()
+
+    iterations, accepted = search.run(time_budget_ms)
+
+    summary = {
+        "mode": "local_search",
+        "time_budget_ms": time_budget_ms,
+        "iterations": iterations,
+        "accepted_swaps": accepted,
+        "repeat_pairs_before": repeats_before,
+        "repeat_pairs_after": search.repeat_pairs(),
+        "move_penalty_before": moves_before,
+        "move_penalty_after": search.move_penalty(),
+    }
+    logger.info(
+        f"Optimisation locale : {iterations} itérations, doublons {repeats_before} -> {summary['repeat_pairs_after']}"
+    )
+    return summary
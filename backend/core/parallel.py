@@ -0,0 +1,99 @@
+import random
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from core.config import settings
+from core.logic import generate_rounds
+from core.metrics import compute_metrics
+
+logger = logging.getLogger(__name__)
+
+# Nombre maximal de seeds évalués pour une même génération
+MAX_SEEDS = 64
+# Poids des critères dans le score global (plus le score est bas, meilleur est le planning)
+SIZE_VARIANCE_WEIGHT = 1.0
+MOVE_DISTANCE_WEIGHT = 0.001
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_process_pool():
+    """
+    Pool de processus unique du serveur (générations multi-seeds, cartes, tâches de fond),
+    de PROCESS_POOL_WORKERS processus, créé au premier usage
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=settings.PROCESS_POOL_WORKERS)
+    return _executor
+
+
+def score_schedule(metrics):
+    """
+    Score d'un planning à partir de ses indicateurs (`compute_metrics`) : rencontres en double,
+    variance des tailles de tables et distance totale parcourue entre deux rotations.
+    """
+    repeat_pairs = metrics["repeat_encounters"]
+    size_variance = metrics["table_size"]["variance"]
+    move_distance = metrics["table_hops"]["total"]
+    return {
+        "repeat_pairs": repeat_pairs,
+        "table_size_variance": size_variance,
+        "move_distance": move_distance,
+        "total": round(
+            repeat_pairs + SIZE_VARIANCE_WEIGHT * size_variance + MOVE_DISTANCE_WEIGHT * move_distance, 4
+        ),
+    }
+
+
+def _generate_and_score(args):
+    """Exécuté dans un processus du pool : génère un planning pour un seed et le score"""
+    participants_input, tableCountLabel, numberOfRounds, seed, optimize_ms = args
+    result = generate_rounds(participants_input, tableCountLabel, numberOfRounds, seed=seed, optimize_ms=optimize_ms)
+    if "error" in result:
+        return seed, result, None
+    metrics = compute_metrics(result["rounds"], tableCountLabel)
+    result["metadata"]["metrics"] = metrics
+    return seed, result, score_schedule(metrics)
+
+
+def generate_best_rounds(participants_input, tableCountLabel, numberOfRounds, seed_count, seed=None, optimize_ms=None):
+    """
+    Génère `seed_count` plannings avec des seeds différents, en parallèle sur un pool
+    de processus, et retourne le meilleur (score le plus bas) au format de `generate_rounds`.
+    """
+    if seed_count <= 0 or seed_count > MAX_SEEDS:
+        return {"error": f"Nombre de seeds doit être compris entre 1 et {MAX_SEEDS}"}
+
+    base_seed = seed if seed is not None else random.randrange(2 ** 31)
+    tasks = [
+        (participants_input, tableCountLabel, numberOfRounds, base_seed + i, optimize_ms)
+        for i in range(seed_count)
+    ]
+
+    # Le premier seed est calculé localement : erreurs de paramètres et plannings algébriques
+    # (déterministes, sans doublon) ne nécessitent pas de solliciter le pool
+    first_seed, best_result, best_score = _generate_and_score(tasks[0])
+    if best_score is None:
+        return best_result
+    best_seed = first_seed
+    scores = [{"seed": first_seed, **best_score}]
+
+    if seed_count > 1 and best_result["metadata"].get("strategy") != "resolvable_design":
+        for task_seed, result, score in get_process_pool().map(_generate_and_score, tasks[1:]):
+            scores.append({"seed": task_seed, **score})
+            if score["total"] < best_score["total"]:
+                best_seed, best_result, best_score = task_seed, result, score
+
+    logger.info(f"Meilleur planning sur {len(scores)} seeds : seed {best_seed}, score {best_score['total']}")
+
+    best_result["metadata"]["selection"] = {
+        "seeds_tried": len(scores),
+        "best_seed": best_seed,
+        "score": best_score,
+        "scores": scores,
+    }
+    return best_result
@@ -0,0 +1,197 @@
+import asyncio
+import datetime
+import logging
+import threading
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _isoformat(value):
+    return value.isoformat() if value is not None else None
+
+
+class RotationClock:
+    """
+    Horloge des rotations d'une session : rotation courante, heure de début de cette rotation
+    et durée d'une rotation (total_duration_minutes réparti sur les rotations).
+    Avec une durée, les rotations suivantes démarrent automatiquement ; sans durée, seulement à la main.
+    """
+
+    __slots__ = ("session_id", "current_round", "round_started_at", "round_seconds", "round_numbers", "ended")
+
+    def __init__(self, session_id, current_round, round_started_at, round_seconds, round_numbers, ended=False):
+        self.session_id = session_id
+        self.current_round = current_round
+        self.round_started_at = round_started_at
+        self.round_seconds = round_seconds
+        self.round_numbers = tuple(round_numbers)
+        self.ended = ended
+
+    @classmethod
+    def from_session(cls, session, round_numbers):
+        """Horloge d'une MeetingSession (ou d'une ligne avec les mêmes colonnes), rotations dans l'ordre de rounds_data"""
+        round_seconds = None
+        if session.total_duration_minutes and round_numbers:
+            round_seconds = session.total_duration_minutes * 60 / len(round_numbers)
+        return cls(
+            session.id, session.current_round, session.round_started_at, round_seconds, round_numbers,
+            ended=not session.is_active
+        )
+
+    def position(self, now: datetime.datetime):
+        """(rotation, début, fin prévue) à l'instant `now` ; (None, None, None) tant que l'horloge n'est pas lancée"""
+        if self.current_round is None or self.round_started_at is None:
+            return None, None, None
+        if self.round_seconds is None or self.current_round not in self.round_numbers:
+            return self.current_round, self.round_started_at, None
+
+        # Rotations écoulées depuis le dernier réglage, sans dépasser la dernière rotation
+        r = self.round_numbers.index(self.current_round)
+        elapsed = max(0.0, (now - self.round_started_at).total_seconds())
+        steps = min(int(elapsed // self.round_seconds), len(self.round_numbers) - 1 - r)
+        started_at = self.round_started_at + datetime.timedelta(seconds=steps * self.round_seconds)
+        return self.round_numbers[r + steps], started_at, started_at + datetime.timedelta(seconds=self.round_seconds)
+
+    def next_change_at(self, now: datetime.datetime):
+        """Heure du prochain démarrage automatique de rotation, ou None"""
+        if self.ended or self.round_seconds is None:
+            return None
+        current_round, _, ends_at = self.position(now)
+        if current_round is None or ends_at is None or current_round == self.round_numbers[-1]:
+            return None
+        return ends_at
+
+    def next_round(self, now: datetime.datetime):
+        """Rotation qui suit la rotation en cours (la première si l'horloge n'est pas lancée), ou None après la dernière"""
+        current_round, _, _ = self.position(now)
+        if current_round is None:
+            return self.round_numbers[0] if self.round_numbers else None
+        if current_round not in self.round_numbers:
+            return None
+        r = self.round_numbers.index(current_round)
+        return self.round_numbers[r + 1] if r + 1 < len(self.round_numbers) else None
+
+    def snapshot(self, now: datetime.datetime) -> dict:
+        """État diffusé aux participants : {"session_id", "round", "started_at", "ends_at", "total_rounds", "ended"}"""
+        current_round, started_at, ends_at = self.position(now)
+        return {
+            "session_id": self.session_id,
+            "round": current_round,
+            "started_at": _isoformat(started_at),
+            "ends_at": _isoformat(ends_at),
+            "total_rounds": len(self.round_numbers),
+            "ended": self.ended,
+        }
+
+
+class RotationBroadcaster:
+    """
+    Diffusion asyncio des changements de rotation vers les connexions SSE.
+
+    Une file (asyncio.Queue bornée) par connexion et une seule minuterie par session : chaque changement
+    est calculé une fois puis déposé dans toutes les files de la session. Une connexion lente perd
+    les états intermédiaires mais reçoit toujours le dernier.
+    publish() peut être appelé depuis un thread (routes synchrones) : la diffusion passe par la boucle asyncio.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._loop = None
+        self._clocks = {}
+        self._snapshots = {}
+        self._subscribers = {}
+        self._timers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, session_id, clock: RotationClock) -> asyncio.Queue:
+        """
+        Nouvelle file pour la session, qui reçoit tout de suite l'état courant.
+        `clock` (lu en base) remplace l'horloge en mémoire si personne n'écoutait la session.
+        """
+        self._loop = asyncio.get_running_loop()
+        subscribers = self._subscribers.setdefault(session_id, set())
+        with self._lock:
+            if not subscribers or session_id not in self._clocks:
+                self._clocks[session_id] = clock
+
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        subscribers.add(queue)
+        previous = self._snapshots.get(session_id)
+        self._refresh(session_id)
+        # État inchangé : pas diffusé par _refresh, envoyé à la seule nouvelle connexion
+        if self._snapshots[session_id] is previous:
+            queue.put_nowait(previous)
+        return queue
+
+    def unsubscribe(self, session_id, queue: asyncio.Queue) -> None:
+        subscribers = self._subscribers.get(session_id)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            # Plus personne à l'écoute : ni minuterie ni état gardés pour la session
+            del self._subscribers[session_id]
+            self._cancel_timer(session_id)
+            self._snapshots.pop(session_id, None)
+            with self._lock:
+                clock = self._clocks.get(session_id)
+                if clock is not None and clock.ended:
+                    del self._clocks[session_id]
+
+    def subscriber_count(self, session_id=None) -> int:
+        if session_id is not None:
+            return len(self._subscribers.get(session_id, ()))
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def publish(self, clock: RotationClock) -> None:
+        """Nouvelle horloge d'une session (rotation réglée, session terminée) : diffusée aux connexions ouvertes"""
+        with self._lock:
+            self._clocks[clock.session_id] = clock
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._refresh(clock.session_id)
+        else:
+            loop.call_soon_threadsafe(self._refresh, clock.session_id)
+
+    def _refresh(self, session_id) -> None:
+        """Recalcule l'état de la session, le diffuse s'il a changé et programme le prochain changement automatique"""
+        self._cancel_timer(session_id)
+        subscribers = self._subscribers.get(session_id)
+        clock = self._clocks.get(session_id)
+        if not subscribers or clock is None:
+            return
+
+        now = datetime.datetime.utcnow()
+        snapshot = clock.snapshot(now)
+        if snapshot != self._snapshots.get(session_id):
+            self._snapshots[session_id] = snapshot
+            for queue in subscribers:
+                self._offer(queue, snapshot)
+
+        next_change_at = clock.next_change_at(now)
+        if next_change_at is not None:
+            # Petite marge : la minuterie (horloge monotone) ne doit pas précéder le changement d'heure murale
+            delay = max(0.0, (next_change_at - now).total_seconds()) + 0.05
+            self._timers[session_id] = self._loop.call_later(delay, self._refresh, session_id)
+
+    def _cancel_timer(self, session_id) -> None:
+        timer = self._timers.pop(session_id, None)
+        if timer is not None:
+            timer.cancel()
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, snapshot: dict) -> None:
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(snapshot)
+
+
+rotation_broadcaster = RotationBroadcaster(settings.SSE_QUEUE_SIZE)
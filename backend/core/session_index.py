@@ -0,0 +1,93 @@
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class SessionIndex:
+    """
+    Index d'une session construit en un seul parcours de rounds_data, pour les traitements de la session
+    entière (PDF, export, cartes du plan gratuit, rotations de l'horloge). Les participants y sont repérés
+    par leur libellé : les lectures par participant passent par participant_table_assignments (identifiant).
+
+    - participants : noms (chaînes) dans l'ordre de première apparition, position = identifiant compact
+    - round_numbers : numéros de rotation dans l'ordre de rounds_data
+    - table_ids / table_names : tables rencontrées (triées) et leur libellé
+    - tables_by_round[r][p] : table_id du participant p à la rotation d'index r (0 si absent)
+    - members_by_round[r][table_id] : positions des membres de la table à la rotation d'index r
+    """
+
+    __slots__ = (
+        "participants", "positions", "round_numbers", "round_positions",
+        "table_ids", "table_names", "tables_by_round", "members_by_round",
+    )
+
+    def __init__(self, rounds_data: Optional[List[Dict[str, Any]]]):
+        participants: List[str] = []
+        positions: Dict[str, int] = {}
+        table_names: Dict[int, str] = {}
+        self.round_numbers: List[int] = []
+        self.tables_by_round: List[array] = []
+        self.members_by_round: List[Dict[int, Tuple[int, ...]]] = []
+
+        for round_data in rounds_data or []:
+            row = array("i", [0]) * len(participants)
+            members_by_table = {}
+            for table_info in round_data.get("tables", []):
+                table_id = int(table_info.get("table_id") or 0)
+                if table_id and table_id not in table_names:
+                    table_names[table_id] = table_info.get("table_name", f"Table {table_id}")
+                members = []
+                for member in table_info.get("members", []):
+                    name = str(member)
+                    position = positions.get(name)
+                    if position is None:
+                        position = positions[name] = len(participants)
+                        participants.append(name)
+                        row.append(0)
+                    row[position] = table_id
+                    members.append(position)
+                members_by_table[table_id] = tuple(members)
+            self.round_numbers.append(int(round_data.get("round", 0)))
+            self.tables_by_round.append(row)
+            self.members_by_round.append(members_by_table)
+
+        # Les rotations antérieures à l'arrivée d'un participant sont complétées par 0
+        for row in self.tables_by_round:
+            if len(row) < len(participants):
+                row.extend(array("i", [0]) * (len(participants) - len(row)))
+
+        self.participants = participants
+        self.positions = positions
+        self.round_positions = {round_number: r for r, round_number in enumerate(self.round_numbers)}
+        self.table_ids = sorted(table_names)
+        self.table_names = table_names
+
+    def __len__(self) -> int:
+        return len(self.participants)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.positions
+
+    def table_at(self, position: int, round_number: int) -> int:
+        """table_id du participant (par position) à une rotation donnée, 0 si absent"""
+        r = self.round_positions.get(round_number)
+        return self.tables_by_round[r][position] if r is not None else 0
+
+    def member_names(self, round_number: int, table_id: int) -> List[str]:
+        """Noms des membres d'une table à une rotation donnée"""
+        r = self.round_positions.get(round_number)
+        if r is None:
+            return []
+        return [self.participants[p] for p in self.members_by_round[r].get(table_id, ())]
+
+    def itinerary(self, name: str) -> List[Tuple[int, int, str, Tuple[str, ...]]]:
+        """[(rotation, table_id, table_name, membres de la table)] d'un participant, dans l'ordre des rotations"""
+        position = self.positions.get(name)
+        if position is None:
+            return []
+        stops = []
+        for r, row in enumerate(self.tables_by_round):
+            table_id = row[position]
+            if table_id:
+                members = tuple(self.participants[p] for p in self.members_by_round[r].get(table_id, ()))
+                stops.append((self.round_numbers[r], table_id, self.table_names.get(table_id, f"Table {table_id}"), members))
+        return stops
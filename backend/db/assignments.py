@@ -0,0 +1,148 @@
+from sqlalchemy import and_, insert, or_, select
+from sqlalchemy.orm import Session
+
+from .models import MeetingSession, Participant, ParticipantTableAssignment, Table
+
+
+def participant_seats(participants) -> dict:
+    """
+    Places à attribuer : libellé unique dans rounds_data -> identifiant, pour les participants actifs.
+    Les homonymes sont distingués par " (2)", " (3)"... dans l'ordre des identifiants ; les libellés
+    sont calculés sur tous les participants (actifs ou non) pour rester stables d'une génération à l'autre.
+    """
+    names = {p.nom_complet for p in participants if p.nom_complet}
+    labels = set()
+    seats = {}
+    for participant in sorted((p for p in participants if p.nom_complet), key=lambda p: p.id):
+        label = participant.nom_complet
+        suffix = 2
+        while label in labels:
+            label = f"{participant.nom_complet} ({suffix})"
+            suffix += 1
+            if label in names:
+                label = participant.nom_complet
+        labels.add(label)
+        if participant.is_active:
+            seats[label] = participant.id
+    return seats
+
+
+def store_assignments(db: Session, session_id: int, rounds: list, seats: dict) -> int:
+    """
+    Remplace les tables et affectations normalisées d'une session à partir de rounds_data,
+    une ligne par participant (identifiant) et par rotation ; `seats` vient de participant_seats.
+    Insertion groupée (executemany) dans la transaction courante, sans commit.
+    Retourne le nombre d'affectations insérées.
+    """
+    db.query(ParticipantTableAssignment).filter(
+        ParticipantTableAssignment.session_id == session_id
+    ).delete(synchronize_session=False)
+    db.query(Table).filter(Table.session_id == session_id).delete(synchronize_session=False)
+
+    table_names = {}
+    for round_data in rounds:
+        for table in round_data.get("tables", []):
+            table_id = table.get("table_id")
+            table_names.setdefault(table_id, table.get("table_name", f"Table {table_id}"))
+
+    tables = [
+        Table(nom=name, numero=numero, session_id=session_id)
+        for numero, name in sorted(table_names.items())
+    ]
+    db.add_all(tables)
+    db.flush()
+    table_pk = {table.numero: table.id for table in tables}
+
+    rows = []
+    for round_data in rounds:
+        round_number = round_data.get("round", 0)
+        for table in round_data.get("tables", []):
+            table_id = table_pk[table.get("table_id")]
+            for member in table.get("members", []):
+                participant_id = seats.get(member)
+                if participant_id is not None:
+                    rows.append({
+                        "participant_id": participant_id,
+                        "table_id": table_id,
+                        "session_id": session_id,
+                        "round_number": round_number,
+                    })
+
+    if rows:
+        db.execute(insert(ParticipantTableAssignment), rows)
+    return len(rows)
+
+
+def participant_stops_statement(session_id: int, participant_id: int):
+    """
+    Affectations d'un participant dans une session, par l'index (session_id, participant_id) :
+    (rotation, table_id affiché, nom de table, id de la ligne Table), dans l'ordre des rotations.
+    """
+    return (
+        select(ParticipantTableAssignment.round_number, Table.numero, Table.nom, Table.id)
+        .join(Table, Table.id == ParticipantTableAssignment.table_id)
+        .filter(
+            ParticipantTableAssignment.session_id == session_id,
+            ParticipantTableAssignment.participant_id == participant_id
+        )
+        .order_by(ParticipantTableAssignment.round_number)
+    )
+
+
+def table_members_statement(session_id: int, stops):
+    """
+    Membres des tables parcourues (`stops` de participant_stops_statement), une recherche
+    par l'index (session_id, round_number, table_id) pour chaque rotation :
+    (rotation, id de la ligne Table, id du participant, nom_complet).
+    """
+    return (
+        select(
+            ParticipantTableAssignment.round_number, ParticipantTableAssignment.table_id,
+            Participant.id, Participant.nom_complet
+        )
+        .join(Participant, Participant.id == ParticipantTableAssignment.participant_id)
+        .filter(
+            ParticipantTableAssignment.session_id == session_id,
+            or_(*(
+                and_(ParticipantTableAssignment.round_number == round_number, ParticipantTableAssignment.table_id == table_pk)
+                for round_number, _, _, table_pk in stops
+            ))
+        )
+        .order_by(ParticipantTableAssignment.round_number, Participant.id)
+    )
+
+
+def latest_participant_session_statement(participant_id: int):
+    """Dernière session où le participant a une place (id, date, organisateur), par l'index (participant_id, session_id)"""
+    latest = (
+        select(ParticipantTableAssignment.session_id)
+        .filter(ParticipantTableAssignment.participant_id == participant_id)
+        .order_by(ParticipantTableAssignment.session_id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    return select(MeetingSession.id, MeetingSession.created_at, MeetingSession.organizer).filter(MeetingSession.id == latest)
+
+
+def session_itineraries(db: Session, session_id: int) -> list:
+    """
+    Itinéraires de tous les participants d'une session, lus par l'index (session_id, participant_id) :
+    [(participant_id, nom_complet, email, [(rotation, nom de table)])], dans l'ordre des identifiants.
+    Liste vide pour une session sans affectations (plan gratuit).
+    """
+    rows = (
+        db.query(
+            ParticipantTableAssignment.participant_id, Participant.nom_complet, Participant.email,
+            ParticipantTableAssignment.round_number, Table.nom
+        )
+        .join(Participant, Participant.id == ParticipantTableAssignment.participant_id)
+        .join(Table, Table.id == ParticipantTableAssignment.table_id)
+        .filter(ParticipantTableAssignment.session_id == session_id)
+        .order_by(ParticipantTableAssignment.participant_id, ParticipantTableAssignment.round_number)
+    )
+    itineraries = []
+    for participant_id, nom_complet, email, round_number, table_name in rows:
+        if not itineraries or itineraries[-1][0] != participant_id:
+            itineraries.append((participant_id, nom_complet, email, []))
+        itineraries[-1][3].append((round_number, table_name))
+    return itineraries
@@ -1,16 +1,131 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import StaticPool
 from datetime import timedelta
 from fastapi import HTTPException
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./speed_meeting.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}, pool_pre_ping=True)
+from core.config import settings
+
+DATABASE_URL = settings.DATABASE_URL
+
+# Pilotes asynchrones utilisés par défaut pour dériver l'URL asynchrone de DATABASE_URL
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg", "mysql": "aiomysql"}
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Réglages appliqués à chaque nouvelle connexion SQLite :
+    - WAL : les lectures ne sont plus bloquées par une écriture en cours (génération, import)
+    - synchronous=NORMAL : sûr en WAL, sans fsync à chaque commit
+    - busy_timeout : un écrivain attend le verrou au lieu d'échouer avec "database is locked"
+    - cache_size / mmap_size : pages gardées en mémoire et lectures par projection mémoire
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+
+def _engine_options(database_url) -> dict:
+    """
+    Options communes des moteurs synchrone et asynchrone.
+
+    SQLite : pool de connexions persistantes réglées par _set_sqlite_pragmas, sans pre_ping
+    (inutile sur un fichier local) ; une base en mémoire partage une connexion unique.
+    Autre serveur (PostgreSQL, MySQL...) : pool dimensionné par DB_POOL_SIZE / DB_MAX_OVERFLOW,
+    avec pre_ping et recyclage des connexions coupées par le serveur.
+    """
+    if database_url.get_backend_name() != "sqlite":
+        return {
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+            "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+            "pool_pre_ping": True,
+        }
+
+    options = {"connect_args": {"check_same_thread": False, "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000}}
+    if database_url.database in (None, "", ":memory:"):
+        options["poolclass"] = StaticPool
+    else:
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        )
+    return options
+
+
+def create_db_engine(url: str = DATABASE_URL):
+    """Moteur SQLAlchemy pour `url` (voir _engine_options)"""
+    database_url = make_url(url)
+    db_engine = create_engine(database_url, **_engine_options(database_url))
+    if database_url.get_backend_name() == "sqlite":
+        event.listen(db_engine, "connect", _set_sqlite_pragmas)
+    return db_engine
+
+
+def async_database_url(url: str = DATABASE_URL) -> str:
+    """URL asynchrone : ASYNC_DATABASE_URL si défini, sinon DATABASE_URL avec le pilote asynchrone du dialecte"""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    database_url = make_url(url)
+    driver = ASYNC_DRIVERS.get(database_url.get_backend_name())
+    if driver is None:
+        raise ValueError(f"Pas de pilote asynchrone connu pour {database_url.get_backend_name()}")
+    return database_url.set(drivername=f"{database_url.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+
+def create_async_db_engine(url: str = DATABASE_URL):
+    """Moteur asynchrone (AsyncEngine) avec les mêmes réglages de pool et de PRAGMA que create_db_engine"""
+    database_url = make_url(async_database_url(url))
+    db_engine = create_async_engine(database_url, **_engine_options(database_url))
+    if database_url.get_backend_name() == "sqlite":
+        event.listen(db_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return db_engine
+
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+_async_engine = None
+_async_session_factory = None
+
+
+def get_async_engine():
+    """Moteur asynchrone partagé, créé au premier usage (le pilote asynchrone n'est chargé qu'à ce moment)"""
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_db_engine()
+    return _async_engine
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    """Nouvelle AsyncSession sur le moteur asynchrone partagé (pendant de SessionLocal)"""
+    global _async_session_factory
+    if _async_session_factory is None:
+        _async_session_factory = async_sessionmaker(get_async_engine(), autoflush=False, expire_on_commit=False)
+    return _async_session_factory()
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    """Dépendance FastAPI des routes `async def` : session asynchrone, fermée en fin de requête"""
+    async with AsyncSessionLocal() as db:
+        yield db
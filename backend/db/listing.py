@@ -0,0 +1,124 @@
+"""
+Listes paginées des routes d'administration : pagination par clé (id), projection `fields=`,
+total optionnel et ETag calculé sans lire les lignes (id maximal + compteur de modifications de la table).
+"""
+import datetime
+import hashlib
+import logging
+
+from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from db.models import ChangeCounter
+from utils.pdf_cache import etag_matches
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Tables dont les listes sont servies avec ETag : chaque écriture (ORM, import groupé, migration) incrémente leur compteur
+VERSIONED_TABLES = ("participants", "organizer_requests")
+
+
+def _counter_triggers(table: str):
+    for operation in ("INSERT", "UPDATE", "DELETE"):
+        yield (
+            f"CREATE TRIGGER IF NOT EXISTS {table}_version_{operation.lower()} AFTER {operation} ON {table} BEGIN "
+            f"UPDATE change_counters SET version = version + 1 WHERE name = '{table}'; END"
+        )
+
+
+def ensure_change_counters(engine) -> None:
+    """Crée les lignes de change_counters et les triggers qui les incrémentent (idempotent, SQLite)"""
+    if engine.dialect.name != "sqlite":
+        logger.warning("Compteurs de modifications non disponibles hors SQLite : ETag basés sur l'id maximal et le total")
+        return
+    with engine.begin() as connection:
+        for table in VERSIONED_TABLES:
+            connection.execute(
+                text("INSERT OR IGNORE INTO change_counters (name, version) VALUES (:name, 0)"), {"name": table}
+            )
+            for statement in _counter_triggers(table):
+                connection.execute(text(statement))
+
+
+def parse_fields(fields: str | None, allowed) -> list:
+    """Colonnes demandées par `fields=a,b` (toutes par défaut) ; l'id est toujours inclus (curseur)"""
+    if not fields:
+        return list(allowed)
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Champs inconnus: {', '.join(unknown)}. Champs autorises: {', '.join(allowed)}")
+    return ["id"] + [field for field in requested if field != "id"]
+
+
+def parse_cursor(cursor: str | None) -> int | None:
+    if cursor is None or cursor == "":
+        return None
+    if not cursor.isdigit():
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+    return int(cursor)
+
+
+def list_etag(db: Session, model, request: Request) -> str:
+    """ETag faible : table, id maximal, compteur de modifications et paramètres de la requête"""
+    table = model.__tablename__
+    max_id = db.query(func.max(model.id)).scalar() or 0
+    version = db.query(ChangeCounter.version).filter(ChangeCounter.name == table).scalar()
+    if version is None:
+        # Sans compteur (autre base de données) : le total détecte au moins les suppressions
+        version = f"n{db.query(func.count(model.id)).scalar()}"
+    params = "&".join(sorted(f"{key}={value}" for key, value in request.query_params.multi_items()))
+    digest = hashlib.sha1(f"{table}:{max_id}:{version}:{params}".encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def _json_value(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return value
+
+
+def list_page(
+    request: Request,
+    db: Session,
+    model,
+    fields: list,
+    filters: list,
+    cursor: str | None,
+    limit: int,
+    include_total: bool,
+    descending: bool = False,
+):
+    """
+    Page de `model` en JSON : {"results", "count", "next_cursor", "total"}.
+    Pagination par clé sur l'id (croissant, ou décroissant si `descending`) : `next_cursor` est le dernier id de la page.
+    Répond 304 si If-None-Match correspond à l'ETag, sans lire les lignes.
+    """
+    etag = list_etag(db, model, request)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    after = parse_cursor(cursor)
+
+    query = db.query(*[getattr(model, field) for field in fields]).filter(*filters)
+    if after is not None:
+        query = query.filter(model.id < after if descending else model.id > after)
+    query = query.order_by(model.id.desc() if descending else model.id.asc())
+
+    # Une ligne de plus que la page pour savoir s'il existe une page suivante
+    rows = query.limit(limit + 1).all()
+    next_cursor = str(rows[limit - 1][0]) if len(rows) > limit else None
+    results = [{field: _json_value(value) for field, value in zip(fields, row)} for row in rows[:limit]]
+
+    total = db.query(func.count(model.id)).filter(*filters).scalar() if include_total else None
+    return JSONResponse(
+        content={"results": results, "count": len(results), "next_cursor": next_cursor, "total": total},
+        headers=headers,
+    )
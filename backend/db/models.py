@@ -1,6 +1,8 @@
-from sqlalchemy import Column, Integer, String, JSON, DateTime, ForeignKey, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, JSON, DateTime, ForeignKey, Boolean, Index, Float, event, inspect
+from sqlalchemy.orm import deferred, relationship
 from .database import Base
+from utils.pdf_cache import rounds_digest
+from utils.text import participant_normalized_fields
 import datetime
 
 class OrganizerRequest(Base):
@@ -18,6 +20,10 @@ class OrganizerRequest(Base):
 
 class Participant(Base):
     __tablename__ = "participants"  
+    __table_args__ = (
+        Index("ix_participants_nom_complet_key", "nom_complet_key"),
+        Index("ix_participants_email_key", "email_key"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     nom = Column(String)
     prenom = Column(String)
@@ -27,18 +33,39 @@ class Participant(Base):
     profession = Column(String, nullable=True)
     entreprise = Column(String, nullable=True)
     is_active = Column(Boolean, default=True)
+    # Texte normalisé (sans accents, minuscules) indexé par participants_fts (voir db/search.py) ;
+    # différé pour ne pas apparaître dans les réponses de l'API
+    search_name = deferred(Column(String, nullable=True))
+    search_extra = deferred(Column(String, nullable=True))
+    # Nom complet et email normalisés de la même façon : connexion par égalité sur index
+    nom_complet_key = deferred(Column(String, nullable=True))
+    email_key = deferred(Column(String, nullable=True))
     affectations = relationship("ParticipantTableAssignment", back_populates="participant")
 
+
+@event.listens_for(Participant, "before_insert")
+@event.listens_for(Participant, "before_update")
+def _set_participant_normalized_fields(mapper, connection, target):
+    """Colonnes de recherche et clés de connexion recalculées à chaque écriture ORM (l'import groupé les calcule lui-même)"""
+    fields = participant_normalized_fields(target.nom_complet, target.nom, target.prenom, target.entreprise, target.email)
+    for key, value in fields.items():
+        setattr(target, key, value)
+
 class Table(Base):
     __tablename__ = "tables"
     id = Column(Integer, primary_key=True, index=True)
     nom = Column(String)
+    numero = Column(Integer, nullable=True)  # table_id affiché dans rounds_data (1..N)
     session_id = Column(Integer, ForeignKey("sessions.id"), nullable=True)
     affectations = relationship("ParticipantTableAssignment", back_populates="table")
     session = relationship("MeetingSession", back_populates="tables")
 
 class MeetingSession(Base):
     __tablename__ = "sessions"
+    # Session courante d'un organisateur sans tri (voir core/active_sessions.py)
+    __table_args__ = (
+        Index("ix_sessions_organizer_id", "organizer", "id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     ended_at = Column(DateTime, nullable=True)
@@ -47,11 +74,29 @@ class MeetingSession(Base):
     number_of_tables = Column(Integer)
     number_of_rounds = Column(Integer)
     rounds_data = Column(JSON)
+    # Empreinte de rounds_data, recalculée à chaque écriture : clé du cache PDF et ETag sans relire les rotations
+    rounds_digest = Column(String, nullable=True)
+    organizer = Column(String, nullable=True)
+    # Horloge des rotations : rotation en cours et heure de début (durée : total_duration_minutes / rotations)
+    current_round = Column(Integer, nullable=True)
+    round_started_at = Column(DateTime, nullable=True)
     assignment_rows = relationship("ParticipantTableAssignment", back_populates="session")
     tables = relationship("Table", back_populates="session")
 
+@event.listens_for(MeetingSession, "before_insert")
+@event.listens_for(MeetingSession, "before_update")
+def _set_rounds_digest(mapper, connection, target):
+    """rounds_digest recalculé quand rounds_data est écrit (génération, replanification)"""
+    if target.rounds_digest is None or inspect(target).attrs.rounds_data.history.has_changes():
+        target.rounds_digest = rounds_digest(target.rounds_data)
+
 class ParticipantTableAssignment(Base):
     __tablename__ = "participant_table_assignments"
+    __table_args__ = (
+        Index("ix_assignments_session_participant", "session_id", "participant_id"),
+        Index("ix_assignments_participant_session", "participant_id", "session_id"),
+        Index("ix_assignments_session_round_table", "session_id", "round_number", "table_id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     participant_id = Column(Integer, ForeignKey("participants.id"), nullable=False)
     table_id = Column(Integer, ForeignKey("tables.id"), nullable=False)
@@ -62,3 +107,21 @@ class ParticipantTableAssignment(Base):
     table = relationship("Table", back_populates="affectations")
     session = relationship("MeetingSession", back_populates="assignment_rows")
 
+class Job(Base):
+    __tablename__ = "jobs"
+    id = Column(String, primary_key=True, index=True)
+    kind = Column(String, index=True)  # generate, import, pdf
+    status = Column(String, default="pending")  # pending, running, done, error
+    progress = Column(Float, default=0.0)
+    result = Column(JSON, nullable=True)
+    error = Column(String, nullable=True)
+    timings = Column(JSON, nullable=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+class ChangeCounter(Base):
+    """Compteur de modifications d'une table, incrémenté par triggers (voir db/listing.py) : sert aux ETag des listes"""
+    __tablename__ = "change_counters"
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,175 @@
+"""
+Recherche des participants : index plein texte SQLite FTS5 sur les colonnes normalisées
+search_name / search_extra de `participants`, synchronisé par triggers.
+Sans FTS5 (autre base de données), repli sur des LIKE préfixe sur ces mêmes colonnes.
+"""
+import base64
+import json
+import logging
+
+from sqlalchemy import and_, or_, select, text
+
+from db.models import Participant
+from utils.text import participant_search_fields, search_words
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "participants_fts"
+# Les noms pèsent plus que l'entreprise et l'email dans le classement bm25
+NAME_WEIGHT = 10.0
+EXTRA_WEIGHT = 1.0
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+FTS_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        search_name, search_extra,
+        content='participants', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='1 2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON participants BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, search_name, search_extra) VALUES (new.id, new.search_name, new.search_extra);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON participants BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_name, search_extra)
+        VALUES ('delete', old.id, old.search_name, old.search_extra);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF search_name, search_extra ON participants BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_name, search_extra)
+        VALUES ('delete', old.id, old.search_name, old.search_extra);
+        INSERT INTO {FTS_TABLE}(rowid, search_name, search_extra) VALUES (new.id, new.search_name, new.search_extra);
+    END""",
+]
+
+# Renseigné par ensure_search_index au démarrage ; False = repli LIKE
+fts_enabled = False
+
+
+def backfill_search_fields(connection, refresh: bool = False) -> int:
+    """
+    Calcule search_name / search_extra des participants qui n'en ont pas (tous avec refresh=True,
+    après un changement de normalisation) ; retourne le nombre de lignes modifiées
+    """
+    query = "SELECT id, nom_complet, nom, prenom, entreprise, email, search_name, search_extra FROM participants"
+    if not refresh:
+        query += " WHERE search_name IS NULL"
+    updates = []
+    for row in connection.execute(text(query)).fetchall():
+        fields = participant_search_fields(row.nom_complet, row.nom, row.prenom, row.entreprise, row.email)
+        if (row.search_name, row.search_extra) != (fields["search_name"], fields["search_extra"]):
+            updates.append({"id": row.id, **fields})
+    if updates:
+        # Le trigger AFTER UPDATE resynchronise l'index FTS5
+        connection.execute(
+            text("UPDATE participants SET search_name = :search_name, search_extra = :search_extra WHERE id = :id"),
+            updates
+        )
+    return len(updates)
+
+
+def ensure_search_index(engine) -> bool:
+    """
+    Crée la table FTS5 et ses triggers si besoin (idempotent), complète les colonnes normalisées
+    manquantes et reconstruit l'index s'il vient d'être créé. Retourne True si FTS5 est utilisable.
+    """
+    global fts_enabled
+    if engine.dialect.name != "sqlite":
+        fts_enabled = False
+        return False
+
+    try:
+        with engine.begin() as connection:
+            exists = connection.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": FTS_TABLE}
+            ).first() is not None
+            # Colonnes absentes des bases créées avant la recherche normalisée : lancer migrate_add_search_index.py
+            columns = {row[1] for row in connection.execute(text("PRAGMA table_info(participants)"))}
+            if "search_name" not in columns:
+                logger.warning("Colonnes de recherche absentes, lancer migrate_add_search_index.py")
+                fts_enabled = False
+                return False
+
+            filled = backfill_search_fields(connection)
+            for statement in FTS_DDL:
+                connection.execute(text(statement))
+            if not exists:
+                connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+                logger.info(f"Index de recherche {FTS_TABLE} créé ({filled} participants normalisés)")
+    except Exception as exc:
+        logger.warning(f"Index FTS5 indisponible, recherche par LIKE : {exc}")
+        fts_enabled = False
+        return False
+
+    fts_enabled = True
+    return True
+
+
+def search_tokens(query: str):
+    """Mots de la recherche, découpés et normalisés comme les colonnes indexées (la syntaxe FTS5 est ignorée)"""
+    return search_words(query)
+
+
+def _escape_like(token: str) -> str:
+    """Échappe les jokers LIKE (% et _) et le caractère d'échappement lui-même"""
+    return token.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_ids_statement(tokens, limit: int, after=None):
+    """
+    Requête des (id, clé de tri) classés : tous les mots doivent correspondre, chacun en préfixe de mot.
+    FTS5 : classement bm25 (noms pondérés) ; repli : ordre alphabétique des noms.
+    `after` = (clé de tri, id) de la dernière ligne de la page précédente (pagination par clé).
+    """
+    if fts_enabled:
+        match = " ".join(f'"{token}"*' for token in tokens)
+        keyset = ""
+        params = {"match": match, "limit": limit}
+        if after is not None:
+            score, last_id = after
+            if isinstance(score, bool) or not isinstance(score, (int, float)):
+                raise ValueError("Curseur de recherche invalide")
+            keyset = "WHERE score > :score OR (score = :score AND id > :last_id) "
+            params.update(score=score, last_id=last_id)
+        return text(
+            f"SELECT id, score FROM ("
+            f"SELECT rowid AS id, bm25({FTS_TABLE}, {NAME_WEIGHT}, {EXTRA_WEIGHT}) AS score "
+            f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match) "
+            f"{keyset}ORDER BY score, id LIMIT :limit"
+        ).bindparams(**params)
+
+    # Préfixe de mot comme FTS5 `token*` : les colonnes contiennent les mots séparés d'une espace
+    statement = select(Participant.id, Participant.search_name.label("score"))
+    for token in tokens:
+        escaped = _escape_like(token)
+        statement = statement.filter(or_(*(
+            column.like(pattern, escape="\\")
+            for column in (Participant.search_name, Participant.search_extra)
+            for pattern in (f"{escaped}%", f"% {escaped}%")
+        )))
+    if after is not None:
+        name, last_id = after
+        if not isinstance(name, str):
+            raise ValueError("Curseur de recherche invalide")
+        statement = statement.filter(or_(
+            Participant.search_name > name,
+            and_(Participant.search_name == name, Participant.id > last_id)
+        ))
+    return statement.order_by(Participant.search_name, Participant.id).limit(limit)
+
+
+def encode_search_cursor(score, last_id: int) -> str:
+    """Curseur opaque de la page suivante : (clé de tri, id) de la dernière ligne renvoyée"""
+    return base64.urlsafe_b64encode(json.dumps([score, last_id]).encode("utf-8")).decode("ascii")
+
+
+def decode_search_cursor(cursor):
+    """(clé de tri, id) d'un curseur, None sans curseur ; ValueError si le curseur est invalide"""
+    if not cursor:
+        return None
+    try:
+        score, last_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, TypeError):
+        raise ValueError("Curseur de recherche invalide")
+    if isinstance(last_id, bool) or not isinstance(last_id, int):
+        raise ValueError("Curseur de recherche invalide")
+    return score, last_id
@@ -3,17 +3,26 @@ from fastapi import FastAPI, Depends, HTTPException
 from sqlalchemy.orm import Session
 from db.database import engine, Base, get_db
 from db.models import Participant, MeetingSession, OrganizerRequest
+from db.assignments import participant_seats, store_assignments
 from api.generate import router as generate_router
 from api.participant import router as participant_router
 from api.auth import get_current_admin
 from api.auth import router as auth_router
 from api.organizer import router as organizer_router
 from api.pdf import router as pdf_router
+from api.jobs import router as jobs_router
+from core.active_sessions import active_sessions
+from core.jobs import job_manager
+from db.listing import ensure_change_counters
+from db.search import ensure_search_index
 from core.logic import generate_rounds
 from pydantic import BaseModel
 from middleware import setup_middlewares
 
 Base.metadata.create_all(bind=engine)
+ensure_search_index(engine)
+ensure_change_counters(engine)
+job_manager.recover_interrupted()
 
 app = FastAPI(
     title="Speed Meeting AI API",
@@ -30,6 +39,7 @@ app.include_router(participant_router, prefix="/api", tags=["participants"])
 app.include_router(auth_router, prefix="/api", tags=["auth"])
 app.include_router(organizer_router, prefix="/api", tags=["organizer"])
 app.include_router(pdf_router, prefix="/api", tags=["pdf"])
+app.include_router(jobs_router, prefix="/api", tags=["jobs"])
 
 @app.get("/", tags=["health"])
 def root(db: Session = Depends(get_db)):
@@ -59,8 +69,8 @@ def core_route(config: CoreConfig, db: Session = Depends(get_db), current_admin:
     Route protégée - nécessite l'authentification admin.
     """
     # Récupérer les participants de la base de données
-    db_participants = db.query(Participant).filter(Participant.is_active.is_(True)).all()
-    participant_names = [p.nom_complet for p in db_participants if p.nom_complet]
+    seats = participant_seats(db.query(Participant.id, Participant.nom_complet, Participant.is_active).all())
+    participant_names = list(seats)
 
     if not participant_names:
         raise HTTPException(status_code=400, detail="Aucun participant actif. Activez ou importez des participants d'abord !")
@@ -81,16 +91,20 @@ def core_route(config: CoreConfig, db: Session = Depends(get_db), current_admin:
         total_duration_minutes=config.sessionDurationLabel,
         number_of_tables=config.tableCountLabel,
         rounds_data=result.get("rounds", []),
+        organizer=current_admin,
         created_at=datetime.now(timezone.utc)
     )
     
     try:
         db.add(new_session)
+        db.flush()
+        store_assignments(db, new_session.id, result.get("rounds", []), seats)
         db.commit()
         db.refresh(new_session)
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Erreur lors de la sauvegarde : {str(e)}")
+    active_sessions.set(current_admin, new_session.id)
     
     return {
         "session_id": new_session.id,
@@ -98,6 +98,7 @@ def setup_middlewares(app):
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["ETag"],  # lu par le frontend pour les requêtes conditionnelles (If-None-Match)
     )
     
     # Gestion des erreurs
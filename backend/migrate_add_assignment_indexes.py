@@ -0,0 +1,89 @@
+"""
+Script de migration pour les affectations normalisées : colonne numero sur la table tables,
+index composites sur participant_table_assignments et affectations des sessions existantes
+(les itinéraires par participant sont lus dans cette table)
+"""
+import sqlite3
+import os
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from db.assignments import store_assignments
+from db.models import MeetingSession, Participant, ParticipantTableAssignment
+
+# Chemin vers la base de données
+DB_PATH = os.path.join(os.path.dirname(__file__), "speed_meeting.db")
+
+INDEXES = {
+    "ix_assignments_session_participant": "participant_table_assignments (session_id, participant_id)",
+    "ix_assignments_session_round_table": "participant_table_assignments (session_id, round_number, table_id)",
+    "ix_assignments_participant_session": "participant_table_assignments (participant_id, session_id)",
+}
+
+def backfill_assignments():
+    """
+    Affectations des sessions qui n'en ont pas (générées avant leur écriture) : les membres de rounds_data
+    sont rattachés au participant qui porte ce nom. Les homonymes, impossibles à départager, sont ignorés.
+    """
+    engine = create_engine(f"sqlite:///{DB_PATH}")
+    with Session(engine) as db:
+        ids_by_name = {}
+        for participant_id, nom_complet in db.query(Participant.id, Participant.nom_complet):
+            if nom_complet:
+                ids_by_name.setdefault(nom_complet, []).append(participant_id)
+        seats = {name: ids[0] for name, ids in ids_by_name.items() if len(ids) == 1}
+        homonyms = sum(1 for ids in ids_by_name.values() if len(ids) > 1)
+
+        filled = db.query(ParticipantTableAssignment.session_id).distinct()
+        sessions = db.query(MeetingSession).filter(MeetingSession.id.not_in(filled)).all()
+        for session in sessions:
+            members = {m for round_data in session.rounds_data or [] for t in round_data.get("tables", []) for m in t.get("members", [])}
+            if members.isdisjoint(seats):
+                # Plan gratuit (participants numérotés) : pas d'affectations
+                continue
+            rows = store_assignments(db, session.id, session.rounds_data or [], seats)
+            print(f"Session {session.id} : {rows} affectations")
+        db.commit()
+    engine.dispose()
+    if homonyms:
+        print(f"{homonyms} noms portés par plusieurs participants ignorés")
+
+def migrate():
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    
+    try:
+        # Vérifier si la colonne numero existe déjà
+        cursor.execute("PRAGMA table_info(tables)")
+        columns = [col[1] for col in cursor.fetchall()]
+        
+        if "numero" not in columns:
+            print("Ajout de la colonne 'numero'...")
+            cursor.execute("ALTER TABLE tables ADD COLUMN numero INTEGER")
+            print("Colonne 'numero' ajoutée")
+        else:
+            print("La colonne 'numero' existe déjà")
+        
+        for name, definition in INDEXES.items():
+            print(f"Création de l'index '{name}'...")
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+        
+        conn.commit()
+    except sqlite3.Error as e:
+        print(f"Erreur lors de la migration: {e}")
+        conn.rollback()
+        return
+    finally:
+        conn.close()
+
+    print("Affectations des sessions existantes...")
+    backfill_assignments()
+    print("\n Migration réussie !")
+
+if __name__ == "__main__":
+    if os.path.exists(DB_PATH):
+        print(f"Base de données trouvée: {DB_PATH}\n")
+        migrate()
+    else:
+        print(f"Base de données non trouvée à {DB_PATH}")
@@ -0,0 +1,66 @@
+"""
+Script de migration pour la connexion des participants : colonnes nom_complet_key / email_key
+(nom complet et email normalisés), remplies pour les participants existants, et leurs index
+"""
+import sqlite3
+import os
+
+from utils.text import participant_lookup_keys
+
+# Chemin vers la base de données
+DB_PATH = os.path.join(os.path.dirname(__file__), "speed_meeting.db")
+
+COLUMNS = ("nom_complet_key", "email_key")
+
+INDEXES = {
+    "ix_participants_nom_complet_key": "participants (nom_complet_key)",
+    "ix_participants_email_key": "participants (email_key)",
+}
+
+def migrate():
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    
+    try:
+        cursor.execute("PRAGMA table_info(participants)")
+        columns = [col[1] for col in cursor.fetchall()]
+        
+        for column in COLUMNS:
+            if column not in columns:
+                print(f"Ajout de la colonne '{column}'...")
+                cursor.execute(f"ALTER TABLE participants ADD COLUMN {column} VARCHAR")
+                print(f"Colonne '{column}' ajoutée")
+            else:
+                print(f"La colonne '{column}' existe déjà")
+        
+        print("Calcul des clés de connexion...")
+        cursor.execute("SELECT id, nom_complet, email FROM participants")
+        updates = [
+            {"id": participant_id, **participant_lookup_keys(nom_complet, email)}
+            for participant_id, nom_complet, email in cursor.fetchall()
+        ]
+        cursor.executemany(
+            "UPDATE participants SET nom_complet_key = :nom_complet_key, email_key = :email_key WHERE id = :id",
+            updates
+        )
+        print(f"{len(updates)} participants mis à jour")
+        
+        for name, definition in INDEXES.items():
+            print(f"Création de l'index '{name}'...")
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+        
+        conn.commit()
+        print("\n Migration réussie !")
+        
+    except sqlite3.Error as e:
+        print(f"Erreur lors de la migration: {e}")
+        conn.rollback()
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    if os.path.exists(DB_PATH):
+        print(f"Base de données trouvée: {DB_PATH}\n")
+        migrate()
+    else:
+        print(f"Base de données non trouvée à {DB_PATH}")
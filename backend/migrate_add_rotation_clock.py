@@ -0,0 +1,45 @@
+"""
+Script de migration pour l'horloge des rotations : champs current_round et round_started_at de la table sessions
+"""
+import sqlite3
+import os
+
+# Chemin vers la base de données
+DB_PATH = os.path.join(os.path.dirname(__file__), "speed_meeting.db")
+
+COLUMNS = {
+    "current_round": "INTEGER",
+    "round_started_at": "DATETIME",
+}
+
+def migrate():
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("PRAGMA table_info(sessions)")
+        columns = [col[1] for col in cursor.fetchall()]
+
+        for column, column_type in COLUMNS.items():
+            if column not in columns:
+                print(f"Ajout de la colonne '{column}'...")
+                cursor.execute(f"ALTER TABLE sessions ADD COLUMN {column} {column_type}")
+                print(f"Colonne '{column}' ajoutée")
+            else:
+                print(f"La colonne '{column}' existe déjà")
+
+        conn.commit()
+        print("\n Migration réussie !")
+
+    except sqlite3.Error as e:
+        print(f"Erreur lors de la migration: {e}")
+        conn.rollback()
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    if os.path.exists(DB_PATH):
+        print(f"Base de données trouvée: {DB_PATH}\n")
+        migrate()
+    else:
+        print(f"Base de données non trouvée à {DB_PATH}")
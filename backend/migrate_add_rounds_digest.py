@@ -0,0 +1,50 @@
+"""
+Script de migration pour la clé du cache PDF : colonne rounds_digest de la table sessions
+(empreinte de rounds_data, calculée ici pour les sessions existantes)
+"""
+import json
+import sqlite3
+import os
+
+from utils.pdf_cache import rounds_digest
+
+# Chemin vers la base de données
+DB_PATH = os.path.join(os.path.dirname(__file__), "speed_meeting.db")
+
+def migrate():
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("PRAGMA table_info(sessions)")
+        columns = [col[1] for col in cursor.fetchall()]
+
+        if "rounds_digest" not in columns:
+            print("Ajout de la colonne 'rounds_digest'...")
+            cursor.execute("ALTER TABLE sessions ADD COLUMN rounds_digest VARCHAR")
+            print("Colonne 'rounds_digest' ajoutée")
+        else:
+            print("La colonne 'rounds_digest' existe déjà")
+
+        rows = cursor.execute("SELECT id, rounds_data FROM sessions WHERE rounds_digest IS NULL").fetchall()
+        cursor.executemany(
+            "UPDATE sessions SET rounds_digest = ? WHERE id = ?",
+            [(rounds_digest(json.loads(rounds_data) if rounds_data else None), session_id) for session_id, rounds_data in rows]
+        )
+        print(f"{len(rows)} sessions mises à jour")
+
+        conn.commit()
+        print("\n Migration réussie !")
+
+    except sqlite3.Error as e:
+        print(f"Erreur lors de la migration: {e}")
+        conn.rollback()
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    if os.path.exists(DB_PATH):
+        print(f"Base de données trouvée: {DB_PATH}\n")
+        migrate()
+    else:
+        print(f"Base de données non trouvée à {DB_PATH}")
@@ -0,0 +1,56 @@
+"""
+Script de migration pour la recherche normalisée : colonnes search_name / search_extra sur participants,
+remplies pour les participants existants, puis index plein texte FTS5 participants_fts et ses triggers
+"""
+import sqlite3
+import os
+
+from sqlalchemy import create_engine
+
+from db.search import ensure_search_index
+
+# Chemin vers la base de données
+DB_PATH = os.path.join(os.path.dirname(__file__), "speed_meeting.db")
+
+COLUMNS = ("search_name", "search_extra")
+
+def migrate():
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    
+    try:
+        cursor.execute("PRAGMA table_info(participants)")
+        columns = [col[1] for col in cursor.fetchall()]
+        
+        for column in COLUMNS:
+            if column not in columns:
+                print(f"Ajout de la colonne '{column}'...")
+                cursor.execute(f"ALTER TABLE participants ADD COLUMN {column} VARCHAR")
+                print(f"Colonne '{column}' ajoutée")
+            else:
+                print(f"La colonne '{column}' existe déjà")
+        
+        conn.commit()
+    except sqlite3.Error as e:
+        print(f"Erreur lors de la migration: {e}")
+        conn.rollback()
+        return
+    finally:
+        conn.close()
+
+    # Normalisation des participants existants et création de l'index FTS5
+    engine = create_engine(f"sqlite:///{DB_PATH}")
+    try:
+        if ensure_search_index(engine):
+            print("\n Migration réussie !")
+        else:
+            print("\n Colonnes ajoutées, mais FTS5 n'est pas disponible : la recherche utilisera LIKE")
+    finally:
+        engine.dispose()
+
+if __name__ == "__main__":
+    if os.path.exists(DB_PATH):
+        print(f"Base de données trouvée: {DB_PATH}\n")
+        migrate()
+    else:
+        print(f"Base de données non trouvée à {DB_PATH}")
@@ -0,0 +1,51 @@
+"""
+Script de migration pour la session courante par organisateur : colonne organizer de la table sessions
+(sessions existantes attribuées au compte admin) et index (organizer, id)
+"""
+import sqlite3
+import os
+
+from core.active_sessions import default_organizer
+
+# Chemin vers la base de données
+DB_PATH = os.path.join(os.path.dirname(__file__), "speed_meeting.db")
+
+INDEX_NAME = "ix_sessions_organizer_id"
+
+def migrate():
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("PRAGMA table_info(sessions)")
+        columns = [col[1] for col in cursor.fetchall()]
+
+        if "organizer" not in columns:
+            print("Ajout de la colonne 'organizer'...")
+            cursor.execute("ALTER TABLE sessions ADD COLUMN organizer VARCHAR")
+            print("Colonne 'organizer' ajoutée")
+        else:
+            print("La colonne 'organizer' existe déjà")
+
+        organizer = default_organizer()
+        cursor.execute("UPDATE sessions SET organizer = ? WHERE organizer IS NULL", (organizer,))
+        print(f"{cursor.rowcount} sessions attribuées à '{organizer}'")
+
+        print(f"Création de l'index '{INDEX_NAME}'...")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON sessions (organizer, id)")
+
+        conn.commit()
+        print("\n Migration réussie !")
+
+    except sqlite3.Error as e:
+        print(f"Erreur lors de la migration: {e}")
+        conn.rollback()
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    if os.path.exists(DB_PATH):
+        print(f"Base de données trouvée: {DB_PATH}\n")
+        migrate()
+    else:
+        print(f"Base de données non trouvée à {DB_PATH}")
@@ -0,0 +1,32 @@
+"""
+Script de migration pour la recherche : recalcule search_name / search_extra de tous les participants
+avec le découpage en mots d'unicode61 (tirets, points, apostrophes séparent les mots) ;
+les triggers resynchronisent l'index FTS5 participants_fts
+"""
+import os
+
+from sqlalchemy import create_engine
+
+from db.search import backfill_search_fields
+
+# Chemin vers la base de données
+DB_PATH = os.path.join(os.path.dirname(__file__), "speed_meeting.db")
+
+def migrate():
+    engine = create_engine(f"sqlite:///{DB_PATH}")
+    try:
+        with engine.begin() as connection:
+            updated = backfill_search_fields(connection, refresh=True)
+        print(f"{updated} participants mis à jour")
+        print("\n Migration réussie !")
+    except Exception as e:
+        print(f"Erreur lors de la migration: {e}")
+    finally:
+        engine.dispose()
+
+if __name__ == "__main__":
+    if os.path.exists(DB_PATH):
+        print(f"Base de données trouvée: {DB_PATH}\n")
+        migrate()
+    else:
+        print(f"Base de données non trouvée à {DB_PATH}")
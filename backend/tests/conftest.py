@@ -0,0 +1,69 @@
+"""
+Configuration des tests : base SQLite, cache PDF et fichiers de tâches dans un dossier temporaire,
+fixés avant l'import de l'application (settings lit l'environnement à l'import).
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+TEST_DIR = tempfile.mkdtemp(prefix="speed-meeting-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TEST_DIR, 'test.db')}"
+os.environ["PDF_CACHE_DIR"] = os.path.join(TEST_DIR, "pdf_cache")
+os.environ["JOB_FILES_DIR"] = os.path.join(TEST_DIR, "job_files")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+from core.active_sessions import active_sessions  # noqa: E402
+from core.config import settings  # noqa: E402
+from core.itinerary_cache import itinerary_cache  # noqa: E402
+from db.database import SessionLocal  # noqa: E402
+from db.models import MeetingSession, Participant, ParticipantTableAssignment  # noqa: E402
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def admin_auth():
+    return (settings.ADMIN_USERNAME, settings.ADMIN_PASSWORD)
+
+
+@pytest.fixture
+def db():
+    """Session ORM sur une base vidée avant chaque test (participants, sessions, affectations, caches)"""
+    session = SessionLocal()
+    session.query(ParticipantTableAssignment).delete()
+    session.query(MeetingSession).delete()
+    session.query(Participant).delete()
+    session.commit()
+    itinerary_cache.invalidate()
+    active_sessions.invalidate()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def add_participants(db):
+    """Ajoute des participants actifs par nom complet (champs supplémentaires en mots-clés) ; retourne les lignes"""
+    def add(*names, **fields):
+        participants = [Participant(nom_complet=name, is_active=True, **fields) for name in names]
+        db.add_all(participants)
+        db.commit()
+        return participants
+    return add
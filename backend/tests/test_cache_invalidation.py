@@ -0,0 +1,54 @@
+"""Caches invalidés quand les rotations changent : session courante, itinéraires, index et PDF"""
+import pytest
+
+
+@pytest.fixture
+def generate(client, admin_auth):
+    def run(tables=2, rounds=3):
+        response = client.post(
+            "/api/generate", json={"tableCountLabel": tables, "numberOfRounds": rounds}, auth=admin_auth
+        )
+        assert response.status_code == 200, response.text
+        return response.json()["session_id"]
+    return run
+
+
+def test_regenerate_switches_the_participant_current_session(client, add_participants, generate):
+    participants = add_participants(*[f"Participant {i}" for i in range(8)])
+    first = generate()
+    pid = participants[0].id
+    assert client.get(f"/api/participants/{pid}/itinerary").json()["session_id"] == first
+
+    second = generate(rounds=2)
+
+    itinerary = client.get(f"/api/participants/{pid}/itinerary").json()
+    assert itinerary["session_id"] == second
+    assert itinerary["total_rotations"] == 2
+
+
+def test_replan_refreshes_itineraries_and_pdf_etag(client, admin_auth, add_participants, generate):
+    add_participants(*[f"Participant {i}" for i in range(8)])
+    session_id = generate(rounds=3)
+    pdf_url = f"/api/sessions/{session_id}/pdf/paid"
+
+    first = client.get(pdf_url, params={"background": "false"})
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert client.get(pdf_url, headers={"If-None-Match": etag}).status_code == 304
+
+    (arrival,) = add_participants("Arrivee Tardive")
+    itinerary_url = f"/api/sessions/{session_id}/participants/{arrival.id}/itinerary"
+    assert client.get(itinerary_url).json()["itinerary"] == []
+
+    response = client.post(f"/api/sessions/{session_id}/replan", json={"currentRound": 1}, auth=admin_auth)
+    assert response.status_code == 200, response.text
+
+    itinerary = client.get(itinerary_url).json()
+    assert [stop["rotation"] for stop in itinerary["itinerary"]] == [2, 3]
+
+    refreshed = client.get(pdf_url, params={"background": "false"}, headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.headers["ETag"] != etag
+
+    export = client.get(f"/api/sessions/{session_id}/export", params={"format": "csv"})
+    assert "Arrivee Tardive" in export.text
@@ -0,0 +1,48 @@
+"""Liste paginée des participants : pagination par clé, projection fields= et ETag / 304"""
+
+
+def test_keyset_pages_cover_every_participant_once(client, add_participants):
+    participants = add_participants(*[f"Participant {i}" for i in range(7)])
+
+    ids, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        payload = client.get("/api/participants", params=params).json()
+        ids += [row["id"] for row in payload["results"]]
+        cursor = payload["next_cursor"]
+        if cursor is None:
+            break
+
+    assert ids == sorted(participant.id for participant in participants)
+
+
+def test_fields_projection_and_total(client, add_participants):
+    add_participants("Alice Martin", "Bob Durand")
+
+    payload = client.get("/api/participants", params={"fields": "nom_complet", "include_total": "true"}).json()
+
+    assert payload["total"] == 2
+    assert all(set(row) == {"id", "nom_complet"} for row in payload["results"])
+    assert client.get("/api/participants", params={"fields": "mot_de_passe"}).status_code == 400
+
+
+def test_etag_returns_304_until_the_table_changes(client, admin_auth, add_participants):
+    (participant,) = add_participants("Alice Martin")
+    first = client.get("/api/participants", params={"limit": 10})
+    etag = first.headers["ETag"]
+
+    unchanged = client.get("/api/participants", params={"limit": 10}, headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+
+    # Modification sans changement de l'id maximal : le compteur de la table invalide l'ETag
+    response = client.patch(f"/api/participants/{participant.id}/active", json={"is_active": False}, auth=admin_auth)
+    assert response.status_code == 200
+    changed = client.get("/api/participants", params={"limit": 10}, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()["results"][0]["is_active"] is False
+
+
+def test_invalid_cursor_is_rejected(client, db):
+    assert client.get("/api/participants", params={"cursor": "abc"}).status_code == 400
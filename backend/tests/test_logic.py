@@ -0,0 +1,78 @@
+"""Invariants du planning : generate_rounds (glouton et plan affine) et replan_rounds"""
+from collections import Counter
+from itertools import combinations
+
+import pytest
+
+from core.logic import generate_rounds, replan_rounds
+
+
+def _names(count, prefix="P"):
+    return [f"{prefix}{i + 1}" for i in range(count)]
+
+
+def _meetings(rounds):
+    """Nombre de rencontres de chaque paire de participants sur l'ensemble des rotations"""
+    pairs = Counter()
+    for round_data in rounds:
+        for table in round_data["tables"]:
+            pairs.update(frozenset(pair) for pair in combinations(table["members"], 2))
+    return pairs
+
+
+def _assert_everyone_seated_once(rounds, names):
+    for round_data in rounds:
+        members = [member for table in round_data["tables"] for member in table["members"]]
+        assert sorted(members) == sorted(names)
+
+
+def test_generate_rounds_seats_everyone_once_per_round_with_balanced_tables():
+    names = _names(23)
+    result = generate_rounds(names, 5, 4, seed=1)
+
+    assert result["metadata"]["strategy"] == "greedy"
+    assert [round_data["round"] for round_data in result["rounds"]] == [1, 2, 3, 4]
+    _assert_everyone_seated_once(result["rounds"], names)
+    for round_data in result["rounds"]:
+        sizes = [len(table["members"]) for table in round_data["tables"]]
+        assert len(sizes) == 5 and max(sizes) - min(sizes) <= 1
+
+
+@pytest.mark.parametrize("participant_count, tables, rounds", [(25, 5, 6), (12, 4, 4), (18, 9, 9)])
+def test_resolvable_design_never_repeats_a_meeting(participant_count, tables, rounds):
+    names = _names(participant_count)
+    result = generate_rounds(names, tables, rounds, seed=7)
+
+    assert result["metadata"]["strategy"] == "resolvable_design"
+    _assert_everyone_seated_once(result["rounds"], names)
+    assert max(_meetings(result["rounds"]).values()) == 1
+
+
+@pytest.mark.parametrize("names, tables, rounds", [([], 2, 2), (["A", "B"], 3, 1), (["A", "B"], 1, 0)])
+def test_generate_rounds_rejects_invalid_parameters(names, tables, rounds):
+    assert "error" in generate_rounds(names, tables, rounds)
+
+
+def test_replan_rejects_duplicate_names():
+    rounds = generate_rounds(_names(12), 3, 3, seed=2)["rounds"]
+    result = replan_rounds(rounds, _names(12) + ["P3"], 3, frozen_rounds=1)
+
+    assert result == {"error": "Noms de participants en double : P3"}
+
+
+def test_replan_keeps_frozen_rounds_and_seats_arrivals():
+    names = _names(20)
+    rounds = generate_rounds(names, 4, 5, seed=3)["rounds"]
+    present = names[2:] + ["New1", "New2", "New3"]
+
+    result = replan_rounds(rounds, present, 4, frozen_rounds=2, seed=3)
+
+    assert result["rounds"][:2] == rounds[:2]
+    _assert_everyone_seated_once(result["rounds"][2:], present)
+    assert result["metadata"]["replan"]["arrivals"] == 3
+    assert result["metadata"]["replan"]["departures"] == 2
+
+
+def test_replan_rejects_out_of_range_round():
+    rounds = generate_rounds(_names(12), 3, 3, seed=2)["rounds"]
+    assert "error" in replan_rounds(rounds, _names(12), 3, frozen_rounds=4)
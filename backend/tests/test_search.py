@@ -0,0 +1,68 @@
+"""Recherche des participants : FTS5 et repli LIKE (découpage des mots, jokers échappés, curseur par clé)"""
+import pytest
+
+from db import search
+from db.search import search_ids_statement
+
+
+@pytest.fixture(params=[True, False], ids=["fts5", "like"])
+def search_mode(request, monkeypatch):
+    """Chaque test de recherche tourne avec l'index FTS5 et avec le repli LIKE"""
+    monkeypatch.setattr(search, "fts_enabled", request.param)
+    return request.param
+
+
+def _names(client, query, **params):
+    payload = client.get("/api/participants/search", params={"q": query, **params}).json()
+    return [row["nom_complet"] for row in payload["results"]]
+
+
+def test_accents_case_and_punctuation_match_like_unicode61(client, add_participants, search_mode):
+    add_participants("Jean-Pierre Dupont", "Hélène O'Brien", "Marc Durand")
+    add_participants("Zoé Martin", entreprise="Acme_Corp", email="z.martin@exemple.fr")
+
+    assert _names(client, "jean pierre") == ["Jean-Pierre Dupont"]
+    assert _names(client, "PIERRE-dup") == ["Jean-Pierre Dupont"]
+    assert _names(client, "helene brien") == ["Hélène O'Brien"]
+    assert _names(client, "corp") == ["Zoé Martin"]
+    assert _names(client, "exemple.fr") == ["Zoé Martin"]
+    assert _names(client, "dur") == ["Marc Durand"]
+
+
+def test_like_wildcards_in_the_query_match_nothing(client, add_participants, search_mode):
+    add_participants("Alice Martin", "Bob Durand")
+
+    assert _names(client, "%") == []
+    assert _names(client, "_") == []
+    assert _names(client, "%bob_") == ["Bob Durand"]
+
+
+def test_fallback_escapes_like_wildcards(db, add_participants, monkeypatch):
+    """Sans échappement, "50%" et "5_00" correspondraient à "5000" via LIKE"""
+    monkeypatch.setattr(search, "fts_enabled", False)
+    add_participants("Alice Martin", entreprise="5000 Conseil")
+
+    assert db.execute(search_ids_statement(["5000"], 10)).all() != []
+    assert db.execute(search_ids_statement(["50%"], 10)).all() == []
+    assert db.execute(search_ids_statement(["5_00"], 10)).all() == []
+
+
+def test_cursor_pages_through_all_results_once(client, add_participants, search_mode):
+    participants = add_participants(*[f"Martin {i}" for i in range(7)], "Autre Nom")
+
+    ids, cursor = [], None
+    while True:
+        params = {"q": "martin", "limit": 3, **({"cursor": cursor} if cursor else {})}
+        payload = client.get("/api/participants/search", params=params).json()
+        ids += [row["id"] for row in payload["results"]]
+        cursor = payload["next_cursor"]
+        if cursor is None:
+            break
+
+    assert sorted(ids) == sorted(participant.id for participant in participants[:7])
+    assert len(ids) == len(set(ids))
+
+
+def test_invalid_search_cursor_is_rejected(client, db, search_mode):
+    response = client.get("/api/participants/search", params={"q": "martin", "cursor": "o20"})
+    assert response.status_code == 400
@@ -0,0 +1,182 @@
+import logging
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+from typing import List, Optional, Tuple
+
+from pypdf import PdfWriter
+from reportlab.lib.pagesizes import A6
+from reportlab.lib.units import mm
+from reportlab.pdfgen import canvas as pdf_canvas
+
+from core.config import settings
+from core.parallel import get_process_pool
+from core.session_index import SessionIndex
+from utils.qrcode import draw_qr
+
+logger = logging.getLogger(__name__)
+
+# Nombre minimal de cartes par lot envoyé au pool (en dessous, le coût du pool dépasse le gain)
+MIN_CARDS_PER_CHUNK = 50
+QR_SIZE = 32 * mm
+MARGIN = 8 * mm
+
+# (nom, [(rotation, nom de table)], url du QR code ou None)
+Card = Tuple[str, List[Tuple[int, str]], Optional[str]]
+
+def itinerary_url(session_id: int, participant_id: int) -> str:
+    """Lien vers l'itinéraire d'un participant pour une session donnée (contenu du QR code)"""
+    return f"{settings.PUBLIC_BASE_URL.rstrip('/')}/api/sessions/{session_id}/participants/{participant_id}/itinerary"
+
+
+def _participant_sort_key(name: str):
+    # Participants numérotés (plan gratuit) dans l'ordre numérique, puis les noms par ordre alphabétique
+    return (0, int(name), "") if name.isdigit() else (1, 0, name.lower())
+
+
+def collect_cards(index: SessionIndex) -> List[Card]:
+    """
+    Une carte par participant numéroté du plan gratuit, à partir de l'index de la session :
+    sans compte participant, pas de QR code vers un itinéraire
+    """
+    cards = []
+    for name in sorted(index.participants, key=_participant_sort_key):
+        stops = sorted((round_num, table_name) for round_num, _, table_name, _ in index.itinerary(name))
+        cards.append((name, stops, None))
+    return cards
+
+
+def collect_participant_cards(session_id: int, itineraries) -> List[Card]:
+    """
+    Une carte par participant d'une session à affectations (`session_itineraries`), avec un QR code vers
+    son itinéraire dans cette session : la carte reste valable après une nouvelle génération, et deux
+    homonymes ont chacun le leur.
+    """
+    ordered = sorted(itineraries, key=lambda item: (_participant_sort_key(item[1] or ""), item[0]))
+    return [
+        (name or "", stops, itinerary_url(session_id, participant_id))
+        for participant_id, name, _, stops in ordered
+    ]
+
+
+def _draw_card(canvas, card: Card, subtitle: str) -> None:
+    name, stops, url = card
+    width, height = A6
+
+    canvas.setFont("Helvetica-Bold", 9)
+    canvas.drawString(MARGIN, height - MARGIN, "Mon parcours - Speed Meeting")
+    canvas.setFont("Helvetica", 7)
+    canvas.drawString(MARGIN, height - MARGIN - 10, subtitle)
+    canvas.setFont("Helvetica-Bold", 14)
+    canvas.drawString(MARGIN, height - MARGIN - 30, name[:40])
+
+    # Liste rotation -> table, sur deux colonnes si elle ne tient pas au-dessus du QR code
+    top = height - MARGIN - 50
+    bottom = MARGIN + QR_SIZE + 6
+    line_height = 11
+    per_column = max(1, int((top - bottom) // line_height))
+    column_width = (width - 2 * MARGIN) / 2
+    canvas.setFont("Helvetica", 9)
+    for i, (round_num, table_name) in enumerate(stops):
+        column, line = divmod(i, per_column)
+        if column > 1:
+            break
+        canvas.drawString(MARGIN + column * column_width, top - line * line_height, f"Rotation {round_num} : {table_name}")
+
+    if url:
+        # Masque fixe : code valide et lisible, sans l'évaluation des 8 masques (l'essentiel du temps d'encodage)
+        draw_qr(canvas, url, width - MARGIN - QR_SIZE, MARGIN, QR_SIZE, best_mask=False)
+        canvas.setFont("Helvetica", 7)
+        canvas.drawString(MARGIN, MARGIN + 4, "Scannez pour retrouver votre itinéraire")
+
+
+def render_cards_pdf(path: str, cards: List[Card], subtitle: str) -> str:
+    """Écrit les cartes dans un PDF (une page A6 par carte) et retourne son chemin"""
+    canvas = pdf_canvas.Canvas(path, pagesize=A6)
+    for card in cards:
+        _draw_card(canvas, card, subtitle)
+        canvas.showPage()
+    canvas.save()
+    return path
+
+
+def _card_filename(position: int, name: str) -> str:
+    slug = re.sub(r"[^\w.-]+", "_", name).strip("_") or "participant"
+    return f"{position:04d}-{slug}.pdf"
+
+
+def _render_chunk(args) -> List[str]:
+    """Exécuté dans un processus du pool : un PDF par lot, ou un PDF par carte pour l'export ZIP"""
+    directory, start, cards, subtitle, per_card = args
+    if not per_card:
+        return [render_cards_pdf(os.path.join(directory, f"chunk-{start:06d}.pdf"), cards, subtitle)]
+    return [
+        render_cards_pdf(os.path.join(directory, _card_filename(start + i + 1, card[0])), [card], subtitle)
+        for i, card in enumerate(cards)
+    ]
+
+
+def _subtitle(event_company: Optional[str], event_location: Optional[str], event_date: Optional[str]) -> str:
+    details = [event_date, f"organise par {event_company}" if event_company else None, event_location]
+    return " | ".join(detail for detail in details if detail) or "Speed Meeting Business"
+
+
+def build_itinerary_cards(
+    output_path: str,
+    cards: List[Card],
+    output_format: str = "pdf",
+    event_company: Optional[str] = None,
+    event_location: Optional[str] = None,
+    event_date: Optional[str] = None,
+    progress=None,
+) -> str:
+    """
+    Cartes d'itinéraire personnelles (`collect_participant_cards` ou `collect_cards`), dans `output_path` :
+    un seul PDF multipage (`output_format="pdf"`) ou un ZIP d'un PDF par participant (`"zip"`).
+
+    Le rendu est réparti par tranches de participants sur un pool de processus ; les tranches
+    sont ensuite fusionnées dans l'ordre (pypdf) ou ajoutées à l'archive.
+    """
+    if output_format not in ("pdf", "zip"):
+        raise ValueError("Format de cartes invalide (pdf ou zip)")
+
+    subtitle = _subtitle(event_company, event_location, event_date)
+    workers = settings.PROCESS_POOL_WORKERS
+    chunk_size = max(MIN_CARDS_PER_CHUNK, -(-len(cards) // workers))
+    work_dir = tempfile.mkdtemp(prefix="cards-")
+    try:
+        tasks = [
+            (work_dir, start, cards[start:start + chunk_size], subtitle, output_format == "zip")
+            for start in range(0, len(cards), chunk_size)
+        ]
+        if len(tasks) > 1:
+            chunk_files = list(get_process_pool().map(_render_chunk, tasks))
+        else:
+            chunk_files = [_render_chunk(task) for task in tasks]
+        if progress:
+            progress(progress=0.9, cards=len(cards))
+
+        if output_format == "pdf":
+            paths = [path for files in chunk_files for path in files]
+            if not paths:
+                render_cards_pdf(output_path, [], subtitle)
+            elif len(paths) == 1:
+                shutil.move(paths[0], output_path)
+            else:
+                writer = PdfWriter()
+                for path in paths:
+                    writer.append(path)
+                with open(output_path, "wb") as handle:
+                    writer.write(handle)
+        else:
+            with zipfile.ZipFile(output_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                for files in chunk_files:
+                    for path in files:
+                        archive.write(path, arcname=os.path.basename(path))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    logger.info(f"{len(cards)} cartes d'itinéraire générées ({output_format}, {len(tasks)} lot(s))")
+    return output_path
@@ -1,33 +1,367 @@
+from contextlib import contextmanager
 from email.message import EmailMessage
-import smtplib
+import heapq
+import itertools
 import logging
+import queue
+import random
+import smtplib
+import threading
+import time
 
 from core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Au-delà de cette inactivité, une connexion du pool est vérifiée (NOOP) avant d'être réutilisée
+NOOP_AFTER_SECONDS = 5
 
-def send_email(subject: str, body: str, to_address: str) -> None:
+
+def build_message(subject: str, body: str, to_address: str) -> EmailMessage:
     if not to_address:
         raise ValueError("Recipient address requis")
+    message = EmailMessage()
+    message["Subject"] = subject
+    message["From"] = settings.SMTP_FROM
+    message["To"] = to_address
+    message.set_content(body)
+    return message
+
+
+def smtp_configured() -> bool:
+    return bool(settings.SMTP_HOST and settings.SMTP_FROM)
+
+
+class PooledConnection:
+    """Connexion SMTP du pool ; compte les messages envoyés pour la renouveler après `max_messages`"""
+
+    __slots__ = ("smtp", "sent", "last_used", "max_messages")
+
+    def __init__(self, smtp, max_messages: int):
+        self.smtp = smtp
+        self.sent = 0
+        self.last_used = time.monotonic()
+        self.max_messages = max_messages
+
+    @property
+    def exhausted(self) -> bool:
+        return self.sent >= self.max_messages
+
+    def send_message(self, message: EmailMessage) -> None:
+        self.sent += 1
+        self.smtp.send_message(message)
+
+
+class SMTPConnectionPool:
+    """
+    Connexions SMTP persistantes (connexion, STARTTLS et login une seule fois), réutilisées d'un envoi à l'autre.
+
+    Au plus `size` connexions ouvertes ; une connexion inactive depuis plus de `max_idle` secondes
+    est fermée, et une connexion est renouvelée après `max_messages` messages (limite de nombreux serveurs).
+    Une connexion sur laquelle une erreur survient est abandonnée.
+    """
+
+    def __init__(self, host, port, username, password, use_tls, size, timeout, max_idle, max_messages):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_messages = max_messages
+        self._idle = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _connect(self) -> PooledConnection:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username and self.password:
+                smtp.login(self.username, self.password)
+        except Exception:
+            self._close(smtp)
+            raise
+        logger.info(f"Connexion SMTP ouverte vers {self.host}:{self.port}")
+        return PooledConnection(smtp, self.max_messages)
+
+    @staticmethod
+    def _close(smtp) -> None:
+        try:
+            smtp.quit()
+        except Exception:
+            smtp.close()
+
+    def _checkout(self) -> PooledConnection:
+        while True:
+            with self._lock:
+                connection = self._idle.pop() if self._idle else None
+            if connection is None:
+                return self._connect()
+            idle = time.monotonic() - connection.last_used
+            if idle > self.max_idle:
+                self._close(connection.smtp)
+                continue
+            if idle > NOOP_AFTER_SECONDS:
+                try:
+                    if connection.smtp.noop()[0] != 250:
+                        raise smtplib.SMTPServerDisconnected("NOOP refusé")
+                except Exception:
+                    self._close(connection.smtp)
+                    continue
+            return connection
+
+    @contextmanager
+    def connection(self):
+        """Connexion empruntée au pool (PooledConnection), rendue au pool à la sortie du bloc"""
+        self._slots.acquire()
+        connection = None
+        try:
+            connection = self._checkout()
+            yield connection
+        except Exception:
+            if connection is not None:
+                self._close(connection.smtp)
+                connection = None
+            raise
+        finally:
+            if connection is not None:
+                connection.last_used = time.monotonic()
+                if connection.exhausted:
+                    self._close(connection.smtp)
+                else:
+                    with self._lock:
+                        self._idle.append(connection)
+            self._slots.release()
+
+    def close_all(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            self._close(connection.smtp)
+
+
+class EmailBatch:
+    """Suivi d'un envoi groupé : compteurs et attente de la fin (tous les messages envoyés ou abandonnés)"""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.sent = 0
+        self.failed = []
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        if total == 0:
+            self._done.set()
+
+    def _record(self, to_address, error=None) -> None:
+        with self._lock:
+            if error is None:
+                self.sent += 1
+            else:
+                self.failed.append({"to": to_address, "error": error})
+            if self.sent + len(self.failed) >= self.total:
+                self._done.set()
+
+    def wait(self, timeout=None) -> bool:
+        return self._done.wait(timeout)
+
+    def summary(self):
+        with self._lock:
+            return {"total": self.total, "sent": self.sent, "failed": len(self.failed), "errors": list(self.failed)}
+
+
+class _Outgoing:
+    __slots__ = ("message", "attempts", "batch")
+
+    def __init__(self, message, batch=None):
+        self.message = message
+        self.attempts = 0
+        self.batch = batch
+
+
+class EmailOutbox:
+    """
+    File d'envoi des emails, vidée par des threads de fond à travers le pool de connexions SMTP.
+
+    Chaque thread envoie les messages disponibles par paquets sur une même connexion.
+    Une erreur temporaire (connexion, code 4xx) replanifie le message avec un délai exponentiel
+    (EMAIL_RETRY_BASE_SECONDS, doublé à chaque tentative, plafonné à EMAIL_RETRY_MAX_SECONDS) ;
+    un refus définitif (code 5xx) ou EMAIL_MAX_ATTEMPTS tentatives abandonnent le message.
+    La file est en mémoire : les messages non envoyés sont perdus à l'arrêt du serveur.
+    Sans SMTP configuré, les messages sont journalisés (mode DEV), comme auparavant.
+    """
+
+    def __init__(self, workers: int, max_attempts: int, retry_base: float, retry_max: float):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.pool = None
+        self._queue = queue.Queue()
+        self._delayed = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._threads = []
+        self.sent = 0
+        self.failed = 0
+
+    def _get_pool(self):
+        """Pool de connexions créé au premier envoi (None si SMTP n'est pas configuré)"""
+        if not smtp_configured():
+            return None
+        with self._lock:
+            if self.pool is None:
+                self.pool = SMTPConnectionPool(
+                    settings.SMTP_HOST,
+                    settings.SMTP_PORT,
+                    settings.SMTP_USERNAME,
+                    settings.SMTP_PASSWORD,
+                    settings.SMTP_USE_TLS,
+                    size=settings.SMTP_POOL_SIZE,
+                    timeout=settings.SMTP_TIMEOUT_SECONDS,
+                    max_idle=settings.SMTP_POOL_MAX_IDLE_SECONDS,
+                    max_messages=settings.SMTP_MAX_MESSAGES_PER_CONNECTION,
+                )
+        return self.pool
+
+    def _ensure_workers(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"email-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def enqueue(self, message: EmailMessage, batch: EmailBatch = None) -> None:
+        self._ensure_workers()
+        self._queue.put(_Outgoing(message, batch))
+
+    def enqueue_many(self, messages) -> EmailBatch:
+        """Met en file une liste de messages ; retourne le suivi de l'envoi groupé"""
+        messages = list(messages)
+        batch = EmailBatch(len(messages))
+        for message in messages:
+            self.enqueue(message, batch)
+        return batch
+
+    def stats(self):
+        with self._lock:
+            delayed = len(self._delayed)
+        return {"queued": self._queue.qsize(), "retrying": delayed, "sent": self.sent, "failed": self.failed}
+
+    def _release_due(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            while self._delayed and self._delayed[0][0] <= now:
+                self._queue.put(heapq.heappop(self._delayed)[2])
+
+    def _work(self) -> None:
+        max_batch = settings.SMTP_MAX_MESSAGES_PER_CONNECTION
+        while True:
+            self._release_due()
+            try:
+                item = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            items = [item]
+            while len(items) < max_batch:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._deliver(items)
+            except Exception as exc:
+                logger.exception(f"Erreur inattendue de la file d'emails: {exc}")
+
+    def _deliver(self, items) -> None:
+        pool = self._get_pool()
+        if pool is None:
+            for item in items:
+                message = item.message
+                logger.warning(
+                    f"SMTP non configure. Email en mode DEV:\nTo: {message['To']}\nSubject: {message['Subject']}\n"
+                    f"{message.get_content()}"
+                )
+                self._done(item)
+            return
+
+        pending = list(items)
+        try:
+            while pending:
+                self._send_some(pool, pending)
+        except (OSError, smtplib.SMTPException) as exc:
+            # Erreur de connexion : la connexion est abandonnée, les messages restants sont replanifiés
+            logger.warning(f"Erreur SMTP ({exc}), {len(pending)} message(s) replanifié(s)")
+            for item in pending:
+                self._failed(item, str(exc), permanent=False)
+
+    def _send_some(self, pool, pending) -> None:
+        """Envoie les messages de `pending` (retirés au fur et à mesure) sur une connexion, jusqu'à son renouvellement"""
+        with pool.connection() as connection:
+            while pending and not connection.exhausted:
+                item = pending[0]
+                try:
+                    connection.send_message(item.message)
+                    self._done(item)
+                except smtplib.SMTPRecipientsRefused as exc:
+                    code = min((code for code, _ in exc.recipients.values()), default=550)
+                    self._failed(item, f"Destinataire refusé ({code})", permanent=code >= 500)
+                except (smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as exc:
+                    self._failed(item, f"{exc.smtp_code} {exc.smtp_error!r}", permanent=exc.smtp_code >= 500)
+                except smtplib.SMTPNotSupportedError as exc:
+                    # Adresse internationalisée refusée avant tout échange : la connexion reste utilisable
+                    self._failed(item, str(exc), permanent=True)
+                pending.pop(0)
+
+    def _done(self, item) -> None:
+        with self._lock:
+            self.sent += 1
+        if item.batch is not None:
+            item.batch._record(item.message["To"])
+
+    def _failed(self, item, error: str, permanent: bool) -> None:
+        item.attempts += 1
+        if permanent or item.attempts >= self.max_attempts:
+            logger.error(f"Email abandonné pour {item.message['To']} après {item.attempts} tentative(s): {error}")
+            with self._lock:
+                self.failed += 1
+            if item.batch is not None:
+                item.batch._record(item.message["To"], error)
+            return
+        delay = min(self.retry_max, self.retry_base * 2 ** (item.attempts - 1)) * random.uniform(0.5, 1.0)
+        with self._lock:
+            heapq.heappush(self._delayed, (time.monotonic() + delay, next(self._sequence), item))
+
+
+outbox = EmailOutbox(
+    settings.SMTP_POOL_SIZE,
+    settings.EMAIL_MAX_ATTEMPTS,
+    settings.EMAIL_RETRY_BASE_SECONDS,
+    settings.EMAIL_RETRY_MAX_SECONDS,
+)
+
+
+def queue_email(subject: str, body: str, to_address: str) -> None:
+    """Envoi en arrière-plan (retour immédiat) : le message est confié à la file d'envoi"""
+    outbox.enqueue(build_message(subject, body, to_address))
+
+
+def send_email(subject: str, body: str, to_address: str) -> None:
+    """Envoi immédiat et bloquant, à travers le pool de connexions (préférer queue_email dans les routes)"""
+    message = build_message(subject, body, to_address)
 
-    if not settings.SMTP_HOST or not settings.SMTP_FROM:
+    pool = outbox._get_pool()
+    if pool is None:
         logger.warning(f"SMTP non configure. Email en mode DEV:\nTo: {to_address}\nSubject: {subject}\n{body}")
         return
 
     try:
-        message = EmailMessage()
-        message["Subject"] = subject
-        message["From"] = settings.SMTP_FROM
-        message["To"] = to_address
-        message.set_content(body)
-
-        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-            if settings.SMTP_USE_TLS:
-                server.starttls()
-            if settings.SMTP_USERNAME and settings.SMTP_PASSWORD:
-                server.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
-            server.send_message(message)
+        with pool.connection() as connection:
+            connection.send_message(message)
         logger.info(f"Email envoye a {to_address}")
     except Exception as exc:
         logger.error(f"Erreur lors de l'envoi email: {exc}")
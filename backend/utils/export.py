@@ -0,0 +1,53 @@
+import csv
+from typing import Any, Iterator, List
+
+from openpyxl import Workbook
+
+from core.session_index import SessionIndex
+
+EXPORT_GRIDS = ("participants", "tables")
+
+
+def _round_numbers(index: SessionIndex) -> List[int]:
+    # Mêmes rotations que le plan PDF
+    return [r for r in index.round_numbers if r > 0] or [1]
+
+
+def participant_grid(index: SessionIndex) -> Iterator[List[Any]]:
+    """En-tête puis une ligne par participant : N° de table à chaque rotation"""
+    round_numbers = _round_numbers(index)
+    yield ["N° du participant"] + [f"Table rotation {r}" for r in round_numbers]
+    for position, participant in enumerate(index.participants):
+        yield [participant] + [index.table_at(position, r) or "" for r in round_numbers]
+
+
+def table_grid(index: SessionIndex) -> Iterator[List[Any]]:
+    """En-tête puis une ligne par table : participants à chaque rotation"""
+    round_numbers = _round_numbers(index)
+    yield ["N° de table"] + [f"Participants rotation {r}" for r in round_numbers]
+    for table_id in index.table_ids:
+        yield [table_id] + [", ".join(index.member_names(r, table_id)) for r in round_numbers]
+
+
+GRID_BUILDERS = {"participants": participant_grid, "tables": table_grid}
+
+
+def write_grid_csv(path: str, index: SessionIndex, grid: str = "participants") -> str:
+    """Grille du plan de rotation en CSV (séparateur `;`, BOM UTF-8 pour Excel)"""
+    if grid not in GRID_BUILDERS:
+        raise ValueError("Grille invalide (participants ou tables)")
+    with open(path, "w", newline="", encoding="utf-8-sig") as handle:
+        csv.writer(handle, delimiter=";").writerows(GRID_BUILDERS[grid](index))
+    return path
+
+
+def write_grid_xlsx(path: str, index: SessionIndex) -> str:
+    """Grilles du plan de rotation en XLSX : une feuille par participant, une feuille par table"""
+    # write_only : les lignes sont écrites au fil de l'eau, sans garder les cellules en mémoire
+    workbook = Workbook(write_only=True)
+    for title, builder in (("Participants", participant_grid), ("Tables", table_grid)):
+        sheet = workbook.create_sheet(title)
+        for row in builder(index):
+            sheet.append(row)
+    workbook.save(path)
+    return path
@@ -0,0 +1,389 @@
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from db.database import SessionLocal
+from db.models import Participant
+from utils.text import participant_normalized_fields
+
+logger = logging.getLogger(__name__)
+
+KNOWN_HEADER_CANDIDATES = {
+    "nom", "name", "lastname", "prenom", "prénom", "firstname", "nom complet",
+    "full name", "telephone", "email", "e-mail", "mail", "courriel", "poste",
+    "profession", "job title", "fonction", "métier", "metier", "société",
+    "entreprise", "company", "organization", "organisation", "agence", "business"
+}
+
+ALLOWED_FIELDS = {"nom", "prenom", "nom_complet", "telephone", "email", "profession", "entreprise"}
+OPTIONAL_FIELDS = ("telephone", "email", "profession", "entreprise")
+# Champs à partir desquels les colonnes normalisées (recherche, clés de connexion) sont calculées
+SEARCH_SOURCE_FIELDS = ("nom_complet", "nom", "prenom", "entreprise", "email")
+
+HEADER_ALIASES = {
+    "nom": ("nom", "last name", "lastname", "nom de famille"),
+    "prenom": ("prénom", "prenom", "first name", "firstname"),
+    "nom_complet": ("nom complet", "full name", "fullname"),
+    "telephone": ("telephone", "téléphone", "phone", "mobile"),
+    "email": ("email", "e-mail", "mail", "courriel", "adresse email", "adresse e-mail"),
+    "profession": ("poste", "profession", "job title", "job", "fonction", "métier", "metier", "trvail", "occupation"),
+    "entreprise": ("société", "entreprise", "company", "organization", "organisation", "agence", "firm", "business"),
+}
+
+
+def normalize_headers(columns) -> List[str]:
+    return [str(col).strip().lower() for col in columns]
+
+
+def has_known_headers(columns) -> bool:
+    return any(col in KNOWN_HEADER_CANDIDATES for col in normalize_headers(columns))
+
+
+def resolve_columns(df: pd.DataFrame, known_headers: bool, field_order: List[str]) -> Dict[str, Optional[object]]:
+    """
+    Colonne source de chaque champ : libellé d'en-tête si le fichier en a,
+    index de colonne sinon (ordre configuré, corrigé par la détection de l'email).
+    """
+    if known_headers:
+        normalized_columns = normalize_headers(df.columns)
+
+        def get_column(*candidates):
+            for candidate in candidates:
+                if candidate in normalized_columns:
+                    return df.columns[normalized_columns.index(candidate)]
+            return None
+
+        return {field: get_column(*aliases) for field, aliases in HEADER_ALIASES.items()}
+
+    columns = {field: None for field in ALLOWED_FIELDS}
+    columns.update({field: idx for idx, field in enumerate(field_order)})
+
+    # Détection intelligente de la colonne email par recherche de "@"
+    # Cette détection a PRIORITE sur l'ordre du config
+    detected_email_col = None
+    if len(df.columns) > 0:
+        for idx, col in enumerate(df.columns):
+            sample_values = df[col].astype(str).unique()[:5]
+            if any("@" in str(val) for val in sample_values if str(val) != "nan"):
+                detected_email_col = idx
+                break
+
+    if detected_email_col is not None:
+        columns["email"] = detected_email_col
+
+        # Une fois l'email détecté, on réassigne intelligemment les autres colonnes
+        # Chercher prénom et nom aux deux premières colonnes (avant l'email généralement)
+        if detected_email_col >= 2:
+            columns["prenom"] = 0
+            columns["nom"] = 1
+
+            # Les colonnes restantes sont entre le nom (col 1) et l'email (detected_email_col)
+            remaining_cols = list(range(2, detected_email_col))
+
+            # D'abord: chercher le TELEPHONE qui doit contenir des numéros
+            for col_idx in remaining_cols[:]:  # faire une copie pour parcours sûr
+                sample_values = df.iloc[:5, col_idx].astype(str).values
+                # Vérifier si la colonne contient des numéros
+                if any(any(c.isdigit() for c in str(val)) for val in sample_values if str(val) != 'nan'):
+                    columns["telephone"] = col_idx
+                    remaining_cols.remove(col_idx)
+                    break
+
+            # Les colonnes restantes: profession et entreprise
+            if len(remaining_cols) > 0:
+                # Première colonne restante = profession
+                columns["profession"] = remaining_cols[0]
+
+            if len(remaining_cols) > 1:
+                # Deuxième colonne restante = entreprise
+                columns["entreprise"] = remaining_cols[1]
+
+    return columns
+
+
+def _column_values(df: pd.DataFrame, column_ref, is_index: bool) -> pd.Series:
+    """Valeurs texte nettoyées d'une colonne (None pour les cellules vides ou colonnes absentes)"""
+    missing = pd.Series([None] * len(df), index=df.index, dtype=object)
+    if column_ref is None:
+        return missing
+    if is_index and (not isinstance(column_ref, int) or column_ref >= len(df.columns)):
+        return missing
+    series = df.iloc[:, column_ref] if is_index else df[column_ref]
+    values = series.astype(object).astype(str).str.strip()
+    return values.where(series.notna(), None)
+
+
+def normalize_participants(df: pd.DataFrame, columns: Dict[str, Optional[object]], is_index: bool) -> pd.DataFrame:
+    """
+    Lignes participants normalisées par opérations pandas vectorisées :
+    nom en majuscules, nom_complet construit ou dont le dernier mot est mis en majuscules,
+    champs optionnels vides -> None. Les lignes sans nom complet sont écartées.
+    """
+    nom = _column_values(df, columns.get("nom"), is_index).fillna("").str.upper()
+    prenom = _column_values(df, columns.get("prenom"), is_index).fillna("")
+    nom_complet = _column_values(df, columns.get("nom_complet"), is_index).fillna("")
+
+    # Si nom_complet est fourni, mettre le dernier mot en majuscules, sinon "prénom NOM"
+    provided = nom_complet.str.split().str.join(" ").fillna("")
+    provided = provided.str.replace(r"(\S+)$", lambda match: match.group(1).upper(), regex=True)
+    built = (prenom + " " + nom).str.strip()
+    nom_complet = provided.where(provided != "", built)
+
+    rows = pd.DataFrame({"nom": nom, "prenom": prenom, "nom_complet": nom_complet})
+    for field in OPTIONAL_FIELDS:
+        values = _column_values(df, columns.get(field), is_index)
+        rows[field] = values.where(values.notna() & (values != ""), None)
+
+    return rows[rows["nom_complet"] != ""].reset_index(drop=True)
+
+
+class ParticipantUpserter:
+    """
+    Insertion / mise à jour groupée des participants importés.
+
+    Les participants existants sont chargés une seule fois dans deux dictionnaires (email, nom complet),
+    avec la même règle de correspondance que l'import ligne à ligne : email d'abord, puis nom complet,
+    en se basant sur l'état de la base avant l'import.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.by_email = {}
+        self.by_name = {}
+        # Champs dont dépendent les colonnes normalisées, pour les recalculer lors des mises à jour partielles
+        self.search_sources = {}
+        existing = db.query(
+            Participant.id, Participant.email, Participant.nom_complet, Participant.nom, Participant.prenom,
+            Participant.entreprise
+        ).order_by(Participant.id)
+        for participant_id, email, nom_complet, nom, prenom, entreprise in existing:
+            if email:
+                self.by_email.setdefault(email, participant_id)
+            if nom_complet:
+                self.by_name.setdefault(nom_complet, participant_id)
+            self.search_sources[participant_id] = {
+                "nom_complet": nom_complet, "nom": nom, "prenom": prenom, "entreprise": entreprise, "email": email
+            }
+        self.added = 0
+        self.updated = 0
+
+    def apply(self, rows: pd.DataFrame) -> Tuple[int, int]:
+        """Applique un lot de lignes normalisées (sans commit) ; retourne (ajoutés, mis à jour) pour ce lot"""
+        inserts = []
+        updates = {}
+        updated = 0
+        for row in rows.itertuples(index=False):
+            existing_id = None
+            if row.email:
+                existing_id = self.by_email.get(row.email)
+            if existing_id is None and row.nom_complet:
+                existing_id = self.by_name.get(row.nom_complet)
+
+            if existing_id is not None:
+                # Mettre à jour les informations du participant existant (champs renseignés uniquement)
+                changes = updates.setdefault(existing_id, {"id": existing_id})
+                for field in ("nom", "prenom", "nom_complet") + OPTIONAL_FIELDS:
+                    value = getattr(row, field)
+                    if value:
+                        changes[field] = value
+                # Réactiver le participant s'il était désactivé
+                changes["is_active"] = True
+                sources = self.search_sources.setdefault(existing_id, {})
+                sources.update((key, changes[key]) for key in SEARCH_SOURCE_FIELDS if key in changes)
+                changes.update(participant_normalized_fields(**sources))
+                updated += 1
+            else:
+                inserts.append({
+                    "nom": row.nom,
+                    "prenom": row.prenom,
+                    "nom_complet": row.nom_complet,
+                    "telephone": row.telephone,
+                    "email": row.email,
+                    "profession": row.profession,
+                    "entreprise": row.entreprise,
+                    "is_active": True,
+                    **participant_normalized_fields(row.nom_complet, row.nom, row.prenom, row.entreprise, row.email)
+                })
+
+        if inserts:
+            self.db.bulk_insert_mappings(Participant, inserts)
+        if updates:
+            self.db.bulk_update_mappings(Participant, list(updates.values()))
+        self.added += len(inserts)
+        self.updated += updated
+        return len(inserts), updated
+
+
+@contextmanager
+def timed(timings: Dict[str, float], stage: str):
+    """Ajoute la durée du bloc (ms) à timings[stage]"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = round(timings.get(stage, 0.0) + (time.perf_counter() - start) * 1000, 2)
+
+
+def _xlsx_rows(path: str) -> Tuple[Iterator[tuple], int]:
+    """Lignes d'un classeur XLSX en lecture seule (openpyxl read_only) et nombre de lignes annoncé"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    sheet = workbook.worksheets[0]
+    total_rows = sheet.max_row or 0
+
+    def rows():
+        try:
+            yield from sheet.iter_rows(values_only=True)
+        finally:
+            workbook.close()
+
+    return rows(), total_rows
+
+
+def _xlsx_batches(path: str, batch_size: int, progress: Callable[[float], None]) -> Iterator[Tuple[pd.DataFrame, bool]]:
+    """
+    Lots de `batch_size` lignes d'un XLSX. La première ligne sert d'en-tête si elle contient
+    des libellés connus, sinon elle est traitée comme une ligne de données (colonnes indexées).
+    """
+    rows, total_rows = _xlsx_rows(path)
+    first = next(rows, None)
+    if first is None:
+        return
+
+    known_headers = has_known_headers(value for value in first if value is not None)
+    if known_headers:
+        labels = [value if value is not None else f"Unnamed: {i}" for i, value in enumerate(first)]
+        batch, seen = [], 1
+    else:
+        labels = list(range(len(first)))
+        batch, seen = [first], 0
+
+    def frame(batch_rows):
+        width = len(labels)
+        return pd.DataFrame([tuple(row[:width]) + (None,) * (width - len(row)) for row in batch_rows], columns=labels)
+
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            seen += len(batch)
+            progress(seen / total_rows if total_rows else 0.0)
+            yield frame(batch), known_headers
+            batch = []
+    if batch:
+        yield frame(batch), known_headers
+
+
+def _csv_batches(path: str, batch_size: int, progress: Callable[[float], None]) -> Iterator[Tuple[pd.DataFrame, bool]]:
+    """
+    Lots de `batch_size` lignes d'un CSV (pandas chunksize). Les en-têtes sont détectés
+    sur les premières lignes uniquement ; la progression suit la position dans le fichier.
+    """
+    sniff = pd.read_csv(path, header=0, nrows=batch_size)
+    known_headers = has_known_headers(sniff.columns)
+
+    size = os.path.getsize(path) or 1
+    with open(path, "rb") as handle:
+        reader = pd.read_csv(handle, header=0 if known_headers else None, chunksize=batch_size)
+        for chunk in reader:
+            progress(min(handle.tell() / size, 1.0))
+            yield chunk, known_headers
+
+
+def _dataframe_batches(path: str, batch_size: int, progress: Callable[[float], None]) -> Iterator[Tuple[pd.DataFrame, bool]]:
+    """Repli pour les formats sans lecture incrémentale (.xls) : lecture complète puis découpage en lots"""
+    df = pd.read_excel(path, header=0)
+    known_headers = has_known_headers(df.columns)
+    if not known_headers:
+        df = pd.read_excel(path, header=None)
+    for start in range(0, len(df), batch_size):
+        progress(min((start + batch_size) / len(df), 1.0))
+        yield df.iloc[start:start + batch_size], known_headers
+
+
+def iter_file_batches(path: str, filename: str, batch_size: int,
+                      progress: Callable[[float], None] = lambda _: None) -> Iterator[Tuple[pd.DataFrame, bool]]:
+    """Lots (DataFrame, en-têtes reconnus) d'un fichier d'import, sans charger le fichier entier en mémoire"""
+    lowered = filename.lower()
+    if lowered.endswith(".csv"):
+        return _csv_batches(path, batch_size, progress)
+    if lowered.endswith(".xlsx"):
+        return _xlsx_batches(path, batch_size, progress)
+    return _dataframe_batches(path, batch_size, progress)
+
+
+def import_file_in_batches(db: Session, path: str, filename: str, field_order: List[str], batch_size: int,
+                           on_batch: Callable[[Dict], None] = lambda _: None) -> Dict:
+    """
+    Import par lots de taille fixe : la correspondance des colonnes est établie sur le premier lot,
+    chaque lot est normalisé puis appliqué (insertions / mises à jour groupées), le tout dans une seule
+    transaction validée à la fin. `on_batch` reçoit l'état d'avancement après chaque lot.
+    """
+    timings = {}
+    state = {"progress": 0.0, "rows_processed": 0, "batches": 0, "sample": []}
+    upserter = None
+    columns = None
+
+    def set_progress(value):
+        state["progress"] = round(value, 4)
+
+    batches = iter_file_batches(path, filename, batch_size, set_progress)
+    while True:
+        with timed(timings, "read_ms"):
+            batch = next(batches, None)
+        if batch is None:
+            break
+        df, known_headers = batch
+
+        with timed(timings, "normalize_ms"):
+            if columns is None:
+                columns = resolve_columns(df, known_headers, field_order)
+            rows = normalize_participants(df, columns, is_index=not known_headers)
+
+        with timed(timings, "upsert_ms"):
+            if upserter is None:
+                upserter = ParticipantUpserter(db)
+            upserter.apply(rows)
+
+        state["batches"] += 1
+        state["rows_processed"] += len(df)
+        if len(state["sample"]) < 5:
+            state["sample"] += rows["nom_complet"].head(5 - len(state["sample"])).tolist()
+        on_batch({**state, "participants_added": upserter.added, "participants_updated": upserter.updated})
+
+    with timed(timings, "commit_ms"):
+        db.commit()
+
+    return {
+        "filename": filename,
+        "participants_added": upserter.added if upserter else 0,
+        "participants_updated": upserter.updated if upserter else 0,
+        "rows_processed": state["rows_processed"],
+        "batches": state["batches"],
+        "sample": state["sample"],
+        "timings_ms": timings
+    }
+
+
+def run_import_file(path: str, filename: str, field_order: List[str], batch_size: int,
+                    progress: Callable[..., None] = lambda **_: None) -> Dict:
+    """
+    Import par lots d'un fichier temporaire avec sa propre session de base de données
+    (exécuté en tâche de fond) ; le fichier est supprimé à la fin.
+    """
+    db = SessionLocal()
+    try:
+        result = import_file_in_batches(db, path, filename, field_order, batch_size, on_batch=lambda state: progress(**state))
+        logger.info(f"Import {filename} terminé : {result['participants_added']} ajoutés, {result['participants_updated']} mis à jour")
+        return result
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+        os.remove(path)
@@ -1,12 +1,15 @@
 import io
 import os
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Union
 
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.pdfbase.pdfmetrics import stringWidth
 from reportlab.platypus import Image, PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
 
+from core.session_index import SessionIndex
+
 
 def _project_root() -> str:
     return os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
@@ -17,58 +20,54 @@ def _logo_path(filename: str) -> Optional[str]:
     return candidate if os.path.exists(candidate) else None
 
 
-def _collect_participants(rounds_data: List[Dict[str, Any]]) -> List[str]:
-    if not rounds_data:
-        return []
-    participants: List[str] = []
-    seen = set()
-    for table in rounds_data[0].get("tables", []):
-        for member in table.get("members", []):
-            if member not in seen:
-                seen.add(member)
-                participants.append(str(member))
-    return participants
-
-
-def _round_map(rounds_data: List[Dict[str, Any]]) -> Dict[str, Dict[int, int]]:
-    mapping: Dict[str, Dict[int, int]] = {}
-    for round_item in rounds_data:
-        round_number = int(round_item.get("round", 0))
-        for table in round_item.get("tables", []):
-            table_id = int(table.get("table_id", 0))
-            for member in table.get("members", []):
-                key = str(member)
-                if key not in mapping:
-                    mapping[key] = {}
-                mapping[key][round_number] = table_id
-    return mapping
-
-
-def _table_participants(rounds_data: List[Dict[str, Any]]) -> Dict[int, Dict[int, List[str]]]:
-    mapping: Dict[int, Dict[int, List[str]]] = {}
-    for round_item in rounds_data:
-        round_number = int(round_item.get("round", 0))
-        for table in round_item.get("tables", []):
-            table_id = int(table.get("table_id", 0))
-            mapping.setdefault(table_id, {})
-            mapping[table_id][round_number] = [str(m) for m in table.get("members", [])]
-    return mapping
-
-
 def _chunk_rounds(round_numbers: List[int], chunk_size: int = 6) -> List[List[int]]:
     return [round_numbers[i:i + chunk_size] for i in range(0, len(round_numbers), chunk_size)]
 
 
-def build_rotation_pdf(
-    rounds_data: List[Dict[str, Any]],
+# Lignes par morceau de tableau : environ une page A4 en police 8
+ROWS_PER_TABLE_PIECE = 40
+
+
+def _column_widths(rows: List[List[Any]], font_size: int = 8, padding: int = 12) -> List[float]:
+    """Largeurs de colonnes calculées comme ReportLab (texte le plus large + marges), sur toutes les lignes"""
+    widths = [0.0] * len(rows[0])
+    for row in rows:
+        for i, value in enumerate(row):
+            for line in str(value).split("\n"):
+                widths[i] = max(widths[i], stringWidth(line, "Helvetica", font_size))
+    return [width + padding for width in widths]
+
+
+def _table_pieces(header: List[Any], rows: List[List[Any]], style: TableStyle) -> List[Table]:
+    """
+    Découpe un grand tableau en morceaux d'environ une page, chacun avec sa ligne d'en-tête,
+    plutôt qu'un seul Table que ReportLab devrait mesurer en entier puis redécouper page par page.
+    Les largeurs de colonnes sont communes à tous les morceaux.
+    """
+    col_widths = _column_widths([header] + rows)
+    pieces = []
+    for start in range(0, max(len(rows), 1), ROWS_PER_TABLE_PIECE):
+        table = Table([header] + rows[start:start + ROWS_PER_TABLE_PIECE], colWidths=col_widths, repeatRows=1)
+        table.setStyle(style)
+        pieces.append(table)
+    return pieces
+
+
+def write_rotation_pdf(
+    output: Union[str, BinaryIO],
+    rounds_data: Union[List[Dict[str, Any]], SessionIndex],
     event_company: Optional[str] = None,
     event_location: Optional[str] = None,
     event_date: Optional[str] = None,
     include_logos: bool = False,
-) -> bytes:
-    buffer = io.BytesIO()
+) -> None:
+    """
+    Écrit le plan de rotation directement dans `output` (chemin ou fichier binaire ouvert).
+    `rounds_data` peut être l'index déjà construit de la session (SessionIndex), sinon il est construit ici.
+    """
+    index = rounds_data if isinstance(rounds_data, SessionIndex) else SessionIndex(rounds_data)
     doc = SimpleDocTemplate(
-        buffer,
+        output,
         pagesize=A4,
         leftMargin=24,
         rightMargin=24,
@@ -117,62 +116,78 @@ def build_rotation_pdf(
     story.append(Paragraph(subtitle, style_subtitle))
     story.append(Spacer(1, 12))
 
-    participants = _collect_participants(rounds_data)
-    round_numbers = [int(r.get("round", 0)) for r in rounds_data]
-    round_numbers = [r for r in round_numbers if r > 0]
+    round_numbers = [r for r in index.round_numbers if r > 0]
     if not round_numbers:
         round_numbers = list(range(1, 2))
 
     round_chunks = _chunk_rounds(round_numbers)
-    participant_map = _round_map(rounds_data)
-    table_map = _table_participants(rounds_data)
-    table_ids = sorted({t.get("table_id", 0) for r in rounds_data for t in r.get("tables", []) if t.get("table_id")})
+
+    participant_style = TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ("FONTSIZE", (0, 0), (-1, -1), 8),
+    ])
+    table_style = TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ("FONTSIZE", (0, 0), (-1, -1), 8),
+    ])
 
     for chunk_index, round_chunk in enumerate(round_chunks):
         story.append(Paragraph("Speed Meeting : N° de table d'affectation par participant", styles["Heading3"]))
         header = ["N° du participant"] + [f"N° de table\nrotation {r}" for r in round_chunk]
         table_rows: List[List[Any]] = [header]
 
-        for participant in participants:
+        for position, participant in enumerate(index.participants):
             row = [participant]
             for r in round_chunk:
-                row.append(participant_map.get(participant, {}).get(r, ""))
+                row.append(index.table_at(position, r) or "")
             table_rows.append(row)
 
-        table = Table(table_rows, repeatRows=1)
-        table.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-            ("FONTSIZE", (0, 0), (-1, -1), 8),
-        ]))
-        story.append(table)
+        story.extend(_table_pieces(table_rows[0], table_rows[1:], participant_style))
         story.append(Spacer(1, 14))
 
         story.append(Paragraph("Speed Meeting : N° des participants par table", styles["Heading3"]))
         header_tables = ["N° de table"] + [f"Participants\nrotation {r}" for r in round_chunk]
         table_rows = [header_tables]
 
-        for table_id in table_ids:
+        for table_id in index.table_ids:
             row = [str(table_id)]
             for r in round_chunk:
-                members = table_map.get(table_id, {}).get(r, [])
-                row.append(", ".join(members))
+                row.append(", ".join(index.member_names(r, table_id)))
             table_rows.append(row)
 
-        table = Table(table_rows, repeatRows=1)
-        table.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-            ("VALIGN", (0, 0), (-1, -1), "TOP"),
-            ("FONTSIZE", (0, 0), (-1, -1), 8),
-        ]))
-        story.append(table)
+        story.extend(_table_pieces(table_rows[0], table_rows[1:], table_style))
 
         if chunk_index < len(round_chunks) - 1:
             story.append(PageBreak())
 
     doc.build(story)
-    pdf_bytes = buffer.getvalue()
-    buffer.close()
-    return pdf_bytes
+
+
+def build_rotation_pdf(
+    rounds_data: Union[List[Dict[str, Any]], SessionIndex],
+    event_company: Optional[str] = None,
+    event_location: Optional[str] = None,
+    event_date: Optional[str] = None,
+    include_logos: bool = False,
+) -> bytes:
+    """Plan de rotation en mémoire (préférer write_rotation_pdf vers un fichier pour les gros événements)"""
+    buffer = io.BytesIO()
+    write_rotation_pdf(buffer, rounds_data, event_company, event_location, event_date, include_logos)
+    return buffer.getvalue()
+
+
+def render_rotation_pdf_file(
+    path: str,
+    rounds_data: Union[List[Dict[str, Any]], SessionIndex],
+    event_company: Optional[str] = None,
+    event_location: Optional[str] = None,
+    event_date: Optional[str] = None,
+    include_logos: bool = False,
+) -> str:
+    """Écrit le plan dans le fichier `path` et retourne ce chemin (utilisable dans le pool de processus des tâches)"""
+    write_rotation_pdf(path, rounds_data, event_company, event_location, event_date, include_logos)
+    return path
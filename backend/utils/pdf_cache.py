@@ -0,0 +1,146 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Âge au-delà duquel un fichier temporaire de rendu est considéré abandonné
+STALE_TMP_SECONDS = 3600
+
+
+def rounds_digest(rounds_data: Optional[List[Dict[str, Any]]]) -> str:
+    """Empreinte SHA-256 de rounds_data, calculée à l'écriture de la session (colonne sessions.rounds_digest)"""
+    payload = json.dumps(rounds_data or [], sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def pdf_cache_key(
+    session_id: int,
+    digest: str,
+    event_company: Optional[str],
+    event_location: Optional[str],
+    event_date: Optional[str],
+    include_logos: bool,
+) -> str:
+    """
+    Clé de tout ce qui détermine le contenu du PDF d'une session : `digest` (rounds_digest) remplace
+    rounds_data, la clé se calcule sans charger ni sérialiser les rotations
+    """
+    payload = json.dumps(
+        [session_id, digest, event_company, event_location, event_date, include_logos],
+        separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PdfCache:
+    """
+    Cache disque des PDF de plans de rotation, adressé par contenu (`pdf_cache_key`).
+
+    Les fichiers sont nommés `<session_id>-<clé>.pdf` pour pouvoir invalider une session.
+    La date de modification sert d'horodatage d'accès : au-delà de `max_bytes`,
+    les fichiers les moins récemment utilisés sont supprimés.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _path(self, session_id: int, key: str) -> str:
+        return os.path.join(self.directory, f"{session_id}-{key}.pdf")
+
+    def get(self, session_id: int, key: str) -> Optional[str]:
+        """Chemin du PDF en cache (et marque l'entrée comme récemment utilisée), ou None"""
+        path = self._path(session_id, key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def reserve(self) -> str:
+        """Fichier temporaire dans le dossier du cache, à remplir puis à confier à `adopt`"""
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        return tmp_path
+
+    def adopt(self, session_id: int, key: str, tmp_path: str) -> str:
+        """Installe un fichier rendu (renommage atomique) puis applique la limite de taille ; retourne son chemin"""
+        path = self._path(session_id, key)
+        os.replace(tmp_path, path)
+        self._evict(keep=path)
+        return path
+
+    def store(self, session_id: int, key: str, render: Callable[[str], Any]) -> str:
+        """Rend le PDF directement dans le cache via `render(chemin)`, sans passer par un tampon mémoire"""
+        tmp_path = self.reserve()
+        try:
+            render(tmp_path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+        return self.adopt(session_id, key, tmp_path)
+
+    def _evict(self, keep: str):
+        with self._lock:
+            entries = []
+            stale_before = time.time() - STALE_TMP_SECONDS
+            for entry in os.scandir(self.directory):
+                # Fichier déjà supprimé ou renommé entre le parcours et la lecture (invalidation, adopt)
+                try:
+                    stat = entry.stat()
+                    if entry.name.endswith(".pdf"):
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    elif entry.name.endswith(".tmp") and stat.st_mtime < stale_before:
+                        # Rendu interrompu (tâche en échec, arrêt du serveur)
+                        os.remove(entry.path)
+                except FileNotFoundError:
+                    continue
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                    total -= size
+                except FileNotFoundError:
+                    pass
+
+    def invalidate(self, session_id: int):
+        """Supprime les PDF en cache d'une session (régénération, replanification)"""
+        if not os.path.isdir(self.directory):
+            return
+        prefix = f"{session_id}-"
+        removed = 0
+        with self._lock:
+            for entry in os.scandir(self.directory):
+                if entry.name.startswith(prefix) and entry.name.endswith(".pdf"):
+                    try:
+                        os.remove(entry.path)
+                        removed += 1
+                    except FileNotFoundError:
+                        pass
+        if removed:
+            logger.info(f"{removed} PDF en cache supprimé(s) pour la session {session_id}")
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Vrai si l'en-tête If-None-Match désigne `etag` (ou *), en comparaison faible (préfixe W/ ignoré)"""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or any(value.removeprefix("W/") == etag.removeprefix("W/") for value in candidates)
+
+
+pdf_cache = PdfCache(settings.PDF_CACHE_DIR, settings.PDF_CACHE_MAX_BYTES)
@@ -0,0 +1,112 @@
+"""
+Serveur SMTP local de débogage : accepte les messages, les garde en mémoire et les journalise, sans rien envoyer.
+
+    python -m utils.smtp_debug --port 1025
+
+puis lancer l'API avec SMTP_HOST=localhost SMTP_PORT=1025 SMTP_USE_TLS=false SMTP_FROM=dev@localhost.
+Ni STARTTLS ni AUTH (laisser SMTP_USERNAME vide). `--fail-first N` répond 451 aux N premiers messages
+pour observer les nouvelles tentatives de la file d'envoi.
+"""
+import argparse
+import logging
+import socketserver
+import threading
+from email import message_from_bytes
+from email.policy import default as default_policy
+
+logger = logging.getLogger(__name__)
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        server = self.server
+        server.connections += 1
+        self._reply("220 localhost SMTP debug")
+        sender, recipients = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors="replace").strip()
+            verb = command[:4].upper()
+            if verb in ("HELO", "EHLO"):
+                self._reply("250-localhost" if verb == "EHLO" else "250 localhost")
+                if verb == "EHLO":
+                    self._reply("250 8BITMIME")
+            elif verb == "MAIL":
+                sender, recipients = command.split(":", 1)[1].strip(), []
+                self._reply("250 OK")
+            elif verb == "RCPT":
+                recipients.append(command.split(":", 1)[1].strip().strip("<>"))
+                self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 Fin des donnees par <CRLF>.<CRLF>")
+                lines = []
+                while True:
+                    data = self.rfile.readline()
+                    if not data or data in (b".\r\n", b".\n"):
+                        break
+                    lines.append(data[1:] if data.startswith(b"..") else data)
+                if server.take_failure():
+                    self._reply("451 Echec temporaire simule")
+                else:
+                    message = message_from_bytes(b"".join(lines), policy=default_policy)
+                    server.record(sender, recipients, message)
+                    self._reply("250 OK")
+                sender, recipients = None, []
+            elif verb == "RSET":
+                sender, recipients = None, []
+                self._reply("250 OK")
+            elif verb == "NOOP":
+                self._reply("250 OK")
+            elif verb == "QUIT":
+                self._reply("221 Au revoir")
+                return
+            else:
+                self._reply("502 Commande non supportee")
+
+
+class DebuggingSMTPServer(socketserver.ThreadingTCPServer):
+    """Serveur SMTP minimal ; `messages` contient les (expéditeur, destinataires, EmailMessage) reçus"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 1025, fail_first: int = 0):
+        super().__init__((host, port), _SMTPHandler)
+        self.messages = []
+        self.connections = 0
+        self._failures_left = fail_first
+        self._lock = threading.Lock()
+
+    def take_failure(self) -> bool:
+        with self._lock:
+            if self._failures_left > 0:
+                self._failures_left -= 1
+                return True
+            return False
+
+    def record(self, sender, recipients, message) -> None:
+        with self._lock:
+            self.messages.append((sender, recipients, message))
+        logger.info(f"Email reçu pour {', '.join(recipients)} : {message['Subject']}")
+
+    def start(self) -> "DebuggingSMTPServer":
+        """Démarre le serveur dans un thread (pour les scripts de test) et le retourne"""
+        threading.Thread(target=self.serve_forever, name="smtp-debug", daemon=True).start()
+        return self
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serveur SMTP local de débogage")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--fail-first", type=int, default=0)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
+    server = DebuggingSMTPServer(args.host, args.port, args.fail_first)
+    logger.info(f"Serveur SMTP de débogage sur {args.host}:{args.port}")
+    server.serve_forever()
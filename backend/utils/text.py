@@ -0,0 +1,61 @@
+import re
+import unicodedata
+from typing import Dict, List, Optional
+
+# Lettres sans décomposition Unicode (ligatures, lettres barrées), translittérées après casefold
+_TRANSLITERATIONS = str.maketrans({"œ": "oe", "æ": "ae", "ø": "o", "đ": "d", "ł": "l", "ı": "i"})
+
+
+def fold_text(value: Optional[str]) -> str:
+    """Texte sans accents, en minuscules (casefold), espaces normalisés : "  Hélène  DUPONT " -> "helene dupont" """
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", str(value))
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().translate(_TRANSLITERATIONS).split())
+
+
+# Découpage du tokenizer FTS5 unicode61 : lettres et chiffres, tout le reste (tiret, point, @, _) sépare les mots
+_WORD = re.compile(r"[^\W_]+")
+
+
+def search_words(value: Optional[str]) -> List[str]:
+    """Mots normalisés d'un texte, découpés comme unicode61 : "Jean-Pierre O'Neil" -> ["jean", "pierre", "o", "neil"]"""
+    return _WORD.findall(fold_text(value))
+
+
+def participant_search_fields(
+    nom_complet: Optional[str],
+    nom: Optional[str] = None,
+    prenom: Optional[str] = None,
+    entreprise: Optional[str] = None,
+    email: Optional[str] = None,
+) -> Dict[str, str]:
+    """
+    Colonnes de recherche normalisées d'un participant : noms (search_name), entreprise et email (search_extra),
+    stockées mot par mot séparés d'une espace pour que le repli LIKE découpe comme FTS5
+    """
+    name = nom_complet or " ".join(part for part in (prenom, nom) if part)
+    return {
+        "search_name": " ".join(search_words(name)),
+        "search_extra": " ".join(search_words(" ".join(part for part in (entreprise, email) if part))),
+    }
+
+
+def participant_lookup_keys(nom_complet: Optional[str], email: Optional[str]) -> Dict[str, Optional[str]]:
+    """Clés de connexion normalisées (comparaison par égalité sur colonnes indexées), None si le champ est vide"""
+    return {"nom_complet_key": fold_text(nom_complet) or None, "email_key": fold_text(email) or None}
+
+
+def participant_normalized_fields(
+    nom_complet: Optional[str],
+    nom: Optional[str] = None,
+    prenom: Optional[str] = None,
+    entreprise: Optional[str] = None,
+    email: Optional[str] = None,
+) -> Dict[str, Optional[str]]:
+    """Toutes les colonnes dérivées d'un participant : recherche et clés de connexion"""
+    return {
+        **participant_search_fields(nom_complet, nom, prenom, entreprise, email),
+        **participant_lookup_keys(nom_complet, email),
+    }
@@ -2,6 +2,7 @@
 
 import { AdminProtected } from "@/lib/protected-routes";
 import { API_BASE_URL } from "@/lib/api";
+import { resolveJobFile } from "@/lib/jobs";
 import { useState, useEffect } from "react";
 import { useRouter } from "next/navigation";
 
@@ -66,7 +67,8 @@ function AnalyseContent() {
         throw new Error("Téléchargement impossible");
       }
 
-      const blob = await response.blob();
+      // Gros plan de rotation : PDF construit en tâche de fond, téléchargé une fois la tâche terminée
+      const blob = await resolveJobFile(response);
       const blobUrl = window.URL.createObjectURL(blob);
       const link = document.createElement("a");
       link.href = blobUrl;
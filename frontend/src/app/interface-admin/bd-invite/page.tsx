@@ -2,7 +2,8 @@
 
 import { AdminProtected } from "@/lib/protected-routes";
 import { API_BASE_URL } from "@/lib/api";
-import { useEffect, useMemo, useState } from "react";
+import { resolveJobPayload } from "@/lib/jobs";
+import { useEffect, useMemo, useRef, useState } from "react";
 
 interface Participant {
     id: number;
@@ -16,10 +17,25 @@ interface Participant {
     is_active?: boolean | null;
 }
 
+interface ParticipantPage {
+    results: Participant[];
+    next_cursor: string | null;
+    total: number | null;
+}
+
+// Liste paginee : une page par requete, colonnes affichees uniquement
+const LIST_PAGE_SIZE = 200;
+const LIST_FIELDS = "id,nom_complet,nom,prenom,telephone,email,profession,entreprise,is_active";
+
 function ParticipantsContent() {
     const [participants, setParticipants] = useState<Participant[]>([]);
     const [search, setSearch] = useState("");
     const [isLoading, setIsLoading] = useState(true);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
+    const [isLoadingMore, setIsLoadingMore] = useState(false);
+    const [totalCount, setTotalCount] = useState<number | null>(null);
+    // Pages deja recues par URL, avec leur ETag : renvoye en If-None-Match, 304 si la liste n'a pas change
+    const listPages = useRef(new Map<string, { etag: string; page: ParticipantPage }>());
     const [error, setError] = useState("");
     const [isSavingId, setIsSavingId] = useState<number | null>(null);
     const [isEditOpen, setIsEditOpen] = useState(false);
@@ -58,33 +74,80 @@ function ParticipantsContent() {
         return sessionStorage.getItem("adminAuth") ?? "";
     }, []);
 
-    const loadParticipants = async (query: string) => {
-        setIsLoading(true);
+    const loadParticipants = async (query: string, cursor: string | null = null) => {
+        if (cursor) {
+            setIsLoadingMore(true);
+        } else {
+            setIsLoading(true);
+        }
         setError("");
 
         try {
-            const url = query.trim().length > 0
-                ? `${API_BASE_URL}/api/participants/search?q=${encodeURIComponent(query)}`
-                : `${API_BASE_URL}/api/participants`;
+            if (query.trim().length > 0) {
+                // Recherche : une page de resultats, la suivante via "Afficher plus" (next_cursor)
+                const url = `${API_BASE_URL}/api/participants/search?q=${encodeURIComponent(query)}`
+                    + (cursor ? `&cursor=${encodeURIComponent(cursor)}` : "");
+                const response = await fetch(url);
+                const payload = await response.json();
+
+                if (!response.ok) {
+                    setError(payload?.detail ?? "Impossible de charger les participants.");
+                    setIsLoading(false);
+                    setIsLoadingMore(false);
+                    return;
+                }
 
+                const results: Participant[] = payload.results || [];
+                setParticipants((prev) => (cursor ? [...prev, ...results] : results));
+                setNextCursor(payload.next_cursor ?? null);
+                if (!cursor) {
+                    setTotalCount(null);
+                }
+                setIsLoading(false);
+                setIsLoadingMore(false);
+                return;
+            }
+
+            // Liste : une page, la suivante via "Afficher plus" ; total demande avec la premiere page
+            const url = `${API_BASE_URL}/api/participants?limit=${LIST_PAGE_SIZE}&fields=${LIST_FIELDS}`
+                + (cursor ? `&cursor=${encodeURIComponent(cursor)}` : "&include_total=true");
+            const cached = listPages.current.get(url);
             const response = await fetch(url, {
-                headers: query.trim().length > 0 ? undefined : undefined,
+                cache: "no-store",
+                headers: cached ? { "If-None-Match": cached.etag } : {},
             });
 
-            const payload = await response.json();
+            let page: ParticipantPage;
+            if (response.status === 304 && cached) {
+                page = cached.page;
+            } else {
+                const payload = await response.json();
 
-            if (!response.ok) {
-                setError(payload?.detail ?? "Impossible de charger les participants.");
-                setIsLoading(false);
-                return;
+                if (!response.ok) {
+                    setError(payload?.detail ?? "Impossible de charger les participants.");
+                    setIsLoading(false);
+                    setIsLoadingMore(false);
+                    return;
+                }
+
+                page = payload;
+                const etag = response.headers.get("ETag");
+                if (etag) {
+                    listPages.current.set(url, { etag, page });
+                }
             }
 
-            const list = Array.isArray(payload) ? payload : payload.results || [];
-            setParticipants(list);
+            setParticipants((prev) => (cursor ? [...prev, ...page.results] : page.results));
+            setNextCursor(page.next_cursor ?? null);
+            if (!cursor) {
+                setTotalCount(page.total ?? null);
+            }
             setIsLoading(false);
+            setIsLoadingMore(false);
         } catch {
             setError("Erreur réseau. Veuillez réessayer.");
             setIsLoading(false);
+            setIsLoadingMore(false);
         }
     };
 
@@ -248,7 +311,7 @@ function ParticipantsContent() {
         setConfirmModal({
             isOpen: true,
             title: "Réinitialiser la liste ?",
-            message: `Êtes-vous sûr de vouloir supprimer tous les ${participants.length} participant(s) ? Cette action est irréversible.`,
+            message: `Êtes-vous sûr de vouloir supprimer tous les ${totalCount ?? participants.length} participant(s) ? Cette action est irréversible.`,
             onConfirm: () => {
                 setConfirmModal({ isOpen: false, title: "", message: "", onConfirm: () => { } });
                 proceedClear();
@@ -484,15 +547,20 @@ function ParticipantsContent() {
                 return;
             }
 
+            // Gros fichier : import en tâche de fond, résultat récupéré à la fin de la tâche
+            const result = await resolveJobPayload<{ participants_added?: number; participants_updated?: number }>(
+                response,
+                payload
+            );
             setUploadSuccess(true);
-            setParticipantCount(payload.participants_added || 0);
-            setParticipantUpdated(payload.participants_updated || 0);
+            setParticipantCount(result?.participants_added || 0);
+            setParticipantUpdated(result?.participants_updated || 0);
             setIsUploading(false);
 
             // Recharger automatiquement la liste des participants
             await loadParticipants("");
-        } catch {
-            setError("Erreur réseau lors de l'upload. Veuillez réessayer.");
+        } catch (err) {
+            setError(err instanceof Error ? err.message : "Erreur réseau lors de l'upload. Veuillez réessayer.");
             setIsUploading(false);
         }
     };
@@ -590,7 +658,9 @@ function ParticipantsContent() {
                             />
                         </div>
                         <div className="text-sm text-zinc-600 dark:text-zinc-400">
-                            {participants.length} participant{participants.length > 1 ? "s" : ""}
+                            {totalCount !== null && nextCursor
+                                ? `${participants.length} / ${totalCount} participants`
+                                : `${participants.length}${nextCursor ? "+" : ""} participant${participants.length > 1 ? "s" : ""}`}
                         </div>
                         <div className="ml-4 flex flex-wrap items-center gap-2">
                             <button
@@ -696,6 +766,17 @@ function ParticipantsContent() {
                                 ))}
                             </div>
                         )}
+                        {!isLoading && nextCursor && (
+                            <div className="flex justify-center border-t border-zinc-200 dark:border-zinc-800 px-4 py-3">
+                                <button
+                                    onClick={() => loadParticipants(search.trim(), nextCursor)}
+                                    disabled={isLoadingMore}
+                                    className="inline-flex items-center rounded-lg bg-zinc-100 px-4 py-2 text-sm font-semibold text-zinc-700 hover:bg-zinc-200 disabled:opacity-60 disabled:cursor-not-allowed dark:bg-zinc-800 dark:text-zinc-200 dark:hover:bg-zinc-700"
+                                >
+                                    {isLoadingMore ? "Chargement..." : "Afficher plus de résultats"}
+                                </button>
+                            </div>
+                        )}
                     </div>
                 </div>
                 {isEditOpen && editingParticipant && (
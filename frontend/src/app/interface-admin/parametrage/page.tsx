@@ -2,6 +2,7 @@
 
 import { AdminProtected } from "@/lib/protected-routes";
 import { API_BASE_URL } from "@/lib/api";
+import { resolveJobPayload } from "@/lib/jobs";
 import { useEffect, useMemo, useState } from "react";
 import { useRouter } from "next/navigation";
 
@@ -66,12 +67,17 @@ function ParametrageContent() {
     const loadExistingParticipants = async () => {
       setIsExistingCountLoading(true);
       try {
-        const response = await fetch(`${API_BASE_URL}/api/participants`);
-        const payload = await response.json();
-
-        if (response.ok && Array.isArray(payload)) {
-          setExistingParticipantCount(payload.length);
-          setActiveParticipantCount(payload.filter((participant) => participant?.is_active).length);
+        // Totaux seuls : une ligne par requete, sans charger toute la liste
+        const countUrl = `${API_BASE_URL}/api/participants?fields=id&limit=1&include_total=true`;
+        const [allResponse, activeResponse] = await Promise.all([
+          fetch(countUrl),
+          fetch(`${countUrl}&active=true`),
+        ]);
+        const [allPayload, activePayload] = await Promise.all([allResponse.json(), activeResponse.json()]);
+
+        if (allResponse.ok && activeResponse.ok) {
+          setExistingParticipantCount(allPayload.total ?? 0);
+          setActiveParticipantCount(activePayload.total ?? 0);
         }
       } catch {
         // Ignorer les erreurs reseau, on garde 0 par defaut
@@ -133,11 +139,13 @@ function ParametrageContent() {
         return;
       }
 
+      // Gros fichier : import en tâche de fond, résultat récupéré à la fin de la tâche
+      const result = await resolveJobPayload<{ participants_added?: number }>(response, payload);
       setUploadSuccess(true);
-      setParticipantCount(payload.participants_added || 0);
+      setParticipantCount(result?.participants_added || 0);
       setIsUploading(false);
-    } catch {
-      setError("Erreur réseau lors de l'upload. Veuillez réessayer.");
+    } catch (err) {
+      setError(err instanceof Error ? err.message : "Erreur réseau lors de l'upload. Veuillez réessayer.");
       setIsUploading(false);
     }
   };
@@ -199,6 +207,8 @@ function ParametrageContent() {
         method: "POST",
         headers: {
           "Content-Type": "application/json",
+          // Session rattachée à l'organisateur connecté
+          "Authorization": adminAuthHeader,
         },
         body: JSON.stringify(payloadBody),
       });
@@ -211,13 +221,16 @@ function ParametrageContent() {
         return;
       }
 
+      // Grand événement : génération en tâche de fond, la session est le résultat de la tâche
+      const sessionResults = await resolveJobPayload(response, payload);
+
       // Sauvegarder les résultats de la session dans localStorage
-      localStorage.setItem("sessionResults", JSON.stringify(payload));
+      localStorage.setItem("sessionResults", JSON.stringify(sessionResults));
 
       // Rediriger vers la page d'analyse après succès
       router.push("/interface-admin/analyse");
-    } catch {
-      setError("Erreur réseau. Veuillez réessayer.");
+    } catch (err) {
+      setError(err instanceof Error ? err.message : "Erreur réseau. Veuillez réessayer.");
       setIsLoading(false);
     }
   };
@@ -11,7 +11,9 @@ interface ItineraryItem {
 }
 
 interface ItineraryResponse {
+  participant_id?: number;
   participant: string;
+  session_id?: number;
   total_rotations: number;
   itinerary: ItineraryItem[];
   itinerary_text: string;
@@ -24,6 +26,7 @@ function MesTables() {
   const [isWaiting, setIsWaiting] = useState(false);
   const [retryTick, setRetryTick] = useState(0);
   const [currentRotationIndex, setCurrentRotationIndex] = useState(0);
+  const [liveMessage, setLiveMessage] = useState("");
 
   // Restaurer l'itinéraire depuis localStorage au démarrage
   useEffect(() => {
@@ -42,17 +45,17 @@ function MesTables() {
   useEffect(() => {
     let isActive = true;
     let intervalId: ReturnType<typeof setInterval> | null = null;
+    let eventSource: EventSource | null = null;
 
     const updateState = (updater: () => void) => {
       if (!isActive) return;
       updater();
     };
 
-    const fetchItinerary = async (participantName: string) => {
+    const fetchItinerary = async (participantId: number) => {
       try {
-        const response = await fetch(
-          `${API_BASE_URL}/api/participants/name/${encodeURIComponent(participantName)}/itinerary`
-        );
+        // Par identifiant : deux homonymes ne partagent pas le même itinéraire
+        const response = await fetch(`${API_BASE_URL}/api/participants/${participantId}/itinerary`);
 
         const payload = await response.json().catch(() => null);
 
@@ -82,6 +85,11 @@ function MesTables() {
           setIsWaiting(false);
           setError("");
         });
+
+        // Session connue : les rotations sont poussées par le serveur (SSE), plus besoin d'interroger l'API
+        if (isActive && payload?.session_id && payload?.participant_id) {
+          listenRotations(payload);
+        }
       } catch {
         updateState(() => {
           setError("Erreur réseau. Veuillez réessayer.");
@@ -91,9 +99,43 @@ function MesTables() {
       }
     };
 
-    const startPolling = (participantName: string) => {
-      fetchItinerary(participantName);
-      intervalId = setInterval(() => fetchItinerary(participantName), 5000);
+    const listenRotations = (payload: ItineraryResponse) => {
+      if (intervalId) {
+        clearInterval(intervalId);
+        intervalId = null;
+      }
+      if (eventSource) return;
+
+      eventSource = new EventSource(
+        `${API_BASE_URL}/api/sessions/${payload.session_id}/participants/${payload.participant_id}/events`
+      );
+
+      eventSource.addEventListener("rotation", (event) => {
+        const data = JSON.parse((event as MessageEvent).data);
+        updateState(() => {
+          setLiveMessage(data.message ?? "");
+          const index = payload.itinerary.findIndex((item) => item.rotation === data.round);
+          if (index >= 0) {
+            setCurrentRotationIndex(index);
+          }
+        });
+      });
+
+      eventSource.addEventListener("waiting", (event) => {
+        const data = JSON.parse((event as MessageEvent).data);
+        updateState(() => setLiveMessage(data.message ?? ""));
+      });
+
+      eventSource.addEventListener("end", (event) => {
+        const data = JSON.parse((event as MessageEvent).data);
+        updateState(() => setLiveMessage(data.message ?? ""));
+        eventSource?.close();
+      });
+    };
+
+    const startPolling = (participantId: number) => {
+      fetchItinerary(participantId);
+      intervalId = setInterval(() => fetchItinerary(participantId), 5000);
     };
 
     const init = () => {
@@ -109,15 +151,15 @@ function MesTables() {
       }
 
       const participant = JSON.parse(participantData);
-      const participantName = participant.nom_complet;
+      const participantId = participant.id;
 
-      if (!participantName) {
-        setError("Nom du participant non disponible.");
+      if (!participantId) {
+        setError("Identifiant du participant non disponible. Veuillez vous reconnecter.");
         setIsLoading(false);
         return;
       }
 
-      startPolling(participantName);
+      startPolling(participantId);
     };
 
     init();
@@ -127,6 +169,7 @@ function MesTables() {
       if (intervalId) {
         clearInterval(intervalId);
       }
+      eventSource?.close();
     };
   }, [retryTick]);
 
@@ -197,6 +240,9 @@ function MesTables() {
           {itinerary && !error && (
             <div className="space-y-6">
               <div className="bg-blue-50 dark:bg-blue-900/20 border border-blue-200 dark:border-blue-800 rounded-lg p-6">
+                {liveMessage && (
+                  <p className="text-sm font-semibold text-blue-700 dark:text-blue-300 mb-2">{liveMessage}</p>
+                )}
                 <h2 className="text-lg font-semibold text-black dark:text-white mb-2">
                   Bonjour {itinerary.participant} !
                 </h2>
@@ -0,0 +1,62 @@
+import { API_BASE_URL } from "@/lib/api";
+
+// Les routes lourdes (génération, import, PDF) répondent 202 + job_id au-delà d'un seuil :
+// la tâche est alors suivie via /api/jobs/{id} jusqu'à la fin.
+
+const JOB_POLL_INTERVAL_MS = 1000;
+
+export interface JobAccepted {
+  job_id: string;
+  status: string;
+  status_url: string;
+}
+
+export interface JobState {
+  job_id: string;
+  status: "pending" | "running" | "done" | "error";
+  progress: number;
+  result: unknown;
+  error: string | null;
+}
+
+export async function waitForJob(jobId: string): Promise<JobState> {
+  for (;;) {
+    const response = await fetch(`${API_BASE_URL}/api/jobs/${jobId}`);
+    const job = await response.json();
+
+    if (!response.ok) {
+      throw new Error(job?.detail ?? "Tâche introuvable.");
+    }
+    if (job.status === "done") {
+      return job;
+    }
+    if (job.status === "error") {
+      throw new Error(job.error ?? "Tâche en échec.");
+    }
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+  }
+}
+
+// Corps JSON d'une réponse : directement, ou résultat de la tâche de fond si la route a répondu 202
+export async function resolveJobPayload<T>(response: Response, payload: T | JobAccepted): Promise<T> {
+  if (response.status !== 202) {
+    return payload as T;
+  }
+  const job = await waitForJob((payload as JobAccepted).job_id);
+  return job.result as T;
+}
+
+// Fichier d'une réponse : directement, ou fichier produit par la tâche de fond si la route a répondu 202
+export async function resolveJobFile(response: Response): Promise<Blob> {
+  if (response.status !== 202) {
+    return response.blob();
+  }
+  const accepted: JobAccepted = await response.json();
+  await waitForJob(accepted.job_id);
+
+  const fileResponse = await fetch(`${API_BASE_URL}/api/jobs/${accepted.job_id}/file`);
+  if (!fileResponse.ok) {
+    throw new Error("Téléchargement impossible");
+  }
+  return fileResponse.blob();
+}